@@ -0,0 +1,44 @@
+"""
+Admin API endpoints (request profiles).
+
+Only available when KITCHENSIM_PROFILING_ENABLED is set. If
+KITCHENSIM_ADMIN_TOKEN is configured, callers must send it in the
+X-Admin-Token header.
+"""
+
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from config import get_settings
+from profiling import get_profile_store
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+def require_admin(x_admin_token: Optional[str]) -> None:
+    """Raise 404 when profiling is disabled, 403 when the admin token is wrong."""
+    settings = get_settings()
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if settings.admin_token and not hmac.compare_digest(
+        x_admin_token or "", settings.admin_token
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/profiles")
+async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """List stored request profiles, newest first."""
+    require_admin(x_admin_token)
+    return {"profiles": get_profile_store().list()}
+
+
+@router.get("/profiles/{request_id}", response_class=PlainTextResponse)
+async def get_profile(request_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Get one profile as collapsed stacks (feed to flamegraph.pl or speedscope)."""
+    require_admin(x_admin_token)
+    entry = get_profile_store().get(request_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"No profile for request {request_id}")
+    return PlainTextResponse(entry["collapsed"])
@@ -1,11 +1,15 @@
 """
 API endpoints for knowledge base management.
+
+The kitchen is kept in the shared kitchen store (knowledge_base.store),
+so every worker process serves and simulates with the same configuration.
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
-from knowledge_base import KnowledgeBase
+from typing import Callable, Dict, Any, Optional
+from knowledge_base import KitchenSnapshot, apply_overrides, default_snapshot, get_kitchen_store
 
 router = APIRouter(prefix="/api/knowledge", tags=["knowledge"])
 
@@ -19,75 +23,49 @@ class KitchenUpdateRequest(BaseModel):
 class KitchenResponse(BaseModel):
     """Response model for kitchen configuration."""
     kitchen_type: str
+    version: Optional[str] = None  # Content hash of the configuration
     ovens: list
     burners: list
     microwaves: list
     chefs: list
 
 
-# Global knowledge base instance (session-scoped in real usage)
-_kb: Optional[KnowledgeBase] = None
-
-
-def get_knowledge_base() -> KnowledgeBase:
-    """Get or create knowledge base instance."""
-    global _kb
-    if _kb is None:
-        _kb = KnowledgeBase()
-    return _kb
+def _response(snapshot: KitchenSnapshot) -> KitchenResponse:
+    return KitchenResponse(**snapshot.to_dict())
 
 
 @router.get("/kitchen", response_model=KitchenResponse)
 async def get_kitchen():
     """Get current kitchen configuration."""
-    kb = get_knowledge_base()
-    kitchen = kb.get_kitchen()
-    
-    return KitchenResponse(
-        kitchen_type=kb.kitchen_type,
-        ovens=[oven.model_dump() for oven in kitchen.ovens],
-        burners=[burner.model_dump() for burner in kitchen.burners],
-        microwaves=[microwave.model_dump() for microwave in kitchen.microwaves],
-        chefs=[chef.model_dump() for chef in kitchen.chefs],
-    )
+    return _response(await run_in_threadpool(get_kitchen_store().current))
+
+
+def kitchen_change(request: KitchenUpdateRequest) -> Callable[[KitchenSnapshot], KitchenSnapshot]:
+    """The kitchen → kitchen function an update request describes."""
+    def change(kitchen: KitchenSnapshot) -> KitchenSnapshot:
+        # Reset to different kitchen type if specified
+        if request.kitchen_type and request.kitchen_type != kitchen.kitchen_type:
+            kitchen = default_snapshot(request.kitchen_type)
+        return apply_overrides(kitchen, request.overrides)
+    return change
 
 
 @router.post("/kitchen/update", response_model=KitchenResponse)
 async def update_kitchen(request: KitchenUpdateRequest):
     """Update kitchen configuration with user overrides."""
-    kb = get_knowledge_base()
-    
-    # Reset to different kitchen type if specified
-    if request.kitchen_type and request.kitchen_type != kb.kitchen_type:
-        kb.kitchen_type = request.kitchen_type
-        kb.reset_to_defaults(request.kitchen_type)
-    
     # Apply overrides
     try:
-        kitchen = kb.update(request.overrides)
+        snapshot = await run_in_threadpool(get_kitchen_store().update, kitchen_change(request))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to update kitchen: {str(e)}")
     
-    return KitchenResponse(
-        kitchen_type=kb.kitchen_type,
-        ovens=[oven.model_dump() for oven in kitchen.ovens],
-        burners=[burner.model_dump() for burner in kitchen.burners],
-        microwaves=[microwave.model_dump() for microwave in kitchen.microwaves],
-        chefs=[chef.model_dump() for chef in kitchen.chefs],
-    )
+    return _response(snapshot)
 
 
 @router.post("/kitchen/reset")
 async def reset_kitchen(kitchen_type: Optional[str] = None):
     """Reset kitchen to default configuration."""
-    kb = get_knowledge_base()
-    kitchen = kb.reset_to_defaults(kitchen_type)
-    
-    return KitchenResponse(
-        kitchen_type=kb.kitchen_type,
-        ovens=[oven.model_dump() for oven in kitchen.ovens],
-        burners=[burner.model_dump() for burner in kitchen.burners],
-        microwaves=[microwave.model_dump() for microwave in kitchen.microwaves],
-        chefs=[chef.model_dump() for chef in kitchen.chefs],
+    snapshot = await run_in_threadpool(
+        get_kitchen_store().update, lambda kitchen: default_snapshot(kitchen_type or kitchen.kitchen_type),
     )
-
+    return _response(snapshot)
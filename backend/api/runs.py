@@ -0,0 +1,52 @@
+"""
+API endpoints for checkpointed workflow runs.
+
+Every /api/simulate request is a run whose per-node updates are kept in
+the checkpoint store (see checkpoints.py). A run can be inspected, and
+replayed for debugging: the recorded LLM outputs are reused and every
+deterministic node runs again on the current code.
+"""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from api.simulate import SimulateRequest, SimulateResponse, run_workflow, to_response
+from checkpoints import CheckpointStore, get_checkpoint_store
+
+router = APIRouter(prefix="/api/runs", tags=["runs"])
+
+
+def _store() -> CheckpointStore:
+    store = get_checkpoint_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Checkpointing is disabled")
+    return store
+
+
+@router.get("/{run_id}")
+async def get_run(run_id: str):
+    """Input, status, size and checkpointed nodes (in completion order) of a run."""
+    run = await run_in_threadpool(_store().get_run, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"No run {run_id} (unknown or evicted)")
+    return run
+
+
+@router.post("/{run_id}/replay", response_model=SimulateResponse)
+async def replay_run(run_id: str):
+    """
+    Re-run a stored run without calling the LLM.
+
+    parse_input, analyze_recipes and validate return their recorded
+    updates (an LLM node the run never finished runs live); the other
+    nodes run again. Nothing is stored, and the response includes the
+    per-node timings.
+    """
+    store = _store()
+    run = await run_in_threadpool(store.replay, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"No run {run_id} (unknown or evicted)")
+    try:
+        result = await run_in_threadpool(run_workflow, run.user_input, None, run)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Workflow error: {str(e)}")
+    return to_response(SimulateRequest(input=run.user_input, debug=True), result, run_id=run_id)
@@ -0,0 +1,104 @@
+"""
+API endpoints for windowed queries over stored schedules.
+
+/api/simulate indexes each schedule it produces and returns its
+`schedule_id`; the Gantt view then fetches only the tasks in the visible
+time window and rows instead of the whole schedule.
+"""
+
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from config import get_settings
+from scheduler import ScheduleIndex, ScheduleStore
+
+router = APIRouter(prefix="/api/schedules", tags=["schedules"])
+
+
+@lru_cache
+def get_schedule_store() -> ScheduleStore:
+    """Get the process-wide schedule store, sized from settings."""
+    settings = get_settings()
+    return ScheduleStore(
+        max_entries=settings.schedule_store_size,
+        max_age=settings.schedule_max_age_seconds,
+    )
+
+
+class ScheduleWindow(BaseModel):
+    """One page of tasks overlapping a time window."""
+    schedule_id: str
+    start: float
+    end: float
+    tasks: list
+    next_cursor: Optional[str] = None  # Pass as `cursor` to get the next page
+
+
+def _get(schedule_id: str) -> ScheduleIndex:
+    index = get_schedule_store().get(schedule_id)
+    if index is None:
+        raise HTTPException(status_code=404, detail=f"No schedule {schedule_id} (unknown or evicted)")
+    return index
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    return [part.strip() for part in value.split(",") if part.strip()] if value else None
+
+
+def _encode_cursor(key: Tuple[float, str]) -> str:
+    return f"{key[0]!r}|{key[1]}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, str]:
+    start, _, task_id = cursor.partition("|")
+    return float(start), task_id
+
+
+@router.get("/{schedule_id}")
+async def get_schedule(schedule_id: str):
+    """Timeline and resources (rows) of a stored schedule."""
+    index = _get(schedule_id)
+    return {
+        "schedule_id": schedule_id,
+        "timeline": index.timeline,
+        "task_count": index.task_count,
+        "resources": index.resources(),
+    }
+
+
+@router.get("/{schedule_id}/tasks", response_model=ScheduleWindow)
+async def get_schedule_window(
+    schedule_id: str,
+    start: Optional[float] = Query(None, description="Window start in minutes (default: schedule start)"),
+    end: Optional[float] = Query(None, description="Window end in minutes (default: schedule end)"),
+    resources: Optional[str] = Query(None, description="Comma-separated resource ids"),
+    kinds: Optional[str] = Query(None, description="Comma-separated kinds: oven, stove, microwave, chef"),
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+):
+    """
+    Tasks overlapping [start, end) on the selected resources, in start
+    order, one page at a time.
+    """
+    index = _get(schedule_id)
+    timeline = index.timeline
+    if start is None:
+        start = timeline.get("start", 0.0)
+    if end is None:
+        end = timeline.get("start", 0.0) + timeline.get("makespan", 0.0)
+    try:
+        after = _decode_cursor(cursor) if cursor else None
+        tasks, next_key = index.window(
+            start, end, resources=_split(resources), kinds=_split(kinds), limit=limit, after=after,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid schedule query: {str(e)}")
+
+    return ScheduleWindow(
+        schedule_id=schedule_id,
+        start=start,
+        end=end,
+        tasks=tasks,
+        next_cursor=_encode_cursor(next_key) if next_key else None,
+    )
@@ -0,0 +1,193 @@
+"""
+API endpoints for live service: simulated ticket streams and a live
+WebSocket plan that is updated as tickets are fired.
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Header, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, Field, model_validator
+from api.simulate import columnar_response
+from columnar import negotiate, service_tables
+from knowledge_base import apply_overrides, default_snapshot
+from scheduler import LiveSchedule
+from simulation import Ticket, load_pos_log, poisson_tickets, simulate_service
+
+router = APIRouter(prefix="/api/service", tags=["service"])
+
+
+class TicketInput(BaseModel):
+    """One fired ticket."""
+    ticket_id: str
+    arrival_minutes: float = Field(..., ge=0, description="Minutes from start of service")
+    items: List[str] = Field(..., description="Recipe names on the ticket")
+
+
+class ArrivalSpec(BaseModel):
+    """Synthetic Poisson ticket arrivals (bounded: every ticket is simulated)."""
+    rate_per_hour: float = Field(..., gt=0, le=1000)
+    hours: float = Field(default=4.0, gt=0, le=24)
+    min_items: int = Field(default=1, ge=1, le=20)
+    max_items: int = Field(default=4, ge=1, le=20)
+    seed: int = 0
+
+    @model_validator(mode="after")
+    def _check_items(self) -> "ArrivalSpec":
+        if self.max_items < self.min_items:
+            raise ValueError("max_items must be at least min_items")
+        return self
+
+
+class ServiceRequest(BaseModel):
+    """
+    Request model for a service simulation.
+
+    Provide exactly one ticket source: `tickets`, `pos_log` (CSV or JSON
+    lines text, see simulation.load_pos_log) or `arrivals`.
+    """
+    menu: List[Dict[str, Any]] = Field(..., description="Recipes in the analyze_recipes shape")
+    kitchen_type: Optional[str] = None
+    overrides: Dict[str, Any] = Field(default_factory=dict)
+    tickets: Optional[List[TicketInput]] = None
+    pos_log: Optional[str] = None
+    arrivals: Optional[ArrivalSpec] = None
+    include_ticket_times: bool = False
+
+
+class ServiceResponse(BaseModel):
+    """Response model for a service simulation."""
+    kitchen_version: str
+    tickets: dict
+    stations: dict
+    queues: dict
+    chefs: dict
+    events: int
+    service_minutes: float
+    elapsed_ms: float
+    ticket_times: Optional[list] = None
+
+
+def _tickets(request: ServiceRequest) -> List[Ticket]:
+    sources = [s for s in (request.tickets, request.pos_log, request.arrivals) if s is not None]
+    if len(sources) != 1:
+        raise ValueError("Provide exactly one of tickets, pos_log or arrivals")
+    if request.tickets is not None:
+        return [Ticket(t.ticket_id, t.arrival_minutes, tuple(t.items)) for t in request.tickets]
+    if request.pos_log is not None:
+        # The log's text only: request data never names a file on the server
+        return load_pos_log(request.pos_log.splitlines())
+    spec = request.arrivals
+    return poisson_tickets(
+        [recipe.get("recipe_name") for recipe in request.menu],
+        spec.rate_per_hour,
+        spec.hours,
+        items_per_ticket=(spec.min_items, max(spec.min_items, spec.max_items)),
+        seed=spec.seed,
+    )
+
+
+@router.post("/simulate", response_model=ServiceResponse)
+def simulate_service_endpoint(request: ServiceRequest, accept: Optional[str] = Header(None)):
+    """
+    Simulate a service: replay tickets through the kitchen and report
+    ticket times, queue lengths and station/chef utilization.
+
+    With `Accept: application/x-ndjson` or
+    `application/vnd.kitchensim.columns`, the response is the ticket
+    times and per-chef figures as columnar tables (see columnar.py).
+
+    Plain `def` so FastAPI runs the CPU-bound simulation in its threadpool.
+    """
+    media_type = negotiate(accept)
+    try:
+        kitchen = apply_overrides(default_snapshot(request.kitchen_type), request.overrides)
+        tickets = _tickets(request)
+        start = time.perf_counter()
+        report = simulate_service(
+            kitchen, request.menu, tickets,
+            include_ticket_times=request.include_ticket_times or media_type is not None,
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid service simulation: {str(e)}")
+
+    if media_type is not None:
+        return columnar_response(service_tables(report), media_type, {"X-Kitchen-Version": kitchen.version})
+
+    return ServiceResponse(
+        kitchen_version=kitchen.version,
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 3),
+        **report,
+    )
+
+
+class LiveSessionStart(BaseModel):
+    """First message on the live WebSocket: the menu and kitchen for the session."""
+    type: str = "start"
+    menu: List[Dict[str, Any]]
+    kitchen_type: Optional[str] = None
+    overrides: Dict[str, Any] = Field(default_factory=dict)
+
+
+def _session_minutes(started: float) -> float:
+    return (time.monotonic() - started) / 60.0
+
+
+@router.websocket("/ws")
+async def live_service(websocket: WebSocket):
+    """
+    Live service plan over a WebSocket.
+
+    Messages (JSON, client → server):
+    - {"type": "start", "menu": [...], "kitchen_type"?, "overrides"?}
+      → {"type": "ready", "kitchen_version"}
+    - {"type": "ticket", "ticket_id", "items": [...], "at"?: minutes}
+      → {"type": "plan", "ticket_id", "eta_minutes", "changed": [...],
+         "etas": {...}, "completed": [...], "elapsed_ms"}
+    - {"type": "advance", "at"?: minutes} → {"type": "completed", "tickets": [...]}
+    - {"type": "replan"} → {"type": "plan", "changed": [...], "etas": {...}, "elapsed_ms"}
+
+    `at` is minutes since the session started; it defaults to wall-clock
+    time since the start message. Only new or moved assignments are sent.
+    Invalid messages get {"type": "error", "detail"} and the session stays open.
+    """
+    await websocket.accept()
+    live: Optional[LiveSchedule] = None
+    started = time.monotonic()
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                message = json.loads(text)
+                if not isinstance(message, dict):
+                    raise ValueError("Messages must be JSON objects")
+                kind = message.get("type")
+                if kind == "start":
+                    start = LiveSessionStart(**message)
+                    kitchen = apply_overrides(default_snapshot(start.kitchen_type), start.overrides)
+                    live = LiveSchedule(kitchen, start.menu)
+                    started = time.monotonic()
+                    await websocket.send_json({"type": "ready", "kitchen_version": kitchen.version})
+                    continue
+                if live is None:
+                    raise ValueError("Send a start message first")
+
+                now = message.get("at")
+                now = _session_minutes(started) if now is None else float(now)
+                begin = time.perf_counter()
+                if kind == "ticket":
+                    update = live.add_ticket(str(message["ticket_id"]), list(message["items"]), now)
+                elif kind == "advance":
+                    await websocket.send_json({"type": "completed", "tickets": live.advance(now)})
+                    continue
+                elif kind == "replan":
+                    live.advance(now)
+                    update = live.replan()
+                else:
+                    raise ValueError(f"Unknown message type '{kind}'")
+                update["elapsed_ms"] = round((time.perf_counter() - begin) * 1000, 3)
+                await websocket.send_json({"type": "plan", **update})
+            except (ValueError, KeyError, TypeError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        return
@@ -0,0 +1,181 @@
+"""
+API endpoints for interactive sessions that push schedule deltas.
+
+A session starts from one simulation and returns its full state once.
+After that, each kitchen tweak responds with (and pushes to the
+session's WebSocket subscribers) only what changed: schedule entries
+that moved or were reassigned, and conflicts that appeared or cleared.
+See sessions.py for the delta format and versioning.
+"""
+
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from api.knowledge import KitchenUpdateRequest, kitchen_change
+from api.simulate import WorkflowFailed, execute, workflow_error
+from sessions import CLOSED, RESYNC, Session, get_session_store
+
+router = APIRouter(prefix="/api/sessions", tags=["sessions"])
+
+# WebSocket close code for an unknown or evicted session
+UNKNOWN_SESSION = 4404
+
+
+class SessionRequest(BaseModel):
+    """Request model for starting a session."""
+    input: str
+
+
+class SessionSnapshot(BaseModel):
+    """Full state of a session at one version."""
+    session_id: str
+    version: int
+    kitchen: dict
+    tasks: dict
+    schedule: dict
+    conflicts: list
+    validation: dict
+    output: str
+    run_id: Optional[str] = None  # Checkpointed run the session started from
+
+
+def _get(session_id: str) -> Session:
+    session = get_session_store().get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"No session {session_id} (unknown or evicted)")
+    return session
+
+
+@router.post("", response_model=SessionSnapshot)
+async def create_session(request: SessionRequest):
+    """Run the workflow for `input` and start a session on its result (version 0)."""
+    try:
+        result, _, run_id = await execute(request.input)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkflowFailed as e:
+        raise workflow_error(e)
+    session = get_session_store().create(result)
+    return SessionSnapshot(**session.snapshot(), run_id=run_id)
+
+
+@router.get("/{session_id}", response_model=SessionSnapshot)
+async def get_session(session_id: str):
+    """Full current state, for a client resyncing."""
+    return SessionSnapshot(**_get(session_id).snapshot())
+
+
+@router.delete("/{session_id}")
+async def delete_session(session_id: str):
+    """End a session; its subscribers are disconnected."""
+    if not get_session_store().remove(session_id):
+        raise HTTPException(status_code=404, detail=f"No session {session_id} (unknown or evicted)")
+    return {"session_id": session_id, "deleted": True}
+
+
+@router.post("/{session_id}/kitchen")
+async def update_session_kitchen(session_id: str, request: KitchenUpdateRequest):
+    """
+    Apply kitchen overrides to this session only and reschedule.
+
+    The shared kitchen configuration is not changed. Returns the delta,
+    which is also pushed to the session's subscribers.
+    """
+    session = _get(session_id)
+    try:
+        return await run_in_threadpool(session.update_kitchen, kitchen_change(request))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to update kitchen: {str(e)}")
+
+
+@router.get("/{session_id}/deltas")
+async def get_session_deltas(session_id: str, since: int = Query(..., ge=0, description="Version the client has")):
+    """
+    Deltas after version `since`, oldest first.
+
+    410 when they are no longer all kept: resync from GET /api/sessions/{session_id}.
+    """
+    session = _get(session_id)
+    deltas = session.deltas_since(since)
+    if deltas is None:
+        raise HTTPException(status_code=410, detail=f"Version {since} is too old; fetch the session to resync")
+    return {"session_id": session_id, "version": max([since] + [d["version"] for d in deltas]), "deltas": deltas}
+
+
+@router.get("/{session_id}/sensitivity")
+async def get_session_sensitivity(
+    session_id: str,
+    samples: int = Query(500, ge=2, le=10000, description="Monte Carlo samples"),
+    seed: int = Query(0, description="Random seed"),
+    top: Optional[int] = Query(None, ge=1, description="Keep only this many tasks and resources"),
+):
+    """
+    Which tasks and resources drive the risk of running late.
+
+    Replays the current schedule under sampled task durations and ranks
+    tasks by criticality and their share of makespan variance.
+    """
+    session = _get(session_id)
+    try:
+        return await run_in_threadpool(session.sensitivity, samples, seed, top)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.websocket("/{session_id}/ws")
+async def session_updates(websocket: WebSocket, session_id: str, since: Optional[int] = None):
+    """
+    Push the session's changes as JSON messages.
+
+    The first messages catch the client up: the deltas after `since`, or
+    a {"type": "snapshot", ...} when `since` is missing or too old. Then
+    every change arrives as {"type": "delta", ...}. A snapshot is sent
+    again whenever the client falls too far behind. The socket closes
+    when the session ends.
+    """
+    session = get_session_store().get(session_id)
+    if session is None:
+        await websocket.close(code=UNKNOWN_SESSION)
+        return
+    await websocket.accept()
+    subscription, backlog, snapshot = session.subscribe(asyncio.get_running_loop(), since)
+    version = since or 0
+    receiver = asyncio.ensure_future(websocket.receive())
+    getter = None
+    try:
+        if snapshot is not None:
+            version = snapshot["version"]
+            await websocket.send_json({"type": "snapshot", **snapshot})
+        for delta in backlog or []:
+            version = delta["version"]
+            await websocket.send_json({"type": "delta", **delta})
+        while True:
+            if getter is None:
+                getter = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    return
+                receiver = asyncio.ensure_future(websocket.receive())  # Client messages are ignored
+            if getter not in done:
+                continue
+            message, getter = getter.result(), None
+            if message == CLOSED:
+                await websocket.close()
+                return
+            if message == RESYNC:
+                snapshot = session.snapshot()
+                version = snapshot["version"]
+                await websocket.send_json({"type": "snapshot", **snapshot})
+            elif message["version"] > version:  # Older ones are in the snapshot already
+                version = message["version"]
+                await websocket.send_json({"type": "delta", **message})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        if getter is not None:
+            getter.cancel()
+        session.unsubscribe(subscription)
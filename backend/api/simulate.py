@@ -2,9 +2,25 @@
 API endpoint for running the kitchen simulator workflow.
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+import time
+import uuid
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from api.admin import require_admin
+from api.schedule import get_schedule_store
+from checkpoints import ActiveRun, get_checkpoint_store
+from columnar import Table, encode, negotiate, simulation_tables
+from config import get_settings
 from graph import workflow
+from knowledge_base import get_kitchen_store
+from metrics import SIMULATE_COALESCED, WORKFLOW_DURATION, WORKFLOW_ERRORS
+from profiling import SamplingProfiler, get_profile_store
+from scheduler import expand_batches, utilization_series
+from singleflight import SingleFlight
 from state import KitchenSimulatorState
 
 router = APIRouter(prefix="/api/simulate", tags=["simulate"])
@@ -13,6 +29,17 @@ router = APIRouter(prefix="/api/simulate", tags=["simulate"])
 class SimulateRequest(BaseModel):
     """Request model for simulation."""
     input: str
+    debug: bool = False  # Include the per-node timing breakdown in the response
+    series_resolution_minutes: Optional[float] = Field(
+        default=None, gt=0, description="Include utilization/queue-depth series at this bucket width"
+    )
+    series_max_points: int = Field(default=100, ge=1, le=1000, description="Downsample series to at most this many buckets")
+    series_per_resource: bool = True  # Per oven/burner/microwave/chef series, not just per kind
+    expand_batches: bool = False  # One schedule entry per unit of batched tasks instead of per lane
+    run_id: Optional[str] = Field(
+        default=None, pattern=r"^[A-Za-z0-9_-]{1,64}$",
+        description="Resume this run (e.g. the X-Run-Id of a failed request) from its last finished node",
+    )
 
 
 class SimulateResponse(BaseModel):
@@ -26,49 +53,218 @@ class SimulateResponse(BaseModel):
     validation: dict
     conflicts: list
     output: str
+    timings: Optional[list] = None  # Per-node timing records (debug only)
+    profile_id: Optional[str] = None  # Set when the request was profiled
+    series: Optional[dict] = None  # Utilization/queue-depth series (when requested)
+    schedule_id: Optional[str] = None  # Windowed queries at /api/schedules/{schedule_id}/tasks
+    run_id: Optional[str] = None  # Checkpointed run: resume with it, inspect or replay at /api/runs/{run_id}
+    history: Optional[dict] = None  # Past run the schedule reused or warm-started from
+
+
+class WorkflowFailed(Exception):
+    """A workflow run raised; `run_id` (if checkpointed) can be retried to resume it."""
+
+    def __init__(self, run_id: Optional[str]):
+        super().__init__(run_id)
+        self.run_id = run_id
+
+
+def workflow_error(e: WorkflowFailed) -> HTTPException:
+    """The HTTP error for a failed run: 400 when its input was invalid (a ValueError), else 500."""
+    headers = {"X-Run-Id": e.run_id} if e.run_id else None
+    if isinstance(e.__cause__, ValueError):
+        return HTTPException(status_code=400, detail=str(e.__cause__), headers=headers)
+    return HTTPException(status_code=500, detail=f"Workflow error: {str(e.__cause__)}", headers=headers)
+
+
+_inflight = SingleFlight()
+
+
+def columnar_response(tables: List[Table], media_type: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Tables in a columnar export format (see columnar.py); NDJSON is streamed."""
+    body = encode(tables, media_type)
+    if isinstance(body, bytes):
+        return Response(body, media_type=media_type, headers=headers)
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+def _flight_key(user_input: str) -> Tuple[str, str]:
+    """Coalescing key: the input with whitespace and case normalized, plus the kitchen version."""
+    return " ".join(user_input.split()).casefold(), get_kitchen_store().current().version
+
+
+def run_workflow(
+    user_input: str,
+    profiler: Optional[SamplingProfiler] = None,
+    run: Optional[ActiveRun] = None,
+) -> dict:
+    """Invoke the workflow (blocking) under the optional profiler and checkpointed run."""
+    initial_state: KitchenSimulatorState = {
+        "user_input": user_input
+    }
+    start = time.perf_counter()
+    try:
+        with profiler or nullcontext(), run or nullcontext():
+            return workflow.invoke(initial_state)
+    except Exception:
+        WORKFLOW_ERRORS.inc()
+        raise
+    finally:
+        WORKFLOW_DURATION.observe(time.perf_counter() - start)
+
+
+async def execute(
+    user_input: str,
+    profiler: Optional[SamplingProfiler] = None,
+    run_id: Optional[str] = None,
+) -> Tuple[dict, Optional[str], Optional[str]]:
+    """
+    Run the workflow off the event loop, checkpointed, and index its schedule.
+
+    Args:
+        run_id: Run to resume; a new run is started when None or unknown
+
+    Returns:
+        (final state, schedule_id or None when there is no schedule,
+        run_id or None when checkpointing is disabled)
+
+    Raises:
+        ValueError: If `run_id` was started with a different input
+        WorkflowFailed: If the workflow raised (chained to its exception)
+    """
+    store = get_checkpoint_store()
+    run = await run_in_threadpool(store.start, user_input, run_id) if store is not None else None
+    try:
+        result = await run_in_threadpool(run_workflow, user_input, profiler, run)
+    except Exception as e:
+        raise WorkflowFailed(run.run_id if run else None) from e
+    schedule_id = None
+    if result.get("schedule", {}).get("tasks"):
+        schedule_id = get_schedule_store().add(result["schedule"])
+    return result, schedule_id, run.run_id if run else None
 
 
 @router.post("", response_model=SimulateResponse)
-async def simulate(request: SimulateRequest):
+async def simulate(
+    request: SimulateRequest,
+    response: Response,
+    profile: bool = Query(False, description="Profile this request (requires profiling enabled)"),
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+):
     """
     Run the kitchen simulator workflow.
+
+    Parses the event description, applies kitchen overrides, breaks the
+    recipes into a task DAG, schedules it onto the kitchen's chefs and
+    equipment, then validates the plan and reports conflicts (see
+    graph.py). The response carries every stage's output and a
+    `schedule_id` for windowed queries at /api/schedules/{schedule_id}.
+    Batched tasks come back as one entry with its `lanes`; set
+    `expand_batches` for one entry per unit instead.
+
+    Pass `?profile=true` (or an `X-Profile: 1` header) to run the request
+    under the sampling profiler; the collapsed-stack profile is then
+    available at /api/admin/profiles/{profile_id}.
     
-    This is PR 3 - workflow skeleton with stub nodes.
-    All nodes execute but return placeholder data.
+    Concurrent requests with the same input (ignoring whitespace and case)
+    against the same configured kitchen share one workflow run.
+    
+    Each run is checkpointed after every node. When the workflow fails, the
+    500 response carries the run in an `X-Run-Id` header; sending it back
+    as `run_id` with the same input resumes after the last finished node.
+    
+    With `Accept: application/x-ndjson` or
+    `application/vnd.kitchensim.columns`, the response is the schedule and
+    task DAG as columnar tables instead (see columnar.py), with the run,
+    schedule and profile ids in `X-Run-Id`, `X-Schedule-Id` and
+    `X-Profile-Id` headers.
     """
+    profile_id = None
+    profiler = None
+    if profile or x_profile:
+        require_admin(x_admin_token)
+        profile_id = uuid.uuid4().hex
+        profiler = SamplingProfiler(interval=get_settings().profile_sample_interval_ms / 1000)
+    
     try:
-        # Create initial state
-        initial_state: KitchenSimulatorState = {
-            "user_input": request.input
-        }
-        
-        # Run workflow
-        result = workflow.invoke(initial_state)
-        
-        # Convert KnowledgeBase to dict for JSON response
-        kb_dict = {}
-        if result.get("knowledge_base"):
-            kb = result["knowledge_base"]
-            kb_dict = {
-                "kitchen_type": kb.kitchen_type,
-                "ovens": [oven.model_dump() for oven in kb.kitchen.ovens],
-                "burners": [burner.model_dump() for burner in kb.kitchen.burners],
-                "microwaves": [m.model_dump() for m in kb.kitchen.microwaves],
-                "chefs": [chef.model_dump() for chef in kb.kitchen.chefs],
-            }
-        
-        return SimulateResponse(
-            user_input=result.get("user_input", ""),
-            parsed_data=result.get("parsed_data", {}),
-            knowledge_base=kb_dict,
-            recipes=result.get("recipes", []),
-            tasks=result.get("tasks", {}),
-            schedule=result.get("schedule", {}),
-            validation=result.get("validation", {}),
-            conflicts=result.get("conflicts", []),
-            output=result.get("output", ""),
+        if profiler is not None:
+            # Profiled requests always run on their own so the profile is theirs
+            try:
+                result, schedule_id, run_id = await execute(request.input, profiler, request.run_id)
+            finally:
+                get_profile_store().add(profile_id, profiler, user_input=request.input[:200])
+                response.headers["X-Profile-Id"] = profile_id
+        elif request.run_id is not None:
+            # Resumed runs are the caller's own, not shared with other requests
+            result, schedule_id, run_id = await execute(request.input, run_id=request.run_id)
+        else:
+            # The key reads the kitchen version from SQLite, so off the event loop
+            key = await run_in_threadpool(_flight_key, request.input)
+            (result, schedule_id, run_id), shared = await _inflight.run(
+                key, lambda: execute(request.input),
+            )
+            if shared:
+                SIMULATE_COALESCED.inc()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkflowFailed as e:
+        raise workflow_error(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Workflow error: {str(e)}")
+    
+    media_type = negotiate(accept)
+    if media_type is not None:
+        ids = {"X-Run-Id": run_id, "X-Schedule-Id": schedule_id, "X-Profile-Id": profile_id}
+        schedule = result.get("schedule") or {}
+        if request.expand_batches and schedule.get("tasks"):
+            result = dict(result, schedule=dict(schedule, tasks=expand_batches(schedule["tasks"])))
+        return columnar_response(
+            simulation_tables(result), media_type, {key: value for key, value in ids.items() if value},
         )
+
+    try:
+        return to_response(request, result, profile_id=profile_id, schedule_id=schedule_id, run_id=run_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Workflow error: {str(e)}")
 
 
+def to_response(request: SimulateRequest, result: dict, **extra) -> SimulateResponse:
+    """
+    Build the simulate response from a final workflow state.
+
+    Args:
+        request: Request whose output options (series, batches, debug) apply
+        result: Final workflow state
+        **extra: profile_id, schedule_id and run_id
+    """
+    series = None
+    if request.series_resolution_minutes and result.get("kitchen") is not None:
+        series = utilization_series(
+            result.get("schedule") or {},
+            result["kitchen"],
+            resolution_minutes=request.series_resolution_minutes,
+            max_points=request.series_max_points,
+            per_resource=request.series_per_resource,
+        )
+    
+    schedule = result.get("schedule", {})
+    if request.expand_batches and schedule.get("tasks"):
+        schedule = dict(schedule, tasks=expand_batches(schedule["tasks"]))
+    
+    return SimulateResponse(
+        user_input=request.input,
+        parsed_data=result.get("parsed_data", {}),
+        knowledge_base=result["kitchen"].to_dict() if result.get("kitchen") else {},
+        recipes=result.get("recipes", []),
+        tasks=result.get("tasks", {}),
+        schedule=schedule,
+        validation=result.get("validation", {}),
+        conflicts=result.get("conflicts", []),
+        output=result.get("output", ""),
+        timings=result.get("node_timings", []) if request.debug else None,
+        series=series,
+        history=result.get("history"),
+        **extra,
+    )
@@ -0,0 +1,21 @@
+"""Benchmark suite: seeded workload generators and per-node timing."""
+
+from .generators import (
+    SCENARIOS,
+    generate_kitchen,
+    generate_menu,
+    generate_recipe,
+    generate_task_dag,
+    generate_schedule,
+    generate_workload,
+)
+
+__all__ = [
+    "SCENARIOS",
+    "generate_kitchen",
+    "generate_menu",
+    "generate_recipe",
+    "generate_task_dag",
+    "generate_schedule",
+    "generate_workload",
+]
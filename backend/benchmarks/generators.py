@@ -0,0 +1,360 @@
+"""
+Seeded synthetic workload generators for the benchmark suite.
+
+Every generator takes an explicit seed so the same scenario always produces
+the same menu, DAG, kitchen and schedule. Shapes follow phase1.md: recipes
+carry tasks with `duration_minutes`, `dependencies`, `resources_needed` and
+`task_type`; DAGs are {"nodes": [...], "edges": [(before, after), ...]}.
+"""
+
+import random
+from typing import Any, Dict, List
+
+# Workload sizes from a home dinner up to (and past) a commercial kitchen.
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "home": {
+        "kitchen": {"ovens": 1, "burners": 4, "microwaves": 1, "chefs": 1},
+        "recipes": 2,
+        "tasks_per_recipe": 6,
+        "guest_count": 4,
+    },
+    "small_restaurant": {
+        "kitchen": {"ovens": 2, "burners": 6, "microwaves": 2, "chefs": 2},
+        "recipes": 5,
+        "tasks_per_recipe": 8,
+        "guest_count": 40,
+    },
+    "commercial": {
+        "kitchen": {"ovens": 4, "burners": 8, "microwaves": 5, "chefs": 5},
+        "recipes": 12,
+        "tasks_per_recipe": 10,
+        "guest_count": 150,
+    },
+    "catering": {
+        "kitchen": {"ovens": 12, "burners": 24, "microwaves": 8, "chefs": 20},
+        "recipes": 30,
+        "tasks_per_recipe": 12,
+        "guest_count": 600,
+    },
+    "stress": {
+        "kitchen": {"ovens": 40, "burners": 64, "microwaves": 16, "chefs": 50},
+        "recipes": 80,
+        "tasks_per_recipe": 15,
+        "guest_count": 2000,
+    },
+    # Synthetic DAG shapes for the scheduling stages (recipes are still
+    # generated for build_dag; `tasks`/`schedule` come from the shape).
+    "wide_dag": {
+        "kitchen": {"ovens": 4, "burners": 8, "microwaves": 5, "chefs": 5},
+        "recipes": 12,
+        "tasks_per_recipe": 10,
+        "guest_count": 150,
+        "dag": {"width": 200, "depth": 5, "edge_density": 0.002},
+    },
+    "deep_dag": {
+        "kitchen": {"ovens": 4, "burners": 8, "microwaves": 5, "chefs": 5},
+        "recipes": 12,
+        "tasks_per_recipe": 10,
+        "guest_count": 150,
+        "dag": {"width": 4, "depth": 250, "edge_density": 0.0005},
+    },
+}
+
+TASK_TYPES = ["prep", "cook", "passive", "plate"]
+TASK_TYPE_WEIGHTS = [0.4, 0.35, 0.15, 0.1]
+
+# resources_needed per task type (one option is drawn per task)
+RESOURCE_OPTIONS = {
+    "prep": [["prep_station", "chef"]],
+    "cook": [["stove", "chef"], ["oven", "chef"], ["stove", "pan", "chef"]],
+    "passive": [["oven"], ["stove"], ["microwave"]],
+    "plate": [["chef"]],
+}
+
+CHEF_ROLES = ["prep", "cook", "general", "server"]
+SKILL_LEVELS = ["beginner", "intermediate", "expert"]
+ENERGY_LEVELS = ["fresh", "tired", "exhausted"]
+BURNER_TYPES = ["gas", "electric", "induction"]
+
+
+def generate_kitchen(
+    ovens: int,
+    burners: int,
+    microwaves: int,
+    chefs: int,
+    seed: int = 0,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Generate kitchen data in the same shape as a defaults.json kitchen type.
+
+    The result can be passed to `Kitchen(**data)` or used directly as
+    `user_overrides` for `KnowledgeBase.update()`.
+    """
+    rng = random.Random(seed)
+    return {
+        "ovens": [
+            {
+                "id": f"oven_{i + 1}",
+                "capacity": rng.randint(2, 6),
+                "max_temp": rng.choice([500, 550, 600]),
+            }
+            for i in range(ovens)
+        ],
+        "burners": [
+            {"id": f"burner_{i + 1}", "type": rng.choice(BURNER_TYPES)}
+            for i in range(burners)
+        ],
+        "microwaves": [
+            {"id": f"microwave_{i + 1}", "wattage": rng.choice([1000, 1200, 1500])}
+            for i in range(microwaves)
+        ],
+        "chefs": [
+            {
+                "id": f"chef_{i + 1}",
+                # Guarantee at least one generalist so every task type is coverable
+                "role": "general" if i == 0 else rng.choice(CHEF_ROLES),
+                "skill_level": rng.choice(SKILL_LEVELS),
+                "energy_level": rng.choice(ENERGY_LEVELS),
+            }
+            for i in range(chefs)
+        ],
+    }
+
+
+def generate_recipe(
+    rng: random.Random,
+    recipe_index: int,
+    n_tasks: int,
+    edge_density: float = 0.3,
+) -> Dict[str, Any]:
+    """
+    Generate one recipe with `n_tasks` tasks.
+
+    Each task depends on the previous one with probability 0.6 and on any
+    other earlier task with probability `edge_density`. The final task is a
+    plating step that depends on every task nothing else depends on.
+    """
+    prefix = f"r{recipe_index}"
+    tasks: List[Dict[str, Any]] = []
+    for j in range(n_tasks - 1):
+        task_type = rng.choices(TASK_TYPES, weights=TASK_TYPE_WEIGHTS)[0]
+        dependencies = []
+        if j > 0 and rng.random() < 0.6:
+            dependencies.append(f"{prefix}_task_{j}")
+        for k in range(1, j):
+            if rng.random() < edge_density and f"{prefix}_task_{k}" not in dependencies:
+                dependencies.append(f"{prefix}_task_{k}")
+        tasks.append({
+            "id": f"{prefix}_task_{j + 1}",
+            "name": f"{task_type.title()} step {j + 1}",
+            "description": f"Synthetic {task_type} step {j + 1} of recipe {recipe_index}",
+            "duration_minutes": rng.randint(2, 45),
+            "duration_source": rng.choice(["explicit", "inferred"]),
+            "dependencies": dependencies,
+            "resources_needed": rng.choice(RESOURCE_OPTIONS[task_type]),
+            "task_type": task_type,
+            "implicit": rng.random() < 0.2,
+        })
+
+    depended_on = {dep for task in tasks for dep in task["dependencies"]}
+    tasks.append({
+        "id": f"{prefix}_task_{n_tasks}",
+        "name": "Plate",
+        "description": f"Plate recipe {recipe_index}",
+        "duration_minutes": rng.randint(2, 10),
+        "duration_source": "inferred",
+        "dependencies": [t["id"] for t in tasks if t["id"] not in depended_on],
+        "resources_needed": ["chef"],
+        "task_type": "plate",
+        "implicit": True,
+    })
+
+    return {
+        "recipe_name": f"Recipe {recipe_index}",
+        "servings": rng.choice([2, 4, 6, 8, 12]),
+        "tasks": tasks,
+    }
+
+
+def generate_menu(
+    n_recipes: int,
+    tasks_per_recipe: int,
+    seed: int = 0,
+    edge_density: float = 0.3,
+) -> List[Dict[str, Any]]:
+    """Generate a menu of `n_recipes` recipes (see `generate_recipe`)."""
+    rng = random.Random(seed)
+    return [
+        generate_recipe(rng, i + 1, tasks_per_recipe, edge_density)
+        for i in range(n_recipes)
+    ]
+
+
+def generate_task_dag(
+    width: int,
+    depth: int,
+    edge_density: float = 0.2,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Generate a layered task DAG with `depth` layers of `width` tasks.
+
+    Every task below the first layer depends on at least one task in the
+    layer above, plus any task in earlier layers with probability
+    `edge_density`.
+    """
+    rng = random.Random(seed)
+    nodes: List[Dict[str, Any]] = []
+    edges: List[tuple] = []
+    layers: List[List[str]] = []
+
+    for d in range(depth):
+        layer = []
+        for w in range(width):
+            task_id = f"task_{d}_{w}"
+            dependencies: List[str] = []
+            if d > 0:
+                dependencies.append(rng.choice(layers[d - 1]))
+                for earlier in layers:
+                    for candidate in earlier:
+                        if candidate not in dependencies and rng.random() < edge_density:
+                            dependencies.append(candidate)
+            task_type = rng.choices(TASK_TYPES, weights=TASK_TYPE_WEIGHTS)[0]
+            nodes.append({
+                "id": task_id,
+                "name": f"Task {d}.{w}",
+                "duration_minutes": rng.randint(2, 45),
+                "dependencies": dependencies,
+                "resources_needed": rng.choice(RESOURCE_OPTIONS[task_type]),
+                "task_type": task_type,
+            })
+            edges.extend((dep, task_id) for dep in dependencies)
+            layer.append(task_id)
+        layers.append(layer)
+
+    return {"nodes": nodes, "edges": edges}
+
+
+def dag_from_recipes(recipes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Flatten recipe tasks into a unified DAG (nodes + dependency edges)."""
+    nodes = []
+    edges = []
+    for recipe in recipes:
+        for task in recipe.get("tasks", []):
+            nodes.append({**task, "recipe_name": recipe.get("recipe_name")})
+            edges.extend((dep, task["id"]) for dep in task.get("dependencies", []))
+    return {"nodes": nodes, "edges": edges}
+
+
+def generate_schedule(
+    dag: Dict[str, Any],
+    kitchen: Dict[str, List[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    """
+    Build a plausible schedule for `dag` on `kitchen`.
+
+    Tasks are placed in dependency order on the earliest-free chef and
+    equipment item. This is a workload fixture for the downstream nodes
+    (detect_conflicts, format_output), not a reference scheduler.
+    """
+    equipment = {
+        "oven": [o["id"] for o in kitchen["ovens"]],
+        "stove": [b["id"] for b in kitchen["burners"]],
+        "microwave": [m["id"] for m in kitchen["microwaves"]],
+    }
+    free_at: Dict[str, float] = {
+        rid: 0.0 for ids in equipment.values() for rid in ids
+    }
+    chef_ids = [c["id"] for c in kitchen["chefs"]]
+    free_at.update({cid: 0.0 for cid in chef_ids})
+
+    end_times: Dict[str, float] = {}
+    scheduled = []
+    for task in _topological_order(dag["nodes"]):
+        ready = max((end_times[d] for d in task.get("dependencies", [])), default=0.0)
+        needed = task.get("resources_needed", [])
+        assigned: Dict[str, str] = {}
+        for kind, ids in equipment.items():
+            if kind in needed and ids:
+                assigned[kind] = min(ids, key=free_at.__getitem__)
+        if "chef" in needed and chef_ids:
+            assigned["chef"] = min(chef_ids, key=free_at.__getitem__)
+        start = max([ready] + [free_at[rid] for rid in assigned.values()])
+        end = start + task["duration_minutes"]
+        for rid in assigned.values():
+            free_at[rid] = end
+        end_times[task["id"]] = end
+        scheduled.append({
+            "id": task["id"],
+            "name": task.get("name"),
+            "start": start,
+            "end": end,
+            "resources": assigned,
+        })
+
+    return {
+        "tasks": scheduled,
+        "timeline": {"makespan": max(end_times.values(), default=0.0)},
+    }
+
+
+def _topological_order(nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Kahn's algorithm over the `dependencies` lists of generated tasks."""
+    by_id = {n["id"]: n for n in nodes}
+    indegree = {n["id"]: len(n.get("dependencies", [])) for n in nodes}
+    dependents: Dict[str, List[str]] = {n["id"]: [] for n in nodes}
+    for n in nodes:
+        for dep in n.get("dependencies", []):
+            dependents[dep].append(n["id"])
+    ready = [tid for tid, deg in indegree.items() if deg == 0]
+    order = []
+    while ready:
+        tid = ready.pop()
+        order.append(by_id[tid])
+        for child in dependents[tid]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+    return order
+
+
+def generate_workload(scenario: str, seed: int = 0) -> Dict[str, Any]:
+    """
+    Generate a complete pipeline workload for a named scenario.
+
+    Returns a dict with the inputs every node needs: `user_input`,
+    `parsed_data`, `kitchen` (defaults.json shape), `recipes`, `tasks`
+    (DAG), `schedule` and `validation`.
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario '{scenario}'. Choose from {sorted(SCENARIOS)}")
+    spec = SCENARIOS[scenario]
+
+    kitchen = generate_kitchen(seed=seed, **spec["kitchen"])
+    recipes = generate_menu(spec["recipes"], spec["tasks_per_recipe"], seed=seed)
+    if "dag" in spec:
+        dag = generate_task_dag(seed=seed, **spec["dag"])
+    else:
+        dag = dag_from_recipes(recipes)
+    guest_count = spec["guest_count"]
+
+    return {
+        "user_input": f"Event for {guest_count} guests: "
+                      + ", ".join(r["recipe_name"] for r in recipes),
+        "parsed_data": {
+            "event_details": {"guest_count": guest_count, "event_type": "dinner"},
+            "recipes_text": [r["recipe_name"] for r in recipes],
+            "constraints": {},
+            "user_overrides": kitchen,
+        },
+        "kitchen": kitchen,
+        "recipes": recipes,
+        "tasks": dag,
+        "schedule": generate_schedule(dag, kitchen),
+        "validation": {
+            "feasible": True,
+            "risk_level": "low",
+            "answers": {},
+            "suggestions": [],
+        },
+    }
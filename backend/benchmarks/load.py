@@ -0,0 +1,362 @@
+"""
+Load test for the HTTP API: throughput, latency percentiles and error rates.
+
+Concurrent clients send a weighted mix of requests (simulate, read the
+kitchen, update the kitchen) for a fixed time or request count. The LLM
+nodes are replaced with stubs that return a generated workload after an
+injected delay, so runs are reproducible and cost nothing. The stubbed
+backend keeps its kitchen and checkpoints in a temporary directory,
+not in the working copy's kitchen.db.
+
+Usage (from backend/):
+    python -m benchmarks.load run                          # drive main.app in-process
+    python -m benchmarks.load run --concurrency 32 --duration 30 --mix simulate=1
+    python -m benchmarks.load serve --port 8001 --workers 4   # stubbed uvicorn server
+    python -m benchmarks.load run --url http://127.0.0.1:8001 --output load.json
+
+In-process runs skip the network but share the CPU with the clients;
+use `serve` + `run --url` to measure a real multi-worker server. The
+report is JSON: totals and per-operation throughput, p50/p95/p99 latency
+and error rates, plus the settings, so reports from two builds can be
+compared.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from graph import create_workflow
+from .generators import SCENARIOS, generate_workload
+from .run import stub_llm_nodes
+
+# Operation → weight in the default request mix
+DEFAULT_MIX: Dict[str, float] = {"simulate": 8, "get_kitchen": 3, "update_kitchen": 1}
+
+# Environment variable carrying the stub settings to `serve` workers
+STUB_ENV = "KITCHENSIM_LOAD_STUB"
+
+
+def latency_stub_nodes(
+    workload: Dict[str, Any],
+    latency_ms: float,
+    jitter: float = 0.0,
+    seed: int = 0,
+) -> Dict[str, Callable]:
+    """
+    LLM node stubs (see benchmarks.run.stub_llm_nodes) that sleep like an API call.
+
+    Each call waits `latency_ms`, spread uniformly by ±`jitter` (a
+    fraction), before returning the workload.
+    """
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def delayed(node: Callable) -> Callable:
+        def run(state):
+            with lock:
+                delay = latency_ms * (1 + jitter * (2 * rng.random() - 1))
+            time.sleep(max(delay, 0.0) / 1000)
+            return node(state)
+        return run
+
+    return {name: delayed(node) for name, node in stub_llm_nodes(workload).items()}
+
+
+def install_stub(
+    scenario: str = "home",
+    llm_latency_ms: float = 200.0,
+    jitter: float = 0.0,
+    seed: int = 0,
+    data_dir: Optional[str] = None,
+) -> Callable[[], None]:
+    """
+    Point this process's backend at the LLM stubs and a scratch data directory.
+
+    Returns:
+        A function that restores the real workflow and stores
+    """
+    import api.simulate
+    from checkpoints import get_checkpoint_store
+    from config import get_settings
+    from history import get_run_history
+    from knowledge_base import get_kitchen_store
+
+    data_dir = data_dir or tempfile.mkdtemp(prefix="kitchensim-load-")
+    env = {
+        "KITCHENSIM_KITCHEN_DB_PATH": str(Path(data_dir) / "kitchen.db"),
+        "KITCHENSIM_CHECKPOINT_DB_PATH": str(Path(data_dir) / "checkpoints.db"),
+        "KITCHENSIM_HISTORY_DB_PATH": str(Path(data_dir) / "history.db"),
+    }
+    saved_env = {key: os.environ.get(key) for key in env}
+    saved_workflow = api.simulate.workflow
+
+    def clear_caches() -> None:
+        for getter in (get_settings, get_kitchen_store, get_checkpoint_store, get_run_history):
+            getter.cache_clear()
+
+    os.environ.update(env)
+    clear_caches()
+    workload = generate_workload(scenario, seed=seed)
+    api.simulate.workflow = create_workflow(
+        node_overrides=latency_stub_nodes(workload, llm_latency_ms, jitter=jitter, seed=seed),
+    )
+
+    def restore() -> None:
+        api.simulate.workflow = saved_workflow
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        clear_caches()
+
+    return restore
+
+
+@contextmanager
+def stubbed_backend(**stub: Any) -> Iterator[None]:
+    """`install_stub` for the duration of a with-block."""
+    restore = install_stub(**stub)
+    try:
+        yield
+    finally:
+        restore()
+
+
+def create_stubbed_app():
+    """App factory for `serve` workers: main.app with the stub from STUB_ENV installed."""
+    install_stub(**json.loads(os.environ[STUB_ENV]))
+    from main import app
+    return app
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def summarize(records: List[Tuple[str, float, int]], elapsed: float) -> Dict[str, Any]:
+    """
+    Throughput, latency percentiles and errors for (operation, ms, status) records.
+
+    Status 0 means the request failed without a response. Anything else
+    below 400 counts as a success.
+    """
+    def stats(subset: List[Tuple[str, float, int]]) -> Dict[str, Any]:
+        latencies = sorted(ms for _, ms, _ in subset)
+        statuses: Dict[str, int] = {}
+        for _, _, status in subset:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        errors = sum(1 for _, _, status in subset if status == 0 or status >= 400)
+        summary: Dict[str, Any] = {
+            "requests": len(subset),
+            "errors": errors,
+            "error_rate": round(errors / len(subset), 4) if subset else 0.0,
+            "throughput_rps": round(len(subset) / elapsed, 2) if elapsed else 0.0,
+            "status": statuses,
+        }
+        if latencies:
+            summary["latency_ms"] = {
+                "p50": round(_percentile(latencies, 0.50), 3),
+                "p95": round(_percentile(latencies, 0.95), 3),
+                "p99": round(_percentile(latencies, 0.99), 3),
+                "max": round(latencies[-1], 3),
+                "mean": round(sum(latencies) / len(latencies), 3),
+            }
+        return summary
+
+    operations = sorted({operation for operation, _, _ in records})
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total": stats(records),
+        "operations": {op: stats([r for r in records if r[0] == op]) for op in operations},
+    }
+
+
+def _request(operation: str, n: int, user_input: str, distinct_inputs: int) -> Tuple[str, str, Optional[dict]]:
+    """(method, path, JSON body) of the n-th request for an operation."""
+    if operation == "simulate":
+        variant = n % distinct_inputs if distinct_inputs else n
+        return "POST", "/api/simulate", {"input": f"{user_input} (request {variant})"}
+    if operation == "get_kitchen":
+        return "GET", "/api/knowledge/kitchen", None
+    if operation == "update_kitchen":
+        return "POST", "/api/knowledge/kitchen/update", {"overrides": {"chef_count": 2 + n % 3}}
+    raise ValueError(f"Unknown operation {operation!r}. Choose from {sorted(DEFAULT_MIX)}")
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    mix: Dict[str, float],
+    concurrency: int = 8,
+    duration: Optional[float] = 10.0,
+    requests: Optional[int] = None,
+    user_input: str = "Dinner",
+    distinct_inputs: int = 0,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Send the request mix from `concurrency` clients until `duration`
+    seconds pass or `requests` have been sent, whichever comes first.
+
+    Args:
+        mix: Operation → relative weight
+        distinct_inputs: Simulate inputs cycle through this many variants
+            (so identical concurrent requests coalesce); 0 makes every input unique
+
+    Returns:
+        `summarize` output for the timed requests
+    """
+    for operation in mix:
+        _request(operation, 0, user_input, distinct_inputs)  # Reject unknown operations up front
+    operations, weights = zip(*mix.items())
+    rng = random.Random(seed)
+    records: List[Tuple[str, float, int]] = []
+    sent = 0
+    deadline = None if duration is None else time.perf_counter() + duration
+
+    async def client_loop() -> None:
+        nonlocal sent
+        while (requests is None or sent < requests) and (deadline is None or time.perf_counter() < deadline):
+            n = sent
+            sent += 1
+            operation = rng.choices(operations, weights)[0]
+            method, path, body = _request(operation, n, user_input, distinct_inputs)
+            begin = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            records.append((operation, (time.perf_counter() - begin) * 1000, status))
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return summarize(records, time.perf_counter() - begin)
+
+
+async def run_load(
+    url: Optional[str] = None,
+    mix: Optional[Dict[str, float]] = None,
+    concurrency: int = 8,
+    duration: Optional[float] = 10.0,
+    requests: Optional[int] = None,
+    scenario: str = "home",
+    llm_latency_ms: float = 200.0,
+    jitter: float = 0.0,
+    distinct_inputs: int = 0,
+    seed: int = 0,
+    timeout: float = 120.0,
+) -> Dict[str, Any]:
+    """
+    Run a load test and return the JSON report.
+
+    Without `url`, main.app is driven in-process with the stubbed LLM
+    nodes installed for the run. With `url`, the server is used as is
+    (start it with `serve` for the stub).
+    """
+    mix = mix or DEFAULT_MIX
+    user_input = generate_workload(scenario, seed=seed)["user_input"]
+    options = dict(
+        mix=mix, concurrency=concurrency, duration=duration, requests=requests,
+        user_input=user_input, distinct_inputs=distinct_inputs, seed=seed,
+    )
+    if url is None:
+        with stubbed_backend(scenario=scenario, llm_latency_ms=llm_latency_ms, jitter=jitter, seed=seed):
+            from main import app
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+                report = await drive(client, **options)
+    else:
+        async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+            report = await drive(client, **options)
+
+    report["meta"] = {
+        "target": url or "in-process",
+        "mix": mix,
+        "concurrency": concurrency,
+        "duration_s": duration,
+        "requests": requests,
+        "scenario": scenario,
+        "llm_latency_ms": llm_latency_ms if url is None else None,
+        "jitter": jitter if url is None else None,
+        "distinct_inputs": distinct_inputs,
+        "seed": seed,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+    return report
+
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    """'simulate=8,get_kitchen=3' → {"simulate": 8.0, "get_kitchen": 3.0}."""
+    mix = {}
+    for part in text.split(","):
+        operation, _, weight = part.partition("=")
+        mix[operation.strip()] = float(weight or 1)
+    return mix
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Kitchen Simulator API load test")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stub_options = argparse.ArgumentParser(add_help=False)
+    stub_options.add_argument("--scenario", choices=sorted(SCENARIOS), default="home",
+                              help="Workload the LLM stubs return")
+    stub_options.add_argument("--llm-latency-ms", type=float, default=200.0, help="Delay per stubbed LLM call")
+    stub_options.add_argument("--jitter", type=float, default=0.0, help="Spread of the delay, as a fraction")
+    stub_options.add_argument("--seed", type=int, default=0)
+
+    run = commands.add_parser("run", parents=[stub_options], help="Send load and report")
+    run.add_argument("--url", default=None, help="Server to load (default: main.app in-process)")
+    run.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX,
+                     help="Weighted operations, e.g. simulate=8,get_kitchen=3,update_kitchen=1")
+    run.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    run.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    run.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    run.add_argument("--distinct-inputs", type=int, default=0,
+                     help="Cycle simulate inputs through this many variants (0: all unique)")
+    run.add_argument("--output", type=Path, default=None, help="Write the JSON report here")
+
+    serve = commands.add_parser("serve", parents=[stub_options], help="Run a stubbed uvicorn server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8001)
+    serve.add_argument("--workers", type=int, default=1)
+
+    args = parser.parse_args(argv)
+    stub = {"scenario": args.scenario, "llm_latency_ms": args.llm_latency_ms, "jitter": args.jitter, "seed": args.seed}
+
+    if args.command == "serve":
+        import uvicorn
+        # Workers share one scratch kitchen and checkpoint store
+        os.environ[STUB_ENV] = json.dumps(dict(stub, data_dir=tempfile.mkdtemp(prefix="kitchensim-load-")))
+        uvicorn.run("benchmarks.load:create_stubbed_app", factory=True, host=args.host, port=args.port,
+                    workers=args.workers, log_level="warning")
+        return 0
+
+    report = asyncio.run(run_load(
+        url=args.url, mix=args.mix, concurrency=args.concurrency, duration=args.duration,
+        requests=args.requests, distinct_inputs=args.distinct_inputs, **stub,
+    ))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    print(text)
+    return 1 if report["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
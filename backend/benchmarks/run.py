@@ -0,0 +1,288 @@
+"""
+Benchmark runner: times each pipeline node and the full workflow.
+
+LLM-backed nodes (parse_input, analyze_recipes, validate) are replaced with
+stubs that return the generated workload, so only our own code is timed.
+
+Usage (from backend/):
+    python -m benchmarks.run                          # all scenarios, compare to baselines
+    python -m benchmarks.run --scenario commercial    # one scenario
+    python -m benchmarks.run --update-baseline        # record new baselines
+    python -m benchmarks.run --output results.json    # also write raw results
+
+Exits with status 1 if any timing regresses past the baseline threshold.
+
+Every run also times a fixed pure-Python reference workload (`calibrate`),
+stored with the baselines as `calibration_ms`. Baselines are scaled by the
+current/recorded calibration ratio before comparing, so a slower machine or
+a busy host does not read as a regression.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from graph import create_workflow
+from history import history_disabled
+from knowledge_base import Kitchen, KitchenView, apply_overrides, default_snapshot
+from nodes import (
+    update_kb_node,
+    build_dag_node,
+    schedule_node,
+    detect_conflicts_node,
+    format_output_node,
+)
+from simulation import CompiledMenu, poisson_tickets, simulate_service
+from .generators import SCENARIOS, generate_workload
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+
+# A timing regresses when it exceeds baseline * threshold AND baseline + min_delta_ms.
+# The absolute floor keeps sub-millisecond stages from flapping on noise.
+DEFAULT_THRESHOLD = 2.0
+DEFAULT_MIN_DELTA_MS = 0.5
+
+# Reference workload size for calibrate (tens of milliseconds)
+CALIBRATION_SIZE = 20000
+
+# Service simulation stage: the scenario's guests arrive as tickets over this many hours
+SERVICE_HOURS = 4.0
+
+# Deterministic (non-LLM) nodes, in pipeline order, with the state keys they read.
+NODE_INPUTS: Dict[str, tuple] = {
+    "update_kb": (update_kb_node, ("parsed_data",)),
+    "build_dag": (build_dag_node, ("parsed_data", "recipes")),
+    "schedule": (schedule_node, ("parsed_data", "kitchen", "tasks")),
+    "detect_conflicts": (detect_conflicts_node, ("parsed_data", "schedule")),
+    "format_output": (format_output_node, ("parsed_data", "schedule", "validation")),
+}
+
+
+def stub_llm_nodes(workload: Dict[str, Any]) -> Dict[str, Callable]:
+    """Build workflow node overrides that return the workload instead of calling Claude."""
+    return {
+        "parse_input": lambda state: {"parsed_data": workload["parsed_data"]},
+        "analyze_recipes": lambda state: {"recipes": workload["recipes"]},
+        "validate": lambda state: {"validation": workload["validation"]},
+    }
+
+
+def time_callable(fn: Callable[[], Any], repeat: int = 20, warmup: int = 2) -> Dict[str, float]:
+    """Time `fn` `repeat` times after `warmup` calls; return stats in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "min_ms": samples[0],
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "runs": repeat,
+    }
+
+
+def run_scenario(scenario: str, repeat: int = 20, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """Time every deterministic node, a service simulation and the stubbed workflow for one scenario."""
+    # Repeats would otherwise time run history lookups, not the scheduler
+    with history_disabled():
+        return _run_scenario(scenario, repeat=repeat, seed=seed)
+
+
+def _run_scenario(scenario: str, repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    workload = generate_workload(scenario, seed=seed)
+    results: Dict[str, Dict[str, float]] = {}
+    # Nodes read the kitchen from state as a snapshot, not the defaults.json-shaped dict
+    inputs = dict(workload, kitchen=apply_overrides(default_snapshot(), workload["kitchen"]))
+
+    for name, (node, keys) in NODE_INPUTS.items():
+        state = {"user_input": workload["user_input"]}
+        state.update({key: inputs[key] for key in keys})
+        results[name] = time_callable(lambda: node(state), repeat=repeat)
+
+    kitchen = KitchenView.from_kitchen(Kitchen(**workload["kitchen"]))
+    menu = CompiledMenu(workload["recipes"])
+    tickets = poisson_tickets(
+        menu.dish_names, workload["parsed_data"]["event_details"]["guest_count"] / SERVICE_HOURS,
+        SERVICE_HOURS, seed=seed,
+    )
+    results["service"] = time_callable(lambda: simulate_service(kitchen, menu, tickets), repeat=repeat)
+
+    stubbed = create_workflow(node_overrides=stub_llm_nodes(workload))
+    initial_state = {"user_input": workload["user_input"]}
+    results["workflow"] = time_callable(lambda: stubbed.invoke(initial_state), repeat=repeat)
+
+    return results
+
+
+def _reference_workload() -> None:
+    # Independent of the backend, so a code change never moves the calibration
+    rng = random.Random(0)
+    values = [rng.random() for _ in range(CALIBRATION_SIZE)]
+    by_key = {f"k{i}": value for i, value in enumerate(values)}
+    ordered = sorted(values, key=lambda value: math.sin(value * 1000))
+    json.loads(json.dumps({"values": ordered, "keys": list(by_key)}))
+
+
+def calibrate(repeat: int = 5) -> float:
+    """Median milliseconds of the fixed reference workload on this machine, now."""
+    return time_callable(_reference_workload, repeat=repeat, warmup=1)["median_ms"]
+
+
+def run_suite(
+    scenarios: Optional[List[str]] = None,
+    repeat: int = 20,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Run the benchmark suite and return results keyed by scenario and stage."""
+    scenarios = scenarios or list(SCENARIOS)
+    # Calibrated before every scenario, to average over the host's load during the run
+    calibrations = []
+    results = {}
+    for name in scenarios:
+        calibrations.append(calibrate())
+        results[name] = run_scenario(name, repeat=repeat, seed=seed)
+    return {
+        "meta": {
+            "seed": seed,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count(),
+            "platform": platform.platform(),
+            "calibration_ms": round(statistics.median(calibrations), 4),
+        },
+        "results": results,
+    }
+
+
+def load_baselines(path: Path = BASELINES_PATH) -> Dict[str, Any]:
+    """Load stored baselines, or an empty baseline set if none exist yet."""
+    if not path.exists():
+        return {"threshold": DEFAULT_THRESHOLD, "min_delta_ms": DEFAULT_MIN_DELTA_MS, "results": {}}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_baselines(suite: Dict[str, Any], path: Path = BASELINES_PATH, merge: bool = True) -> None:
+    """Store median timings from `suite` as the new baselines."""
+    baselines = load_baselines(path) if merge else {
+        "threshold": DEFAULT_THRESHOLD, "min_delta_ms": DEFAULT_MIN_DELTA_MS, "results": {},
+    }
+    # Kept scenarios move to the new calibration, so one scale fits every baseline
+    scale = calibration_scale(suite, baselines)
+    for scenario, stages in baselines["results"].items():
+        if scenario not in suite["results"]:
+            baselines["results"][scenario] = {stage: round(ms * scale, 4) for stage, ms in stages.items()}
+    baselines["meta"] = suite["meta"]
+    for scenario, stages in suite["results"].items():
+        baselines["results"][scenario] = {
+            stage: round(stats["median_ms"], 4) for stage, stats in stages.items()
+        }
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def calibration_scale(suite: Dict[str, Any], baselines: Dict[str, Any]) -> float:
+    """Current over recorded calibration (1.0 unless both runs were calibrated)."""
+    current = suite.get("meta", {}).get("calibration_ms")
+    recorded = baselines.get("meta", {}).get("calibration_ms")
+    if not current or not recorded:
+        return 1.0
+    return current / recorded
+
+
+def compare_to_baselines(
+    suite: Dict[str, Any],
+    baselines: Dict[str, Any],
+    threshold: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Compare suite medians against baselines.
+
+    When both carry a `calibration_ms`, baselines are first scaled by the
+    suite's calibration over the baselines' one.
+
+    Returns:
+        One entry per regressed (scenario, stage) with baseline and current medians.
+        Stages without a baseline are skipped.
+    """
+    threshold = threshold or baselines.get("threshold", DEFAULT_THRESHOLD)
+    min_delta = baselines.get("min_delta_ms", DEFAULT_MIN_DELTA_MS)
+    scale = calibration_scale(suite, baselines)
+    regressions = []
+    for scenario, stages in suite["results"].items():
+        recorded = baselines.get("results", {}).get(scenario, {})
+        for stage, stats in stages.items():
+            if stage not in recorded:
+                continue
+            baseline = recorded[stage] * scale
+            current = stats["median_ms"]
+            if current > baseline * threshold and current > baseline + min_delta:
+                regressions.append({
+                    "scenario": scenario,
+                    "stage": stage,
+                    "baseline_ms": round(baseline, 4),
+                    "current_ms": round(current, 4),
+                    "ratio": round(current / baseline, 2) if baseline else None,
+                })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Kitchen Simulator pipeline benchmarks")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable). Defaults to all.")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per stage")
+    parser.add_argument("--seed", type=int, default=0, help="Workload generator seed")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="Regression ratio vs baseline (default: from baselines.json)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record these results as the new baselines")
+    parser.add_argument("--output", type=Path, default=None, help="Write raw results JSON here")
+    args = parser.parse_args(argv)
+
+    suite = run_suite(args.scenario, repeat=args.repeat, seed=args.seed)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(suite, f, indent=2)
+
+    for scenario, stages in suite["results"].items():
+        print(f"\n{scenario}")
+        for stage, stats in stages.items():
+            print(f"  {stage:<18} median {stats['median_ms']:9.3f} ms   p95 {stats['p95_ms']:9.3f} ms")
+
+    if args.update_baseline:
+        save_baselines(suite)
+        print(f"\nBaselines written to {BASELINES_PATH}")
+        return 0
+
+    baselines = load_baselines()
+    print(f"\nCalibration {suite['meta']['calibration_ms']:.3f} ms: baselines scaled "
+          f"x{calibration_scale(suite, baselines):.2f}")
+    regressions = compare_to_baselines(suite, baselines, args.threshold)
+    if regressions:
+        print("\nRegressions:")
+        for r in regressions:
+            print(f"  {r['scenario']}/{r['stage']}: {r['baseline_ms']} ms → {r['current_ms']} ms (x{r['ratio']})")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
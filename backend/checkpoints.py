@@ -0,0 +1,317 @@
+"""
+Per-node workflow checkpoints in SQLite, for resumable and replayable runs.
+
+Every simulate request is a run with a `run_id`. While a run is active,
+each workflow node's state update is stored as soon as the node returns
+(see `checkpoint_node`), so a failure late in the workflow keeps the
+expensive parse and recipe analysis. Retrying with the same run id
+restores the stored updates and only runs the nodes that hadn't finished.
+A replay restores just the LLM nodes' updates and re-runs everything
+else, to debug the deterministic stages without calling the LLM again.
+
+Updates are stored as zlib-compressed JSON. The kitchen snapshot is
+stored as a reference when it is one of the shared default snapshots
+and as its resource dump otherwise. Runs are evicted by age and by total
+stored size, oldest first.
+"""
+
+import contextvars
+import json
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional
+from config import get_settings
+from knowledge_base import KitchenSnapshot, default_snapshot
+
+# Nodes that call the LLM: a replay restores these and re-runs the rest
+LLM_NODES = frozenset({"parse_input", "analyze_recipes", "validate"})
+
+# Run status
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_active_run: contextvars.ContextVar[Optional["ActiveRun"]] = contextvars.ContextVar(
+    "active_run", default=None
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    user_input TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runs_updated ON runs (updated);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    node TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (run_id, node)
+);
+"""
+
+
+def encode_update(update: Dict[str, Any]) -> bytes:
+    """Compact form of a node's state update."""
+    values = dict(update)
+    kitchen = values.get("kitchen")
+    if isinstance(kitchen, KitchenSnapshot):
+        if kitchen is default_snapshot(kitchen.kitchen_type):
+            values["kitchen"] = {"default": kitchen.kitchen_type, "version": kitchen.version}
+        else:
+            values["kitchen"] = kitchen.to_dict()
+    return zlib.compress(json.dumps(values, separators=(",", ":")).encode())
+
+
+def decode_update(data: bytes) -> Dict[str, Any]:
+    """Inverse of `encode_update`."""
+    values = json.loads(zlib.decompress(data))
+    kitchen = values.get("kitchen")
+    if isinstance(kitchen, dict):
+        if "default" in kitchen:
+            snapshot = default_snapshot(kitchen["default"])
+            if snapshot.version != kitchen["version"]:
+                raise ValueError(
+                    f"Checkpointed default kitchen {kitchen['default']!r} has changed "
+                    f"({kitchen['version']} → {snapshot.version})"
+                )
+            values["kitchen"] = snapshot
+        else:
+            values["kitchen"] = KitchenSnapshot.from_dict(kitchen)
+    return values
+
+
+class ActiveRun:
+    """
+    A run being executed with checkpoints.
+
+    Use as a context manager around the workflow invocation: inside it,
+    checkpointed nodes return the `restored` update for their name when
+    there is one, and (when `record` is set) store the updates of the
+    nodes that do run. On exit the run is marked done or failed.
+    """
+
+    def __init__(
+        self,
+        store: "CheckpointStore",
+        run_id: str,
+        user_input: str,
+        restored: Dict[str, Dict[str, Any]],
+        record: bool,
+    ):
+        self.store = store
+        self.run_id = run_id
+        self.user_input = user_input
+        self.restored = restored
+        self.record = record
+        self._token = None
+
+    def __enter__(self) -> "ActiveRun":
+        self._token = _active_run.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _active_run.reset(self._token)
+        if self.record:
+            self.store.finish(self.run_id, FAILED if exc_type else DONE)
+
+
+class CheckpointStore:
+    """
+    SQLite store of per-node updates keyed by run id.
+
+    One connection is shared by all threads behind a lock. Runs not
+    touched for `max_age` seconds are evicted, then the oldest runs until
+    the stored updates total at most `max_bytes`. Eviction runs on the
+    first `start` and then every `evict_every` starts, so the store can
+    hold up to that many runs more than the budget in between.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age: float = 86400.0,
+        max_bytes: int = 64 * 1024 * 1024,
+        evict_every: int = 50,
+    ):
+        self.path = path
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self._starts = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")  # Checkpoints may be lost on power failure, not corrupted
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(_SCHEMA)
+
+    def start(self, user_input: str, run_id: Optional[str] = None) -> ActiveRun:
+        """
+        Begin a new run, or resume `run_id` if it has checkpoints.
+
+        Raises:
+            ValueError: If `run_id` belongs to a different input
+        """
+        with self._lock:
+            due = self._starts % max(1, self.evict_every) == 0
+            self._starts += 1
+        if due:
+            self.evict()
+        now = time.time()
+        with self._lock:
+            row = None
+            if run_id is not None:
+                row = self._db.execute("SELECT user_input FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            else:
+                run_id = uuid.uuid4().hex
+            if row is None:
+                self._db.execute(
+                    "INSERT INTO runs (run_id, user_input, status, created, updated) VALUES (?, ?, ?, ?, ?)",
+                    (run_id, user_input, RUNNING, now, now),
+                )
+            elif row[0] != user_input:
+                raise ValueError(f"Run {run_id} was started with a different input")
+            else:
+                self._db.execute("UPDATE runs SET status = ?, updated = ? WHERE run_id = ?", (RUNNING, now, run_id))
+        return ActiveRun(self, run_id, user_input, self.load(run_id), record=True)
+
+    def replay(self, run_id: str) -> Optional[ActiveRun]:
+        """
+        Replay a stored run: its LLM nodes' updates are restored, every
+        other node runs again and nothing is stored. An LLM node the run
+        never finished runs live. None if the run is unknown.
+        """
+        run = self.get_run(run_id)
+        if run is None:
+            return None
+        return ActiveRun(self, run_id, run["user_input"], self.load(run_id, nodes=LLM_NODES), record=False)
+
+    def save(self, run_id: str, node: str, update: Dict[str, Any]) -> None:
+        """Store one node's update (replacing an earlier one for the same node)."""
+        data = encode_update(update)
+        with self._lock:
+            # Take the write lock up front: a deferred transaction that reads first
+            # fails outright when another worker commits before it writes
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                old = self._db.execute(
+                    "SELECT length(data) FROM checkpoints WHERE run_id = ? AND node = ?", (run_id, node)
+                ).fetchone()
+                seq = self._db.execute(
+                    "SELECT COALESCE(MAX(seq), 0) + 1 FROM checkpoints WHERE run_id = ?", (run_id,)
+                ).fetchone()[0]
+                self._db.execute(
+                    "INSERT OR REPLACE INTO checkpoints (run_id, seq, node, data) VALUES (?, ?, ?, ?)",
+                    (run_id, seq, node, data),
+                )
+                self._db.execute(
+                    "UPDATE runs SET bytes = bytes + ?, updated = ? WHERE run_id = ?",
+                    (len(data) - (old[0] if old else 0), time.time(), run_id),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def load(self, run_id: str, nodes: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Stored updates of a run by node name (optionally only `nodes`)."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT node, data FROM checkpoints WHERE run_id = ? ORDER BY seq", (run_id,)
+            ).fetchall()
+        wanted = set(nodes) if nodes is not None else None
+        return {node: decode_update(data) for node, data in rows if wanted is None or node in wanted}
+
+    def finish(self, run_id: str, status: str) -> None:
+        """Record how a run ended."""
+        with self._lock:
+            self._db.execute("UPDATE runs SET status = ?, updated = ? WHERE run_id = ?", (status, time.time(), run_id))
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Run metadata and its checkpointed nodes in completion order, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT user_input, status, created, updated, bytes FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            nodes = [node for (node,) in self._db.execute(
+                "SELECT node FROM checkpoints WHERE run_id = ? ORDER BY seq", (run_id,)
+            )]
+        user_input, status, created, updated, size = row
+        return {
+            "run_id": run_id,
+            "user_input": user_input,
+            "status": status,
+            "created": created,
+            "updated": updated,
+            "bytes": size,
+            "nodes": nodes,
+        }
+
+    def evict(self) -> int:
+        """Drop expired runs, then the oldest until under `max_bytes`. Returns runs dropped."""
+        with self._lock:
+            dropped = self._db.execute(
+                "DELETE FROM runs WHERE updated < ?", (time.time() - self.max_age,)
+            ).rowcount
+            total = self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM runs").fetchone()[0]
+            if total > self.max_bytes:
+                oldest = []
+                for run_id, size in self._db.execute("SELECT run_id, bytes FROM runs ORDER BY updated"):
+                    if total <= self.max_bytes:
+                        break
+                    oldest.append((run_id,))
+                    total -= size
+                self._db.executemany("DELETE FROM runs WHERE run_id = ?", oldest)
+                dropped += len(oldest)
+        return dropped
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+
+def checkpoint_node(name: str, node: Callable[[dict], Optional[dict]]) -> Callable[[dict], dict]:
+    """
+    Wrap a workflow node so it takes part in the active run, if any:
+    restored updates are returned without running the node, fresh ones
+    are stored.
+    """
+    def wrapper(state: dict) -> dict:
+        run = _active_run.get()
+        if run is None:
+            return node(state)
+        restored = run.restored.get(name)
+        if restored is not None:
+            return restored
+        update = dict(node(state) or {})
+        if run.record:
+            run.store.save(run.run_id, name, update)
+        return update
+
+    wrapper.__name__ = getattr(node, "__name__", name)
+    return wrapper
+
+
+@lru_cache
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """Get the process-wide checkpoint store (None when checkpointing is disabled)."""
+    settings = get_settings()
+    if not settings.checkpoints_enabled:
+        return None
+    return CheckpointStore(
+        settings.checkpoint_db_path,
+        max_age=settings.checkpoint_max_age_seconds,
+        max_bytes=settings.checkpoint_max_bytes,
+        evict_every=settings.checkpoint_evict_every,
+    )
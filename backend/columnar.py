@@ -0,0 +1,265 @@
+"""
+Columnar export of schedules, task DAGs and simulation results.
+
+The JSON responses carry one nested dict per task, repeating every key
+and resource id. For bulk consumers the same data is exported as typed
+tables, one array per field, in two formats:
+
+- NDJSON (`application/x-ndjson`): per table, a header line
+  {"table", "rows", "columns": [[name, type], ...]} followed by one JSON
+  array per row in column order. Streamable, and readable with nothing
+  but a JSON parser.
+- Binary (`application/vnd.kitchensim.columns`): the magic `KSCOL1`, a
+  little-endian u32 header length and a JSON header describing every
+  table and column, then one little-endian array per column, each
+  8-byte aligned. String columns are dictionary encoded: the header's
+  `strings` list holds every distinct string once (task ids are shared
+  by the schedule, tasks and edges tables) and the arrays hold i32
+  codes into it.
+
+Column types and how nulls are stored in the binary arrays:
+`f64` (float64, NaN), `i32` (int32, -1; only non-negative values are
+exported), `str` (i32 dictionary code, -1). NDJSON uses JSON null.
+`decode_binary` reads the binary format back into Python lists.
+"""
+
+import json
+import math
+import struct
+import sys
+from array import array
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from scheduler import lane_entries
+
+NDJSON = "application/x-ndjson"
+BINARY = "application/vnd.kitchensim.columns"
+
+MAGIC = b"KSCOL1"
+
+# NDJSON rows encoded per yielded chunk
+_NDJSON_CHUNK_ROWS = 1000
+
+# Column type → array typecode
+_TYPECODES = {"f64": "d", "i32": "i", "str": "i"}
+
+# Schedule resource kinds, exported as one column each
+RESOURCE_KINDS = ("oven", "stove", "microwave", "chef")
+
+
+class Table:
+    """A named set of equal-length typed columns."""
+    __slots__ = ("name", "rows", "columns")
+
+    def __init__(self, name: str, rows: int):
+        self.name = name
+        self.rows = rows
+        self.columns: List[Tuple[str, str, List[Any]]] = []
+
+    def add(self, name: str, type: str, values: List[Any]) -> "Table":
+        """Append a column (`type`: f64, i32 or str; None for nulls)."""
+        if type not in _TYPECODES:
+            raise ValueError(f"Unknown column type {type!r}")
+        if len(values) != self.rows:
+            raise ValueError(f"Column {name!r} has {len(values)} values, table {self.name!r} has {self.rows} rows")
+        self.columns.append((name, type, values))
+        return self
+
+    def to_dict(self) -> Dict[str, List[Any]]:
+        """Column name → values."""
+        return {name: values for name, _, values in self.columns}
+
+
+def schedule_table(schedule: Union[Dict[str, Any], Sequence[Dict[str, Any]]]) -> Table:
+    """
+    One row per schedule entry (the `schedule` state value or its `tasks`),
+    and per lane of a batched task (see scheduler.batching.lane_entries).
+
+    Resources become one column per kind; `missing_resources` is a
+    comma-separated string. Batch columns are only added when some entry
+    is batched.
+    """
+    entries = lane_entries(schedule.get("tasks", []) if isinstance(schedule, dict) else schedule)
+    table = Table("schedule", len(entries))
+    for field in ("id", "name", "recipe_name", "task_type"):
+        table.add(field, "str", [entry.get(field) for entry in entries])
+    for field in ("ready", "start", "end"):
+        table.add(field, "f64", [entry.get(field) for entry in entries])
+    resources = [entry.get("resources") or {} for entry in entries]
+    for kind in RESOURCE_KINDS:
+        table.add(kind, "str", [held.get(kind) for held in resources])
+    table.add("missing_resources", "str", [
+        ",".join(entry["missing_resources"]) if entry.get("missing_resources") else None for entry in entries
+    ])
+    batches = [entry.get("batch") for entry in entries]
+    if any(batches):
+        table.add("batch_task", "str", [batch and batch["task"] for batch in batches])
+        table.add("batch_loads", "i32", [batch and batch["loads"] for batch in batches])
+        table.add("batch_load_minutes", "f64", [batch and batch["load_minutes"] for batch in batches])
+        table.add("batch_load_units", "i32", [batch and batch["load_units"] for batch in batches])
+        table.add("batch_first_unit", "i32", [batch and batch["units"][0] for batch in batches])
+        table.add("batch_last_unit", "i32", [batch and batch["units"][1] for batch in batches])
+    return table
+
+
+def dag_tables(dag: Dict[str, Any]) -> List[Table]:
+    """The `tasks` state value as a `tasks` table (one row per node) and an `edges` table."""
+    nodes = dag.get("nodes", [])
+    tasks = Table("tasks", len(nodes))
+    for field in ("id", "name", "recipe_name", "task_type"):
+        tasks.add(field, "str", [node.get(field) for node in nodes])
+    tasks.add("duration_minutes", "f64", [node.get("duration_minutes") for node in nodes])
+    tasks.add("quantity", "i32", [int(node.get("quantity") or 1) for node in nodes])
+    tasks.add("resources_needed", "str", [",".join(node.get("resources_needed", [])) for node in nodes])
+    edges = dag.get("edges", [])
+    return [
+        tasks,
+        Table("edges", len(edges))
+        .add("before", "str", [before for before, _ in edges])
+        .add("after", "str", [after for _, after in edges]),
+    ]
+
+
+def simulation_tables(result: Dict[str, Any]) -> List[Table]:
+    """`schedule`, `tasks` and `edges` tables of a final workflow state."""
+    return [schedule_table(result.get("schedule") or {})] + dag_tables(result.get("tasks") or {})
+
+
+def service_tables(report: Dict[str, Any]) -> List[Table]:
+    """`tickets` (when the report has ticket times) and `chefs` tables of a service simulation."""
+    tables = []
+    times = report.get("ticket_times")
+    if times is not None:
+        tables.append(
+            Table("tickets", len(times))
+            .add("ticket_id", "str", [t["ticket_id"] for t in times])
+            .add("arrival_minutes", "f64", [t["arrival_minutes"] for t in times])
+            .add("minutes", "f64", [t["minutes"] for t in times])
+        )
+    chefs = report.get("chefs", {})
+    tables.append(
+        Table("chefs", len(chefs))
+        .add("id", "str", list(chefs))
+        .add("utilization", "f64", [c["utilization"] for c in chefs.values()])
+        .add("busy_minutes", "f64", [c["busy_minutes"] for c in chefs.values()])
+        .add("tasks", "i32", [c["tasks"] for c in chefs.values()])
+    )
+    return tables
+
+
+def encode_ndjson(tables: Iterable[Table]) -> Iterator[bytes]:
+    """NDJSON lines (as bytes), table by table."""
+    for table in tables:
+        yield json.dumps({
+            "table": table.name,
+            "rows": table.rows,
+            "columns": [[name, type] for name, type, _ in table.columns],
+        }, separators=(",", ":")).encode() + b"\n"
+        encode_row = json.JSONEncoder(separators=(",", ":")).encode
+        rows = zip(*(values for _, _, values in table.columns))
+        # Rows in chunks, so a stream yields a few large pieces rather than one per row
+        for begin in range(0, table.rows, _NDJSON_CHUNK_ROWS):
+            chunk = map(encode_row, islice(rows, _NDJSON_CHUNK_ROWS))
+            yield ("\n".join(chunk) + "\n").encode()
+
+
+def _column_array(type: str, values: List[Any], strings: Dict[str, int]) -> array:
+    """A column as its binary array; `str` values are coded through the shared `strings`."""
+    if type == "f64":
+        return array("d", [math.nan if value is None else value for value in values])
+    if type == "i32":
+        return array("i", [-1 if value is None else value for value in values])
+    return array("i", [-1 if value is None else strings.setdefault(value, len(strings)) for value in values])
+
+
+def encode_binary(tables: Iterable[Table]) -> bytes:
+    """The binary columnar format (see the module docstring)."""
+    strings: Dict[str, int] = {}
+    described_tables = []
+    buffers: List[bytes] = []
+    offset = 0
+    for table in tables:
+        described = []
+        for name, type, values in table.columns:
+            column = _column_array(type, values, strings)
+            if sys.byteorder == "big":
+                column.byteswap()
+            data = column.tobytes()
+            described.append({"name": name, "type": type, "offset": offset, "length": len(data)})
+            padding = -len(data) % 8
+            buffers.append(data + b"\0" * padding)
+            offset += len(data) + padding
+        described_tables.append({"name": table.name, "rows": table.rows, "columns": described})
+
+    header = {"strings": list(strings), "tables": described_tables}
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    prefix_length = len(MAGIC) + 4 + len(header_bytes)
+    padding = -prefix_length % 8  # Column offsets count from the 8-aligned start of the data
+    return b"".join([MAGIC, struct.pack("<I", len(header_bytes) + padding), header_bytes, b" " * padding] + buffers)
+
+
+def decode_binary(data: bytes) -> Dict[str, Dict[str, List[Any]]]:
+    """
+    Read the binary format back: table name → column name → values (nulls as None).
+
+    Raises:
+        ValueError: If `data` is not in the binary columnar format
+    """
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a columnar export")
+    (header_length,) = struct.unpack_from("<I", data, len(MAGIC))
+    body = len(MAGIC) + 4 + header_length
+    header = json.loads(data[len(MAGIC) + 4:body])
+    strings = header["strings"]
+    tables: Dict[str, Dict[str, List[Any]]] = {}
+    for table in header["tables"]:
+        columns = tables[table["name"]] = {}
+        for column in table["columns"]:
+            values = array(_TYPECODES[column["type"]])
+            values.frombytes(data[body + column["offset"]:body + column["offset"] + column["length"]])
+            if sys.byteorder == "big":
+                values.byteswap()
+            if column["type"] == "f64":
+                columns[column["name"]] = [None if math.isnan(v) else v for v in values]
+            elif column["type"] == "i32":
+                columns[column["name"]] = [None if v < 0 else v for v in values]
+            else:
+                columns[column["name"]] = [None if code < 0 else strings[code] for code in values]
+    return tables
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """
+    The columnar media type an Accept header prefers, or None for JSON.
+
+    Only NDJSON, the binary type, JSON and wildcards are considered; the
+    highest quality wins, earlier entries first on ties.
+    """
+    if not accept:
+        return None
+    ranked = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type in (NDJSON, BINARY, "application/json", "application/*", "*/*") and quality > 0:
+            ranked.append((-quality, position, media_type))
+    if not ranked:
+        return None
+    best = min(ranked)[2]
+    return best if best in (NDJSON, BINARY) else None
+
+
+def encode(tables: List[Table], media_type: str) -> Union[bytes, Iterator[bytes]]:
+    """Encode tables as `media_type`: bytes for the binary format, an iterator of chunks for NDJSON."""
+    if media_type == BINARY:
+        return encode_binary(tables)
+    if media_type == NDJSON:
+        return encode_ndjson(tables)
+    raise ValueError(f"Unsupported export type {media_type!r}")
@@ -0,0 +1,65 @@
+"""
+Runtime configuration for the Kitchen Simulator backend.
+
+Values come from environment variables prefixed with KITCHENSIM_
+(e.g. KITCHENSIM_TRACE_MEMORY=1) or from the .env file.
+"""
+
+from functools import lru_cache
+from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Backend settings."""
+    model_config = SettingsConfigDict(env_prefix="KITCHENSIM_", env_file=".env", extra="ignore")
+
+    # Instrumentation
+    trace_memory: bool = False  # Record per-node allocations with tracemalloc (adds overhead)
+    
+    # Deployment
+    workers: int = 1  # uvicorn worker processes for `python main.py`
+
+    # Kitchen configuration shared by all workers (/api/knowledge, simulation defaults)
+    kitchen_db_path: str = "kitchen.db"
+
+    # Workflow
+    workflow_branch_workers: int = 8  # Threads for parallel workflow branches (shared by all requests)
+
+    # Multi-location scheduling (scheduler.coordinator)
+    coordinator_workers: int = 0  # Processes scheduling locations in parallel (0: one per CPU, 1: in-process)
+
+    # Per-node workflow checkpoints (resume with `run_id`, replay at /api/runs/{run_id}/replay)
+    checkpoints_enabled: bool = True
+    checkpoint_db_path: str = "checkpoints.db"
+    checkpoint_max_age_seconds: int = 86400
+    checkpoint_max_bytes: int = 64 * 1024 * 1024  # Oldest runs are evicted beyond this
+    checkpoint_evict_every: int = 50  # Runs started between evictions
+
+    # Past schedules reused for repeat menus and warm starts (history.py)
+    history_enabled: bool = True
+    history_db_path: str = "history.db"
+    history_max_runs: int = 1000  # Least recently used runs are evicted beyond this
+    history_min_similarity: float = 0.5  # Jaccard similarity of dish sets needed for a warm start
+
+    # On-demand request profiling (/api/simulate?profile=true, /api/admin/profiles)
+    profiling_enabled: bool = False
+    admin_token: Optional[str] = None  # Required in X-Admin-Token when set
+    profile_sample_interval_ms: float = 1.0
+    profile_store_size: int = 20  # Profiles kept before the oldest is evicted
+    profile_max_age_seconds: int = 3600
+
+    # Indexed schedules served by /api/schedules/{schedule_id}
+    schedule_store_size: int = 50  # Schedules kept before the oldest is evicted
+    schedule_max_age_seconds: int = 3600
+
+    # Interactive sessions pushing schedule deltas (/api/sessions)
+    session_store_size: int = 100  # Sessions kept before the least recently used is closed
+    session_max_age_seconds: int = 3600  # Idle time before a session is closed
+    session_delta_history: int = 100  # Deltas kept for clients catching up
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Get the process-wide settings instance."""
+    return Settings()
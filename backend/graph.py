@@ -2,8 +2,14 @@
 LangGraph workflow for Kitchen Simulator.
 """
 
-from typing import Literal
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence
 from langgraph.graph import StateGraph, END
+from checkpoints import checkpoint_node
+from config import get_settings
+from metrics import instrument_node
 from state import KitchenSimulatorState
 from nodes import (
     parse_input_node,
@@ -16,47 +22,164 @@ from nodes import (
     format_output_node,
 )
 
+# Workflow stages in order. A stage is a node name, or (stage name,
+# branches) where each branch is a chain of nodes that only reads what
+# earlier stages wrote; the branches run in parallel and are joined
+# before the next stage.
+STAGES: List[Any] = [
+    "parse_input",
+    ("prepare", [["update_kb"], ["analyze_recipes", "build_dag"]]),
+    "schedule_tasks",
+    ("review", [["validate"], ["detect_conflicts"]]),
+    "format_output",
+]
 
-def create_workflow() -> StateGraph:
+
+@lru_cache
+def _branch_executor() -> ThreadPoolExecutor:
+    """Threads for the extra branches of parallel stages (the first runs inline)."""
+    return ThreadPoolExecutor(
+        max_workers=get_settings().workflow_branch_workers,
+        thread_name_prefix="workflow-branch",
+    )
+
+
+def _chain(nodes: Sequence[Callable[[dict], dict]]) -> Callable[[dict], dict]:
+    """Run nodes in sequence, each seeing the updates of those before it."""
+    def run(state: dict) -> dict:
+        state = dict(state)
+        merged: Dict[str, Any] = {"node_timings": []}
+        for node in nodes:
+            update = node(state)
+            for key, value in update.items():
+                if key == "node_timings":
+                    merged[key] = merged[key] + value
+                else:
+                    merged[key] = state[key] = value
+        return merged
+    return run
+
+
+def parallel_node(name: str, branches: Sequence[Sequence[Callable[[dict], dict]]]) -> Callable[[dict], dict]:
+    """
+    Combine independent node chains into one workflow node.
+
+    Every branch gets the same input state. Their updates are merged in
+    branch order: `node_timings` records are concatenated, and any other
+    key may only be written by one branch.
+
+    Args:
+        name: Stage name used in error messages
+        branches: Node chains (already instrumented) to run side by side
+
+    Raises:
+        ValueError: If two branches write the same state key
+    """
+    chains = [_chain(branch) for branch in branches]
+
+    def run(state: dict) -> dict:
+        # Copy the context so the branch threads see the request's profiler and run
+        futures = [
+            _branch_executor().submit(contextvars.copy_context().run, chain, state)
+            for chain in chains[1:]
+        ]
+        try:
+            updates = [chains[0](state)]
+        finally:
+            # Wait for every branch before raising, so none outlives the stage
+            results = [future.exception() or future.result() for future in futures]
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+            updates.append(result)
+
+        merged: Dict[str, Any] = {"node_timings": []}
+        for update in updates:
+            for key, value in update.items():
+                if key == "node_timings":
+                    merged[key] += value
+                elif key in merged:
+                    raise ValueError(f"Parallel stage {name!r}: more than one branch writes {key!r}")
+                else:
+                    merged[key] = value
+        return merged
+
+    run.__name__ = name
+    return run
+
+
+def create_workflow(node_overrides: Optional[Dict[str, Callable]] = None) -> StateGraph:
     """
     Create and configure the LangGraph workflow.
-    
+
     Node flow:
     1. parse_input → extracts structured data
-    2. update_kb → merges user overrides
-    3. analyze_recipes → parses recipes into tasks
-    4. build_dag → creates dependency graph
-    5. schedule → allocates resources and creates timeline
-    6. validate → checks feasibility
-    7. detect_conflicts → finds bottlenecks
-    8. format_output → creates readable timeline
+    2. in parallel:
+       - update_kb → merges user overrides
+       - analyze_recipes → parses recipes into tasks,
+         then build_dag → creates dependency graph
+    3. schedule → allocates resources and creates timeline
+    4. in parallel:
+       - validate → checks feasibility
+       - detect_conflicts → finds bottlenecks
+    5. format_output → creates readable timeline
+
+    Parallel stages run as one graph node (see STAGES and parallel_node),
+    so a stage takes as long as its slowest branch.
+
+    Every node is wrapped with timing instrumentation (see metrics.py);
+    timings land in the metrics registry and in `state.node_timings`.
+    Inside a checkpointed run (see checkpoints.py) each node's update is
+    also stored, or restored instead of running the node.
+
+    Args:
+        node_overrides: Optional mapping of node name → replacement function,
+            e.g. {"parse_input": stub} to run the graph without LLM calls
+            (used by the benchmark suite).
     """
+    nodes = {
+        "parse_input": parse_input_node,
+        "update_kb": update_kb_node,
+        "analyze_recipes": analyze_recipes_node,
+        "build_dag": build_dag_node,
+        "schedule_tasks": schedule_node,  # Renamed to avoid conflict with state.schedule
+        "validate": validate_node,
+        "detect_conflicts": detect_conflicts_node,
+        "format_output": format_output_node,
+    }
+    if node_overrides:
+        unknown = set(node_overrides) - set(nodes)
+        if unknown:
+            raise ValueError(f"Unknown workflow nodes: {sorted(unknown)}")
+        nodes.update(node_overrides)
+
+    trace_memory = get_settings().trace_memory
+    instrumented = {
+        name: instrument_node(name, checkpoint_node(name, node), trace_memory=trace_memory)
+        for name, node in nodes.items()
+    }
     workflow = StateGraph(KitchenSimulatorState)
-    
-    # Add nodes (using different names to avoid conflicts with state attributes)
-    workflow.add_node("parse_input", parse_input_node)
-    workflow.add_node("update_kb", update_kb_node)
-    workflow.add_node("analyze_recipes", analyze_recipes_node)
-    workflow.add_node("build_dag", build_dag_node)
-    workflow.add_node("schedule_tasks", schedule_node)  # Renamed to avoid conflict with state.schedule
-    workflow.add_node("validate", validate_node)
-    workflow.add_node("detect_conflicts", detect_conflicts_node)
-    workflow.add_node("format_output", format_output_node)
-    
-    # Define edges (linear flow for now)
-    workflow.set_entry_point("parse_input")
-    workflow.add_edge("parse_input", "update_kb")
-    workflow.add_edge("update_kb", "analyze_recipes")
-    workflow.add_edge("analyze_recipes", "build_dag")
-    workflow.add_edge("build_dag", "schedule_tasks")
-    workflow.add_edge("schedule_tasks", "validate")
-    workflow.add_edge("validate", "detect_conflicts")
-    workflow.add_edge("detect_conflicts", "format_output")
-    workflow.add_edge("format_output", END)
-    
+
+    # Add stages (using different names to avoid conflicts with state attributes)
+    names = []
+    for stage in STAGES:
+        if isinstance(stage, str):
+            workflow.add_node(stage, instrumented[stage])
+            names.append(stage)
+        else:
+            name, branches = stage
+            workflow.add_node(name, parallel_node(
+                name, [[instrumented[node] for node in branch] for branch in branches]
+            ))
+            names.append(name)
+
+    workflow.set_entry_point(names[0])
+    for current, following in zip(names, names[1:]):
+        workflow.add_edge(current, following)
+    workflow.add_edge(names[-1], END)
+
     return workflow.compile()
 
 
 # Create the compiled workflow instance
 workflow = create_workflow()
-
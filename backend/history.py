@@ -0,0 +1,224 @@
+"""
+Historical schedules in SQLite, for planning repeat and similar menus.
+
+Every schedule the workflow computes is kept with its fingerprints: the
+task DAG (which already reflects the guest count), the kitchen version
+and the scheduler code. `schedule_node` looks a new DAG up before
+scheduling:
+
+- An exact match (same DAG, kitchen and scheduler code, e.g. the same
+  weekly event) returns the stored schedule without scheduling.
+- Otherwise the closest past menu by dish set (Jaccard similarity over
+  an inverted dish → runs index) warm-starts the scheduler: its start
+  times are used as the task order, and the better of that schedule and
+  the cold one is kept.
+
+Runs are evicted least recently used first beyond `max_runs`.
+"""
+
+import contextvars
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from config import get_settings
+
+_disabled: contextvars.ContextVar[bool] = contextvars.ContextVar("history_disabled", default=False)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dag_key TEXT NOT NULL,
+    kitchen_version TEXT NOT NULL,
+    code_version TEXT NOT NULL,
+    guest_count INTEGER NOT NULL,
+    dish_count INTEGER NOT NULL,
+    makespan REAL NOT NULL,
+    schedule BLOB NOT NULL,
+    created REAL NOT NULL,
+    used REAL NOT NULL,
+    UNIQUE (dag_key, kitchen_version, code_version)
+);
+CREATE INDEX IF NOT EXISTS runs_used ON runs (used);
+CREATE TABLE IF NOT EXISTS dishes (
+    dish TEXT NOT NULL,
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    PRIMARY KEY (dish, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS dishes_run ON dishes (run_id);
+"""
+
+
+def normalize_dish(name: str) -> str:
+    """Dish name with whitespace and case normalized."""
+    return " ".join(name.split()).casefold()
+
+
+def menu_dishes(dag: Dict[str, Any]) -> List[str]:
+    """Normalized, sorted dish names of a DAG (the `tasks` state value)."""
+    return sorted({normalize_dish(node["recipe_name"]) for node in dag.get("nodes", []) if node.get("recipe_name")})
+
+
+def dag_fingerprint(dag: Dict[str, Any]) -> str:
+    """Content hash of a DAG: equal fingerprints schedule identically on the same kitchen."""
+    return hashlib.sha1(
+        json.dumps(dag, sort_keys=True, separators=(",", ":"), default=str).encode()
+    ).hexdigest()[:20]
+
+
+@lru_cache
+def scheduler_version() -> str:
+    """Hash of the scheduler's source, so a changed scheduler doesn't reuse old schedules."""
+    import scheduler
+
+    digest = hashlib.sha1()
+    for path in sorted(Path(scheduler.__file__).parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def start_hints(schedule: Dict[str, Any]) -> Dict[str, float]:
+    """Task id → start (relative to the timeline start) in a schedule."""
+    origin = (schedule.get("timeline") or {}).get("start", 0.0)
+    hints: Dict[str, float] = {}
+    for entry in schedule.get("tasks", []):
+        hints[entry["id"]] = entry["start"] - origin
+    return hints
+
+
+class RunHistory:
+    """
+    SQLite store of computed schedules, indexed by fingerprint and by dish.
+
+    One connection is shared by all threads behind a lock.
+    """
+
+    def __init__(self, path: str, max_runs: int = 1000):
+        self.path = path
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")  # A lost run is recomputed, never wrong
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(_SCHEMA)
+
+    def record(
+        self,
+        dag: Dict[str, Any],
+        kitchen_version: str,
+        schedule: Dict[str, Any],
+        guest_count: int = 0,
+    ) -> int:
+        """Store a schedule (replacing one with the same fingerprints). Returns its run id."""
+        dishes = menu_dishes(dag)
+        data = zlib.compress(json.dumps(schedule, separators=(",", ":")).encode())
+        makespan = float((schedule.get("timeline") or {}).get("makespan", 0.0))
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                run_id = self._db.execute(
+                    "INSERT INTO runs (dag_key, kitchen_version, code_version, guest_count, dish_count,"
+                    " makespan, schedule, created, used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (dag_key, kitchen_version, code_version) DO UPDATE SET"
+                    " schedule = excluded.schedule, makespan = excluded.makespan, used = excluded.used"
+                    " RETURNING run_id",
+                    (dag_fingerprint(dag), kitchen_version, scheduler_version(), guest_count, len(dishes),
+                     makespan, data, now, now),
+                ).fetchone()[0]
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO dishes (dish, run_id) VALUES (?, ?)", [(dish, run_id) for dish in dishes]
+                )
+                self._db.execute(
+                    "DELETE FROM runs WHERE run_id IN (SELECT run_id FROM runs ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_runs,),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return run_id
+
+    def exact(self, dag: Dict[str, Any], kitchen_version: str) -> Optional[Dict[str, Any]]:
+        """{"run_id", "schedule"} of a stored run of this DAG on this kitchen and scheduler, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT run_id, schedule FROM runs WHERE dag_key = ? AND kitchen_version = ? AND code_version = ?",
+                (dag_fingerprint(dag), kitchen_version, scheduler_version()),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE runs SET used = ? WHERE run_id = ?", (time.time(), row[0]))
+        return {"run_id": row[0], "schedule": json.loads(zlib.decompress(row[1]))}
+
+    def closest(self, dishes: Iterable[str], kitchen_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        The stored run whose dish set is most similar (Jaccard) to `dishes`.
+
+        Only runs sharing at least one dish are considered, via the dish
+        index. Ties prefer the same kitchen, then the most recently used.
+
+        Returns:
+            {"run_id", "similarity", "kitchen_version", "schedule"}, or None
+        """
+        dishes = sorted({normalize_dish(dish) for dish in dishes})
+        if not dishes:
+            return None
+        placeholders = ",".join("?" * len(dishes))
+        with self._lock:
+            candidates = self._db.execute(
+                "SELECT r.run_id, r.dish_count, r.kitchen_version, r.used, COUNT(*) FROM dishes d"
+                f" JOIN runs r ON r.run_id = d.run_id WHERE d.dish IN ({placeholders}) GROUP BY r.run_id",
+                dishes,
+            ).fetchall()
+            if not candidates:
+                return None
+            similarity, _, _, run_id, version = max(
+                (shared / (len(dishes) + count - shared), version == kitchen_version, used, run_id, version)
+                for run_id, count, version, used, shared in candidates
+            )
+            data = self._db.execute("SELECT schedule FROM runs WHERE run_id = ?", (run_id,)).fetchone()[0]
+        return {
+            "run_id": run_id,
+            "similarity": round(similarity, 4),
+            "kitchen_version": version,
+            "schedule": json.loads(zlib.decompress(data)),
+        }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+
+@lru_cache
+def get_run_history() -> Optional[RunHistory]:
+    """Get the process-wide run history (None when disabled in settings)."""
+    settings = get_settings()
+    if not settings.history_enabled:
+        return None
+    return RunHistory(settings.history_db_path, max_runs=settings.history_max_runs)
+
+
+def active_history() -> Optional[RunHistory]:
+    """The run history to plan with here: None when disabled or inside `history_disabled()`."""
+    if _disabled.get():
+        return None
+    return get_run_history()
+
+
+@contextmanager
+def history_disabled() -> Iterator[None]:
+    """Plan without the run history in this context (e.g. to time the scheduler itself)."""
+    token = _disabled.set(True)
+    try:
+        yield
+    finally:
+        _disabled.reset(token)
@@ -1,6 +1,9 @@
 """Knowledge Base package."""
 
 from .kb import KnowledgeBase
+from .snapshot import KitchenSnapshot, apply_overrides, default_snapshot
+from .store import KitchenStore, get_kitchen_store
+from .runtime import KitchenView, kitchen_view, ROLE_ELIGIBILITY, TASK_TYPES
 from .models import (
     Kitchen,
     Oven,
@@ -15,6 +18,15 @@ from .models import (
 
 __all__ = [
     "KnowledgeBase",
+    "KitchenSnapshot",
+    "apply_overrides",
+    "default_snapshot",
+    "KitchenStore",
+    "get_kitchen_store",
+    "KitchenView",
+    "kitchen_view",
+    "ROLE_ELIGIBILITY",
+    "TASK_TYPES",
     "Kitchen",
     "Oven",
     "Burner",
@@ -0,0 +1,63 @@
+"""
+Build-time check that defaults.json still matches the kitchen models.
+
+The defaults are validated only once per kitchen type per process, on
+first use, so drift between defaults.json and models.py would otherwise
+surface as a failing request. Run this in CI or before a deploy.
+
+Usage (from backend/):
+    python -m knowledge_base.check_defaults   # exit 1 listing every mismatch
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from pydantic import ValidationError
+from .kb import DEFAULTS_PATH
+from .models import Kitchen
+
+
+def validate_defaults(defaults: Dict[str, Any]) -> None:
+    """
+    Validate every kitchen type of a defaults mapping against the models.
+
+    Raises:
+        ValueError: Listing every way the defaults don't match the models
+    """
+    kitchen_types = defaults.get("kitchen_types")
+    if not isinstance(kitchen_types, dict) or not kitchen_types:
+        raise ValueError("Defaults have no kitchen_types")
+    errors: List[str] = []
+    if defaults.get("default_kitchen_type") not in kitchen_types:
+        errors.append(f"default_kitchen_type {defaults.get('default_kitchen_type')!r} is not a kitchen type")
+    for kitchen_type, data in kitchen_types.items():
+        unknown = set(data) - set(Kitchen.model_fields)
+        if unknown:
+            errors.append(f"{kitchen_type}: unknown fields {sorted(unknown)}")
+        try:
+            Kitchen(**data)
+        except ValidationError as e:
+            errors.extend(
+                f"{kitchen_type}.{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            )
+    if errors:
+        raise ValueError("defaults.json does not match the kitchen models:\n- " + "\n- ".join(errors))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    path = Path(argv[0]) if argv else DEFAULTS_PATH
+    with open(path, "r") as f:
+        defaults = json.load(f)
+    try:
+        validate_defaults(defaults)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"{path.name}: {len(defaults['kitchen_types'])} kitchen types match the models")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -6,6 +6,39 @@ import json
 from pathlib import Path
 from typing import Dict, Any, Optional
 from .models import Kitchen, Oven, Burner, Microwave, Chef, BurnerType, ChefRole, SkillLevel, EnergyLevel
+from .snapshot import KitchenSnapshot
+
+DEFAULTS_PATH = Path(__file__).parent / "defaults.json"
+
+_defaults: Optional[Dict[str, Any]] = None
+
+# Kitchen types whose defaults have passed full validation in this process
+_validated_types: set = set()
+
+# Count override key → (resource field, id prefix, model, fields for a unit when there is none to copy)
+COUNT_OVERRIDES = {
+    "oven_count": ("ovens", "oven", Oven, {"capacity": 2}),
+    "burner_count": ("burners", "burner", Burner, {}),
+    "microwave_count": ("microwaves", "microwave", Microwave, {}),
+    "chef_count": ("chefs", "chef", Chef, {"role": "general"}),
+}
+
+# Largest count a count override may ask for, per override key
+MAX_UNITS = {
+    "oven_count": 200,
+    "burner_count": 500,
+    "microwave_count": 200,
+    "chef_count": 500,
+}
+
+
+def load_defaults() -> Dict[str, Any]:
+    """Load default kitchen configurations from JSON (parsed once per process, treat as read-only)."""
+    global _defaults
+    if _defaults is None:
+        with open(DEFAULTS_PATH, 'r') as f:
+            _defaults = json.load(f)
+    return _defaults
 
 
 class KnowledgeBase:
@@ -16,22 +49,23 @@ class KnowledgeBase:
     Structure supports future database persistence.
     """
     
-    def __init__(self, kitchen_type: str = "small_restaurant"):
+    def __init__(self, kitchen_type: str = "small_restaurant", kitchen: Optional[Kitchen] = None):
         """
         Initialize knowledge base with a kitchen type.
         
         Args:
             kitchen_type: One of "home", "small_restaurant", "commercial"
+            kitchen: Existing kitchen to manage instead of building one from defaults
         """
-        self.defaults_path = Path(__file__).parent / "defaults.json"
+        self.defaults_path = DEFAULTS_PATH
         self.defaults = self._load_defaults()
         self.kitchen_type = kitchen_type
-        self.kitchen = self._create_kitchen_from_type(kitchen_type)
+        self.kitchen = kitchen if kitchen is not None else self._create_kitchen_from_type(kitchen_type)
+        self._snapshot: Optional[KitchenSnapshot] = None
     
     def _load_defaults(self) -> Dict[str, Any]:
-        """Load default kitchen configurations from JSON."""
-        with open(self.defaults_path, 'r') as f:
-            return json.load(f)
+        """Load default kitchen configurations (shared across instances)."""
+        return load_defaults()
     
     def _create_kitchen_from_type(self, kitchen_type: str) -> Kitchen:
         """Create a Kitchen instance from a kitchen type."""
@@ -41,6 +75,15 @@ class KnowledgeBase:
         
         kitchen_data = self.defaults["kitchen_types"][kitchen_type]
         
+        if kitchen_type in _validated_types:
+            # Already validated once in this process: skip validation
+            return Kitchen.model_construct(
+                ovens=[Oven.from_trusted(d) for d in kitchen_data["ovens"]],
+                burners=[Burner.from_trusted(d) for d in kitchen_data["burners"]],
+                microwaves=[Microwave.from_trusted(d) for d in kitchen_data["microwaves"]],
+                chefs=[Chef.from_trusted(d) for d in kitchen_data["chefs"]],
+            )
+        
         # Parse ovens
         ovens = [Oven(**oven_data) for oven_data in kitchen_data["ovens"]]
         
@@ -53,6 +96,7 @@ class KnowledgeBase:
         # Parse chefs
         chefs = [Chef(**chef_data) for chef_data in kitchen_data["chefs"]]
         
+        _validated_types.add(kitchen_type)
         return Kitchen(
             ovens=ovens,
             burners=burners,
@@ -69,12 +113,25 @@ class KnowledgeBase:
                 {
                     "ovens": [{"id": "oven_1", "capacity": 4}],
                     "chefs": [{"id": "chef_1", "energy_level": "tired"}],
-                    "add_oven": {"id": "oven_3", "capacity": 3, "max_temp": 550}
+                    "add_oven": {"id": "oven_3", "capacity": 3, "max_temp": 550},
+                    "burner_count": 6
                 }
+                Counts (oven_count, burner_count, microwave_count, chef_count)
+                are applied first: extra units are dropped from the end, and
+                missing ones are copies of the last unit with the next free id.
         
         Returns:
             Updated Kitchen instance
+        
+        Raises:
+            ValueError: On a negative or non-integer count, or one above MAX_UNITS
         """
+        self._snapshot = None
+        
+        for key, (field, prefix, model, base) in COUNT_OVERRIDES.items():
+            if key in overrides:
+                self._resize(key, field, prefix, model, base, overrides[key])
+        
         # Update existing ovens
         if "ovens" in overrides:
             for oven_update in overrides["ovens"]:
@@ -139,7 +196,8 @@ class KnowledgeBase:
                             if key != "id" and hasattr(existing_chef, key):
                                 setattr(existing_chef, key, value)
                     else:
-                        self.kitchen.chefs.append(Chef(**chef_update))
+                        # A chef mentioned by id but not in the kitchen yet joins as a general chef
+                        self.kitchen.chefs.append(Chef(**{"role": ChefRole.GENERAL, **chef_update}))
         
         # Add new chef
         if "add_chef" in overrides:
@@ -147,6 +205,26 @@ class KnowledgeBase:
         
         return self.kitchen
     
+    def _resize(self, key: str, field: str, prefix: str, model: type, base: Dict[str, Any], count: Any) -> None:
+        """Grow or shrink a resource list to `count` units."""
+        if isinstance(count, bool) or not isinstance(count, int) or count < 0:
+            raise ValueError(f"{key} must be a non-negative integer, got {count!r}")
+        if count > MAX_UNITS[key]:
+            raise ValueError(f"{key} must be at most {MAX_UNITS[key]}, got {count}")
+        items = getattr(self.kitchen, field)
+        del items[count:]
+        taken = {item.id for item in items}
+        n = len(items)
+        while len(items) < count:
+            n += 1
+            new_id = f"{prefix}_{n}"
+            if new_id in taken:
+                continue
+            if items:
+                items.append(items[-1].model_copy(update={"id": new_id}))
+            else:
+                items.append(model(id=new_id, **base))
+    
     def get_kitchen(self) -> Kitchen:
         """Get the current kitchen instance."""
         return self.kitchen
@@ -156,5 +234,17 @@ class KnowledgeBase:
         if kitchen_type is None:
             kitchen_type = self.kitchen_type
         self.kitchen = self._create_kitchen_from_type(kitchen_type)
+        self._snapshot = None
         return self.kitchen
+    
+    def snapshot(self) -> KitchenSnapshot:
+        """
+        Get an immutable snapshot of the current kitchen.
+        
+        Cached until the next update()/reset_to_defaults(); mutate the kitchen
+        through those methods so the cache stays valid.
+        """
+        if self._snapshot is None:
+            self._snapshot = KitchenSnapshot.from_kitchen(self.kitchen, self.kitchen_type)
+        return self._snapshot
 
@@ -3,7 +3,7 @@ Pydantic models for kitchen resources and staff.
 """
 
 from pydantic import BaseModel, Field
-from typing import Literal, List, Optional
+from typing import Any, Dict, Literal, List, Optional, Tuple
 from enum import Enum
 
 
@@ -36,26 +36,73 @@ class EnergyLevel(str, Enum):
     EXHAUSTED = "exhausted"
 
 
-class Oven(BaseModel):
+# Per-class (field names, field defaults, enum value → member maps) used by from_trusted()
+_TRUSTED_PLANS: Dict[type, Tuple[Tuple[str, ...], Dict[str, Any], Tuple[Tuple[str, Dict[Any, Enum]], ...]]] = {}
+
+
+class ResourceModel(BaseModel):
+    """Base for kitchen resource models."""
+    
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]):
+        """
+        Build an instance without validation (about 2-3x cheaper).
+        
+        Only for data that has already been validated (cached defaults,
+        rows we wrote to storage ourselves). Missing fields get their
+        defaults and enum values given as strings are converted; nothing
+        else is checked.
+        """
+        plan = _TRUSTED_PLANS.get(cls)
+        if plan is None:
+            fields = cls.model_fields
+            defaults = {
+                name: field.get_default(call_default_factory=True)
+                for name, field in fields.items()
+                if not field.is_required()
+            }
+            enums = tuple(
+                (name, field.annotation._value2member_map_)
+                for name, field in fields.items()
+                if isinstance(field.annotation, type) and issubclass(field.annotation, Enum)
+            )
+            plan = _TRUSTED_PLANS[cls] = (tuple(fields), defaults, enums)
+        names, defaults, enums = plan
+        
+        # Keep declaration order so repr/model_dump match validated instances
+        values = {name: data[name] if name in data else defaults[name] for name in names}
+        for name, members in enums:
+            value = values[name]
+            values[name] = members.get(value, value)
+        
+        instance = object.__new__(cls)
+        object.__setattr__(instance, "__dict__", values)
+        object.__setattr__(instance, "__pydantic_fields_set__", set(data))
+        object.__setattr__(instance, "__pydantic_extra__", None)
+        object.__setattr__(instance, "__pydantic_private__", None)
+        return instance
+
+
+class Oven(ResourceModel):
     """Oven resource model."""
     id: str = Field(..., description="Unique identifier for the oven")
     capacity: int = Field(..., ge=1, description="How many dishes can fit simultaneously")
     max_temp: int = Field(default=500, ge=200, le=1000, description="Maximum temperature in Fahrenheit")
 
 
-class Burner(BaseModel):
+class Burner(ResourceModel):
     """Individual burner resource model."""
     id: str = Field(..., description="Unique identifier for the burner")
     type: BurnerType = Field(default=BurnerType.GAS, description="Type of burner (gas, electric, induction)")
 
 
-class Microwave(BaseModel):
+class Microwave(ResourceModel):
     """Microwave resource model."""
     id: str = Field(..., description="Unique identifier for the microwave")
     wattage: int = Field(default=1000, ge=500, le=2000, description="Microwave wattage")
 
 
-class Chef(BaseModel):
+class Chef(ResourceModel):
     """Chef/staff member model."""
     id: str = Field(..., description="Unique identifier for the chef")
     role: ChefRole = Field(..., description="Role of the chef")
@@ -0,0 +1,172 @@
+"""
+Compact runtime views of kitchen resources for schedulers and simulators.
+
+Inner loops only need a few immutable numbers per resource (capacity, role,
+time multiplier). `KitchenView` stores those in parallel arrays indexed by
+resource position, with chef multipliers precomputed per task type, so hot
+paths do index arithmetic instead of touching Pydantic models. Views
+convert back to regular models with `to_kitchen()` at the API edge.
+"""
+
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Sequence, Tuple, Union
+from metrics import record_cache_access
+from .models import (
+    Kitchen, Oven, Burner, Microwave, Chef,
+    BurnerType, ChefRole, SkillLevel, EnergyLevel,
+)
+from .snapshot import KitchenSnapshot
+
+# Task types understood by Chef.get_task_multiplier, in multiplier-table order
+TASK_TYPES: Tuple[str, ...] = ("prep", "cook", "passive", "plate")
+TASK_TYPE_INDEX: Dict[str, int] = {t: i for i, t in enumerate(TASK_TYPES)}
+
+# Which chef roles may work a task of each type
+ROLE_ELIGIBILITY: Dict[str, FrozenSet[ChefRole]] = {
+    "prep": frozenset({ChefRole.PREP, ChefRole.COOK, ChefRole.GENERAL}),
+    "cook": frozenset({ChefRole.COOK, ChefRole.GENERAL}),
+    "passive": frozenset({ChefRole.PREP, ChefRole.COOK, ChefRole.GENERAL, ChefRole.SERVER}),
+    "plate": frozenset({ChefRole.COOK, ChefRole.GENERAL, ChefRole.SERVER}),
+}
+DEFAULT_ELIGIBILITY = frozenset({ChefRole.PREP, ChefRole.COOK, ChefRole.GENERAL})
+
+# Enum ↔ small-int codes for the array columns
+_BURNER_TYPES = tuple(BurnerType)
+_ROLES = tuple(ChefRole)
+_SKILLS = tuple(SkillLevel)
+_ENERGIES = tuple(EnergyLevel)
+
+
+class KitchenView:
+    """
+    Read-only, array-backed view of one kitchen version.
+
+    Resources are addressed by index. Chef multipliers live in a flat
+    table: `chef_multipliers[chef * len(TASK_TYPES) + TASK_TYPE_INDEX[t]]`.
+    """
+    __slots__ = (
+        "version",
+        "oven_ids", "oven_capacity", "oven_max_temp",
+        "burner_ids", "burner_type",
+        "microwave_ids", "microwave_wattage",
+        "chef_ids", "chef_role", "chef_skill", "chef_energy", "chef_multipliers",
+        "_eligible",
+    )
+
+    def __init__(
+        self,
+        ovens: Tuple[Oven, ...],
+        burners: Tuple[Burner, ...],
+        microwaves: Tuple[Microwave, ...],
+        chefs: Tuple[Chef, ...],
+        version: str = "",
+    ):
+        self.version = version
+        self.oven_ids = tuple(o.id for o in ovens)
+        self.oven_capacity = array("i", (o.capacity for o in ovens))
+        self.oven_max_temp = array("i", (o.max_temp for o in ovens))
+        self.burner_ids = tuple(b.id for b in burners)
+        self.burner_type = array("b", (_BURNER_TYPES.index(BurnerType(b.type)) for b in burners))
+        self.microwave_ids = tuple(m.id for m in microwaves)
+        self.microwave_wattage = array("i", (m.wattage for m in microwaves))
+        self.chef_ids = tuple(c.id for c in chefs)
+        self.chef_role = array("b", (_ROLES.index(ChefRole(c.role)) for c in chefs))
+        self.chef_skill = array("b", (_SKILLS.index(SkillLevel(c.skill_level)) for c in chefs))
+        self.chef_energy = array("b", (_ENERGIES.index(EnergyLevel(c.energy_level)) for c in chefs))
+        self.chef_multipliers = array("d", (
+            chef.get_task_multiplier(task_type) for chef in chefs for task_type in TASK_TYPES
+        ))
+        self._eligible: Dict[str, Tuple[int, ...]] = {}
+
+    @classmethod
+    def from_kitchen(cls, kitchen: Union[Kitchen, KitchenSnapshot], version: str = "") -> "KitchenView":
+        """Build a view from a Kitchen or KitchenSnapshot."""
+        return cls(
+            tuple(kitchen.ovens),
+            tuple(kitchen.burners),
+            tuple(kitchen.microwaves),
+            tuple(kitchen.chefs),
+            version=getattr(kitchen, "version", version),
+        )
+
+    def multiplier(self, chef: int, task_type: str) -> float:
+        """Time multiplier for chef index `chef` on a task type (1.0 for unknown types)."""
+        index = TASK_TYPE_INDEX.get(task_type)
+        if index is None:
+            return 1.0
+        return self.chef_multipliers[chef * len(TASK_TYPES) + index]
+
+    def multiplier_column(self, task_type: str) -> Sequence[float]:
+        """Every chef's time multiplier for a task type, by chef index."""
+        index = TASK_TYPE_INDEX.get(task_type)
+        if index is None:
+            return [1.0] * len(self.chef_ids)
+        return self.chef_multipliers[index::len(TASK_TYPES)]
+
+    def eligible_chefs(self, task_type: str) -> Tuple[int, ...]:
+        """Indices of chefs whose role may work `task_type`."""
+        eligible = self._eligible.get(task_type)
+        if eligible is None:
+            roles = ROLE_ELIGIBILITY.get(task_type, DEFAULT_ELIGIBILITY)
+            eligible = tuple(i for i, code in enumerate(self.chef_role) if _ROLES[code] in roles)
+            self._eligible[task_type] = eligible
+        return eligible
+
+    def oven_slots(self) -> Tuple[Tuple[int, int], ...]:
+        """(oven index, slot number) for every dish position across all ovens."""
+        return tuple(
+            (oven, slot)
+            for oven, capacity in enumerate(self.oven_capacity)
+            for slot in range(capacity)
+        )
+
+    def to_kitchen(self) -> Kitchen:
+        """Convert back to a regular Kitchen model (API edge)."""
+        return Kitchen.model_construct(
+            ovens=[
+                Oven.from_trusted({"id": oid, "capacity": cap, "max_temp": temp})
+                for oid, cap, temp in zip(self.oven_ids, self.oven_capacity, self.oven_max_temp)
+            ],
+            burners=[
+                Burner.from_trusted({"id": bid, "type": _BURNER_TYPES[code]})
+                for bid, code in zip(self.burner_ids, self.burner_type)
+            ],
+            microwaves=[
+                Microwave.from_trusted({"id": mid, "wattage": watts})
+                for mid, watts in zip(self.microwave_ids, self.microwave_wattage)
+            ],
+            chefs=[
+                Chef.from_trusted({
+                    "id": cid,
+                    "role": _ROLES[role],
+                    "skill_level": _SKILLS[skill],
+                    "energy_level": _ENERGIES[energy],
+                })
+                for cid, role, skill, energy in zip(
+                    self.chef_ids, self.chef_role, self.chef_skill, self.chef_energy
+                )
+            ],
+        )
+
+
+_VIEW_CACHE_SIZE = 64
+_views: "OrderedDict[str, KitchenView]" = OrderedDict()
+_views_lock = threading.Lock()
+
+
+def kitchen_view(snapshot: KitchenSnapshot) -> KitchenView:
+    """Get the (cached) runtime view of a kitchen snapshot, keyed by its version."""
+    with _views_lock:
+        view = _views.get(snapshot.version)
+        if view is not None:
+            _views.move_to_end(snapshot.version)
+    record_cache_access("kitchen_view", view is not None)
+    if view is None:
+        view = KitchenView.from_kitchen(snapshot)
+        with _views_lock:
+            _views[snapshot.version] = view
+            while len(_views) > _VIEW_CACHE_SIZE:
+                _views.popitem(last=False)
+    return view
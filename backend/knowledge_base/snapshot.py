@@ -0,0 +1,188 @@
+"""
+Immutable, versioned kitchen snapshots for the workflow state.
+
+A `KitchenSnapshot` is what travels through the LangGraph state instead of
+a mutable `KnowledgeBase`. Snapshots are never modified: applying user
+overrides produces a new snapshot that shares every resource tuple the
+overrides did not touch, and the per-type default snapshots are built
+once per process and shared by all requests.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional, Tuple
+from metrics import record_cache_access
+from .models import Kitchen, Oven, Burner, Microwave, Chef
+
+RESOURCE_FIELDS = ("ovens", "burners", "microwaves", "chefs")
+RESOURCE_MODELS = {"ovens": Oven, "burners": Burner, "microwaves": Microwave, "chefs": Chef}
+
+# Override keys (see KnowledgeBase.update) → resource field they modify
+OVERRIDE_FIELDS = {
+    "ovens": "ovens",
+    "add_oven": "ovens",
+    "burners": "burners",
+    "add_burner": "burners",
+    "microwaves": "microwaves",
+    "add_microwave": "microwaves",
+    "chefs": "chefs",
+    "add_chef": "chefs",
+    "oven_count": "ovens",
+    "burner_count": "burners",
+    "microwave_count": "microwaves",
+    "chef_count": "chefs",
+}
+
+
+class KitchenSnapshot:
+    """
+    Read-only view of a kitchen configuration at one version.
+
+    A plain slotted object rather than a Pydantic model: it is built only
+    from already-validated resources, and LangGraph/LangChain serialize
+    state values on every step, which is cheapest for opaque objects.
+    Resource tuples hold the regular resource models; treat them as
+    read-only (snapshots may share them with other snapshots).
+    """
+    __slots__ = ("kitchen_type", "version", "ovens", "burners", "microwaves", "chefs", "_dump")
+
+    kitchen_type: str
+    version: str  # Content hash of the resources
+    ovens: Tuple[Oven, ...]
+    burners: Tuple[Burner, ...]
+    microwaves: Tuple[Microwave, ...]
+    chefs: Tuple[Chef, ...]
+
+    def __init__(self, kitchen_type: str, version: str, dump: Dict[str, Any], **resources: Tuple):
+        object.__setattr__(self, "kitchen_type", kitchen_type)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "_dump", dump)
+        for field in RESOURCE_FIELDS:
+            object.__setattr__(self, field, tuple(resources.get(field, ())))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("KitchenSnapshot is immutable")
+
+    def __repr__(self) -> str:
+        return f"KitchenSnapshot(kitchen_type={self.kitchen_type!r}, version={self.version!r})"
+
+    @classmethod
+    def build(
+        cls,
+        kitchen_type: str,
+        base: Optional["KitchenSnapshot"] = None,
+        **resources: Tuple,
+    ) -> "KitchenSnapshot":
+        """
+        Build a snapshot from already-validated resource tuples and compute its version.
+
+        Resource tuples shared with `base` reuse its JSON dump instead of
+        re-serializing.
+        """
+        resource_dump = {
+            field: base._dump[field]
+            if base is not None and resources.get(field, ()) is getattr(base, field)
+            else [item.model_dump(mode="json") for item in resources.get(field, ())]
+            for field in RESOURCE_FIELDS
+        }
+        digest = hashlib.sha1(
+            json.dumps(resource_dump, sort_keys=True, separators=(",", ":")).encode()
+        ).hexdigest()[:16]
+        dump = {"kitchen_type": kitchen_type, "version": digest, **resource_dump}
+        return cls(kitchen_type, digest, dump, **resources)
+
+    @classmethod
+    def from_kitchen(cls, kitchen: Kitchen, kitchen_type: str) -> "KitchenSnapshot":
+        """Snapshot a (mutable) Kitchen, copying its resources."""
+        return cls.build(
+            kitchen_type,
+            **{
+                field: tuple(item.model_copy() for item in getattr(kitchen, field))
+                for field in RESOURCE_FIELDS
+            },
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KitchenSnapshot":
+        """Rebuild a snapshot from its `to_dict()` dump (trusted: one we wrote ourselves)."""
+        return cls.build(
+            data["kitchen_type"],
+            **{
+                field: tuple(RESOURCE_MODELS[field].from_trusted(item) for item in data.get(field, ()))
+                for field in RESOURCE_FIELDS
+            },
+        )
+
+    def to_kitchen(self) -> Kitchen:
+        """Create a mutable Kitchen with copies of this snapshot's resources."""
+        return Kitchen.model_construct(**{
+            field: [item.model_copy() for item in getattr(self, field)]
+            for field in RESOURCE_FIELDS
+        })
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready dump (kitchen_type, version, resources). Computed once per snapshot."""
+        return self._dump
+
+    def get_chef(self, chef_id: str) -> Optional[Chef]:
+        """Get chef by ID."""
+        return next((c for c in self.chefs if c.id == chef_id), None)
+
+
+_default_snapshots: Dict[str, KitchenSnapshot] = {}
+_default_lock = threading.Lock()
+
+
+def default_snapshot(kitchen_type: Optional[str] = None) -> KitchenSnapshot:
+    """
+    Get the shared snapshot of a default kitchen type.
+
+    Built from defaults.json on first use, then reused by every request.
+    """
+    from .kb import KnowledgeBase, load_defaults
+
+    defaults = load_defaults()
+    if kitchen_type not in defaults["kitchen_types"]:
+        kitchen_type = defaults["default_kitchen_type"]
+    snapshot = _default_snapshots.get(kitchen_type)
+    record_cache_access("default_kitchen_snapshot", snapshot is not None)
+    if snapshot is None:
+        with _default_lock:
+            snapshot = _default_snapshots.get(kitchen_type)
+            if snapshot is None:
+                snapshot = KnowledgeBase(kitchen_type=kitchen_type).snapshot()
+                _default_snapshots[kitchen_type] = snapshot
+    return snapshot
+
+
+def apply_overrides(snapshot: KitchenSnapshot, overrides: Dict[str, Any]) -> KitchenSnapshot:
+    """
+    Apply user overrides to a snapshot, returning a new snapshot.
+
+    Only resource lists named by the overrides are copied and modified;
+    the others are shared with `snapshot`. Returns `snapshot` itself when
+    the overrides touch nothing.
+    """
+    from .kb import KnowledgeBase
+
+    touched = {OVERRIDE_FIELDS[key] for key in overrides if key in OVERRIDE_FIELDS}
+    if not touched:
+        return snapshot
+
+    kitchen = Kitchen.model_construct(**{
+        field: [item.model_copy() for item in getattr(snapshot, field)]
+        if field in touched else list(getattr(snapshot, field))
+        for field in RESOURCE_FIELDS
+    })
+    kb = KnowledgeBase(kitchen_type=snapshot.kitchen_type, kitchen=kitchen)
+    kb.update(overrides)
+
+    return KitchenSnapshot.build(
+        snapshot.kitchen_type,
+        base=snapshot,
+        **{
+            field: tuple(getattr(kb.kitchen, field)) if field in touched else getattr(snapshot, field)
+            for field in RESOURCE_FIELDS
+        },
+    )
@@ -0,0 +1,105 @@
+"""
+Shared kitchen configuration for every worker process.
+
+The configured kitchen (what /api/knowledge edits and simulations start
+from) lives in one SQLite row, so all uvicorn workers on a box see the
+same kitchen. Each process keeps the snapshot it last read and only goes
+back to the row when `PRAGMA data_version` says another connection has
+committed since; that check is a single cheap call, so reading the
+kitchen on every request costs about as much as the old in-process
+global. A changed row whose version matches a default kitchen maps back
+to the shared default snapshot.
+"""
+
+import json
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Callable, Optional
+from config import get_settings
+from metrics import record_cache_access
+from .snapshot import KitchenSnapshot, default_snapshot
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kitchen (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    kitchen_type TEXT NOT NULL,
+    version TEXT NOT NULL,
+    data TEXT NOT NULL
+)
+"""
+
+
+class KitchenStore:
+    """
+    The current kitchen, stored in SQLite and cached per process.
+
+    One connection per store, shared by the process's threads behind a
+    lock. Updates run in an immediate (write-locked) transaction, so
+    concurrent read-modify-write updates from different workers apply
+    one after the other instead of overwriting each other.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+        self._data_version: Optional[int] = None
+        self._snapshot: Optional[KitchenSnapshot] = None
+
+    def current(self) -> KitchenSnapshot:
+        """The current kitchen (the default kitchen type until one is saved)."""
+        with self._lock:
+            data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+            fresh = self._snapshot is not None and data_version == self._data_version
+            record_cache_access("kitchen_store", fresh)
+            if not fresh:
+                self._snapshot = self._read()
+                self._data_version = data_version
+            return self._snapshot
+
+    def update(self, change: Callable[[KitchenSnapshot], KitchenSnapshot]) -> KitchenSnapshot:
+        """
+        Replace the kitchen with `change(current kitchen)`, atomically
+        across processes.
+
+        Raises:
+            Whatever `change` raises; the kitchen is left unchanged
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                snapshot = change(self._read())
+                self._db.execute(
+                    "INSERT OR REPLACE INTO kitchen (id, kitchen_type, version, data) VALUES (1, ?, ?, ?)",
+                    (snapshot.kitchen_type, snapshot.version, json.dumps(snapshot.to_dict(), separators=(",", ":"))),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            # Our own commits don't move data_version, so this stays valid
+            self._snapshot = snapshot
+            self._data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+            return snapshot
+
+    def _read(self) -> KitchenSnapshot:
+        row = self._db.execute("SELECT kitchen_type, version, data FROM kitchen WHERE id = 1").fetchone()
+        if row is None:
+            return default_snapshot()
+        kitchen_type, version, data = row
+        cached = self._snapshot
+        if cached is not None and (cached.kitchen_type, cached.version) == (kitchen_type, version):
+            return cached
+        default = default_snapshot(kitchen_type)
+        if default.version == version and default.kitchen_type == kitchen_type:
+            return default
+        return KitchenSnapshot.from_dict(json.loads(data))
+
+
+@lru_cache
+def get_kitchen_store() -> KitchenStore:
+    """Get this process's handle on the shared kitchen store."""
+    return KitchenStore(get_settings().kitchen_db_path)
@@ -6,7 +6,7 @@ Main entry point for the kitchen simulator service.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from api import knowledge, simulate
+from api import admin, knowledge, metrics, runs, schedule, service, sessions, simulate
 
 app = FastAPI(
     title="Kitchen Simulator API",
@@ -17,6 +17,12 @@ app = FastAPI(
 # Include routers
 app.include_router(knowledge.router)
 app.include_router(simulate.router)
+app.include_router(schedule.router)
+app.include_router(runs.router)
+app.include_router(sessions.router)
+app.include_router(service.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
 
 # CORS middleware for React frontend
 app.add_middleware(
@@ -48,5 +54,8 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=False)
+    from config import get_settings
+    # Several workers need the app as an import string; they share the kitchen
+    # store and checkpoints through SQLite (KITCHENSIM_WORKERS)
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=False, workers=get_settings().workers)
 
@@ -0,0 +1,280 @@
+"""
+In-process metrics and workflow node instrumentation.
+
+Metrics are kept in a small thread-safe registry and rendered in the
+Prometheus text exposition format by `/api/metrics`.
+"""
+
+import bisect
+import functools
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from profiling import track_current_thread
+
+# Latency buckets in seconds: sub-millisecond pure nodes up to multi-second LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values → [per-bucket counts..., +Inf count], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        return sum(self._counts.get(key, ()))
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+        lines = []
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds all metrics and renders them as Prometheus text."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format (0.0.4)."""
+        _update_cache_hit_ratios()
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+NODE_DURATION = REGISTRY.histogram(
+    "kitchensim_node_duration_seconds", "Workflow node latency", ["node"],
+)
+NODE_RUNS = REGISTRY.counter(
+    "kitchensim_node_runs_total", "Workflow node executions", ["node"],
+)
+NODE_ERRORS = REGISTRY.counter(
+    "kitchensim_node_errors_total", "Workflow node executions that raised", ["node"],
+)
+NODE_MEMORY = REGISTRY.histogram(
+    "kitchensim_node_memory_peak_bytes",
+    "Peak traced allocation during a node (only when memory tracing is enabled)",
+    ["node"],
+    buckets=(1e4, 1e5, 1e6, 1e7, 1e8, 1e9),
+)
+WORKFLOW_DURATION = REGISTRY.histogram(
+    "kitchensim_workflow_duration_seconds", "End-to-end workflow latency per simulate request",
+)
+WORKFLOW_ERRORS = REGISTRY.counter(
+    "kitchensim_workflow_errors_total", "Simulate requests whose workflow raised",
+)
+PARSE_DURATION = REGISTRY.histogram(
+    "kitchensim_parse_duration_seconds",
+    "Input parsing latency by path (rules only, rules + LLM, LLM only)",
+    ["path"],
+)
+SIMULATE_COALESCED = REGISTRY.counter(
+    "kitchensim_simulate_coalesced_total",
+    "Simulate requests served by joining an identical in-flight workflow run",
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "kitchensim_cache_requests_total", "Cache lookups by cache and result", ["cache", "result"],
+)
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "kitchensim_cache_hit_ratio", "Cache hits / lookups since process start", ["cache"],
+)
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """Count a lookup against a named cache (feeds hit-rate metrics)."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _update_cache_hit_ratios() -> None:
+    caches = {cache for cache, _ in list(CACHE_REQUESTS._values)}
+    for cache in caches:
+        hits = CACHE_REQUESTS.get(cache=cache, result="hit")
+        total = hits + CACHE_REQUESTS.get(cache=cache, result="miss")
+        if total:
+            CACHE_HIT_RATIO.set(hits / total, cache=cache)
+
+
+def instrument_node(name: str, node: Callable[[dict], Optional[dict]], trace_memory: bool = False):
+    """
+    Wrap a workflow node with timing and (optionally) memory instrumentation.
+
+    Every call is recorded in the node metrics. The wrapped node also appends
+    a timing record (duration, start and end) to the `node_timings` state
+    channel so callers can get a per-request breakdown, and registers its thread with the request's
+    profiler when the request is being profiled.
+
+    Args:
+        name: Node name used as the metric label
+        node: Node function taking state and returning a state update
+        trace_memory: Measure peak allocations with tracemalloc. The peak is
+            process-wide, so concurrent requests inflate each other's numbers.
+    """
+    @functools.wraps(node)
+    def wrapper(state: dict) -> dict:
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if trace_memory:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        try:
+            with track_current_thread():
+                update = node(state)
+        except Exception:
+            NODE_ERRORS.inc(node=name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            NODE_RUNS.inc(node=name)
+            NODE_DURATION.observe(elapsed, node=name)
+
+        # start_ms/end_ms are on the perf_counter clock: compare them within one process
+        record: Dict[str, Any] = {
+            "node": name,
+            "duration_ms": round(elapsed * 1000, 3),
+            "start_ms": round(start * 1000, 3),
+            "end_ms": round((start + elapsed) * 1000, 3),
+        }
+        if trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            record["memory_delta_bytes"] = current - memory_before
+            record["memory_peak_bytes"] = max(peak - memory_before, 0)
+            NODE_MEMORY.observe(record["memory_peak_bytes"], node=name)
+
+        update = dict(update or {})
+        update["node_timings"] = [record]
+        return update
+
+    return wrapper
@@ -1,25 +1,24 @@
 """
 Build DAG node - converts recipes into unified dependency graph.
-Currently a stub that passes data through.
 """
 
 from state import KitchenSimulatorState
+from scheduler import TaskDAG, batch_recipes
 
 
 def build_dag_node(state: KitchenSimulatorState) -> dict:
     """
     Build unified dependency graph from all recipe tasks.
     
-    TODO (PR 6): Implement TaskDAG builder to:
-    - Flatten all tasks from all recipes
-    - Build dependency edges
-    - Validate no cycles
+    Flattens the tasks of every recipe into one TaskDAG (ids colliding
+    across recipes are namespaced by recipe) and validates that every
+    dependency exists and there are no cycles. Recipes are scaled to the
+    guest count as batched tasks (`quantity` units per task), so the DAG
+    has one node per distinct task however many guests there are.
     """
-    # Stub: Return empty DAG for now
+    event_details = (state.get("parsed_data") or {}).get("event_details") or {}
+    recipes = batch_recipes(state.get("recipes") or [], event_details.get("guest_count") or 0)
+    dag = TaskDAG.from_recipes(recipes)
     return {
-        "tasks": {
-            "nodes": [],
-            "edges": []
-        }
+        "tasks": dag.to_dict()
     }
-
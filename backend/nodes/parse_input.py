@@ -1,28 +1,51 @@
 """
 Parse input node - extracts structured data from natural language.
-Currently a stub that passes data through.
+Rules handle the formulaic parts; the LLM parser is still a stub.
 """
 
+import time
+from typing import Any, Dict, List
+from metrics import PARSE_DURATION
+from parsing import rule_parse
 from state import KitchenSimulatorState
 
 
-def parse_input_node(state: KitchenSimulatorState) -> dict:
+def _llm_parse(sentences: List[str]) -> Dict[str, Any]:
     """
-    Parse user input into structured data.
-    
+    Parse what the rules couldn't.
+
     TODO (PR 4): Implement ParserAgent to extract:
     - Event details (date, time, guest count, event type)
     - Recipe text/menu items
     - Constraints (staff, equipment)
     - User knowledge base overrides
     """
-    # Stub: Just pass through for now
+    # Stub: Nothing extracted for now
+    return {}
+
+
+def parse_input_node(state: KitchenSimulatorState) -> dict:
+    """
+    Parse user input into structured data.
+
+    Sentences the rule pass fully understands (event details, equipment
+    and chef counts, chef states) are filled in directly; only the
+    remaining sentences go to the LLM parser, and rule results win where
+    both set a value. `parse_path` records which parser(s) ran: "rules",
+    "hybrid" or "llm".
+    """
+    start = time.perf_counter()
+    rules = rule_parse(state.get("user_input", ""))
+
+    llm = _llm_parse(rules.leftover) if rules.leftover else {}
+    parsed_data = {
+        "event_details": {"guest_count": 0, **llm.get("event_details", {}), **rules.event_details},
+        "recipes_text": llm.get("recipes_text", []),
+        "constraints": llm.get("constraints", {}),
+        "user_overrides": {**llm.get("user_overrides", {}), **rules.user_overrides},
+        "parse_path": rules.path,
+    }
+    PARSE_DURATION.observe(time.perf_counter() - start, path=rules.path)
     return {
-        "parsed_data": {
-            "event_details": {"guest_count": 0},
-            "recipes_text": [],
-            "constraints": {},
-            "user_overrides": {}
-        }
+        "parsed_data": parsed_data
     }
-
@@ -1,25 +1,54 @@
 """
 Schedule node - creates timeline with resource allocation.
-Currently a stub that passes data through.
 """
 
 from state import KitchenSimulatorState
+from config import get_settings
+from history import active_history, menu_dishes, start_hints
+from knowledge_base import default_snapshot
+from scheduler import schedule_tasks
 
 
 def schedule_node(state: KitchenSimulatorState) -> dict:
     """
     Schedule tasks with resource allocation.
     
-    TODO (PR 7): Implement SchedulerAgent to:
-    - Topological sort
-    - Resource allocation (ovens, chefs, burners)
-    - Timeline calculation with buffer times
+    Critical-path list scheduling of the task DAG onto the request's
+    kitchen (see scheduler.algorithm): dependencies are respected, each
+    task gets equipment and an eligible chef, and durations include the
+    chef's task multiplier.
+    
+    Past runs (see history) are reused: a DAG already scheduled on this
+    kitchen returns its stored schedule, and the closest past menu
+    warm-starts the scheduler. The `history` state key records which
+    past run was used, so a reused schedule is identical to a computed one.
+    
+    TODO: Buffer times and service windows (phase1.md PR 7)
     """
-    # Stub: Return empty schedule for now
-    return {
-        "schedule": {
-            "tasks": [],
-            "timeline": {}
-        }
-    }
+    kitchen = state.get("kitchen") or default_snapshot()
+    dag = state.get("tasks") or {}
+    history = active_history()
+    if history is None or not dag.get("nodes"):
+        return {"schedule": schedule_tasks(dag, kitchen)}
 
+    past = history.exact(dag, kitchen.version)
+    if past is not None:
+        return {"schedule": past["schedule"], "history": {"match": "exact", "run_id": past["run_id"]}}
+
+    schedule = schedule_tasks(dag, kitchen)
+    source = {"match": "none"}
+    similar = history.closest(menu_dishes(dag), kitchen.version)
+    if similar is not None and similar["similarity"] >= get_settings().history_min_similarity:
+        warm = schedule_tasks(dag, kitchen, start_hints=start_hints(similar["schedule"]))
+        warm_start = warm["timeline"]["makespan"] < schedule["timeline"]["makespan"]
+        if warm_start:
+            schedule = warm
+        source = {
+            "match": "similar",
+            "source_run_id": similar["run_id"],
+            "similarity": similar["similarity"],
+            "warm_start": warm_start,
+        }
+    guest_count = ((state.get("parsed_data") or {}).get("event_details") or {}).get("guest_count") or 0
+    run_id = history.record(dag, kitchen.version, schedule, guest_count=int(guest_count))
+    return {"schedule": schedule, "history": {**source, "run_id": run_id}}
@@ -1,27 +1,26 @@
 """
 Update knowledge base node - merges user overrides with defaults.
-Currently a stub that passes data through.
 """
 
 from state import KitchenSimulatorState
-from knowledge_base import KnowledgeBase
+from knowledge_base import apply_overrides, get_kitchen_store
 
 
 def update_kb_node(state: KitchenSimulatorState) -> dict:
     """
-    Merge user overrides into knowledge base.
+    Merge user overrides into the kitchen.
     
-    TODO (PR 2 integration): Use KnowledgeBase.update() to merge overrides
+    Starts from the configured kitchen (shared by all workers, see
+    knowledge_base.store); overrides produce a new snapshot that shares
+    every resource list they don't touch. Without overrides no kitchen
+    data is allocated for the request at all.
     """
-    # Stub: Create default knowledge base for now
-    kb = KnowledgeBase()
+    kitchen = get_kitchen_store().current()
     
-    # If we have parsed_data with overrides, apply them (will implement in PR 4)
-    if state.get("parsed_data") and state["parsed_data"].get("user_overrides"):
-        # TODO: kb.update(state["parsed_data"]["user_overrides"])
-        pass
+    parsed_data = state.get("parsed_data") or {}
+    if parsed_data.get("user_overrides"):
+        kitchen = apply_overrides(kitchen, parsed_data["user_overrides"])
     
     return {
-        "knowledge_base": kb
+        "kitchen": kitchen
     }
-
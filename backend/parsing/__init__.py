@@ -0,0 +1,11 @@
+"""Deterministic parsing of user input ahead of the LLM parser."""
+
+from .rules import PATH_HYBRID, PATH_LLM, PATH_RULES, RuleParse, rule_parse
+
+__all__ = [
+    "PATH_HYBRID",
+    "PATH_LLM",
+    "PATH_RULES",
+    "RuleParse",
+    "rule_parse",
+]
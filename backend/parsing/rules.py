@@ -0,0 +1,222 @@
+"""
+Rule-based pre-parser for the formulaic parts of user input.
+
+Event details ("dinner for 40 at 7pm"), kitchen counts ("we have 3 ovens
+and 2 chefs") and chef states ("chef_2 is tired") follow a handful of
+phrasings that regular expressions extract reliably. The input is split
+into sentences; a sentence counts as understood when, after removing
+every rule match, only filler words are left. Facts are only taken from
+understood sentences ("last year we had 3 ovens" is left alone), and
+only the rest (recipes, questions, anything unusual) needs the LLM.
+"""
+
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from knowledge_base.kb import MAX_UNITS
+
+# Which parser handled an input
+PATH_RULES = "rules"    # Everything understood by rules
+PATH_HYBRID = "hybrid"  # Rules for part, LLM for the leftover sentences
+PATH_LLM = "llm"        # Nothing understood by rules
+
+NUMBER_WORDS = {
+    "no": 0, "zero": 0, "one": 1, "a": 1, "an": 1, "single": 1, "two": 2, "three": 3,
+    "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "eleven": 11, "twelve": 12,
+}
+_NUMBER = r"(\d+|" + "|".join(NUMBER_WORDS) + r")"
+# Headcounts: digits or spelled-out numbers, but not "a"/"an"/"no" ("for a party")
+_HEADCOUNT = r"(\d+|" + "|".join(w for w, n in NUMBER_WORDS.items() if n > 1 or w == "one") + r")"
+
+# Noun → count override key (see KnowledgeBase.update)
+COUNT_NOUNS = {
+    "oven": "oven_count",
+    "burner": "burner_count",
+    "hob": "burner_count",
+    "microwave": "microwave_count",
+    "chef": "chef_count",
+    "cook": "chef_count",
+}
+
+EVENT_TYPES = (
+    "breakfast", "brunch", "lunch", "dinner", "supper", "party", "wedding",
+    "banquet", "reception", "buffet", "gala", "picnic", "barbecue",
+)
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+# Words that may remain in a sentence once its facts are extracted
+FILLER = frozenset("""
+    a an and the i we we're we've i'm i've me us our my it's its is are am be will be
+    have has got having hosting host hosted throwing planning plan doing cooking making
+    for with at on of to in this that there here tonight today tomorrow evening night
+    people guests persons covers pax kitchen only just also please total about around
+    approximately roughly some event meal service party
+""".split())
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+")
+_WORDS = re.compile(r"[a-z0-9_']+")
+
+_GUESTS = re.compile(
+    r"\b(?:for|serving|serves|feeding|feeds?)\s+(?:about\s+|around\s+)?" + _HEADCOUNT
+    + r"(?:\s+(?:people|guests|persons|covers|pax))?\b"
+    + r"|\b" + _HEADCOUNT + r"\s+(?:people|guests|persons|covers|pax)\b"
+)
+_EVENT = re.compile(r"\b(" + "|".join(EVENT_TYPES) + r")\b")
+_TIME = re.compile(
+    r"\b(?:at|by|from)\s+(?:(\d{1,2})(?::(\d{2}))?\s*(am|pm)|(\d{1,2}):(\d{2})|(noon|midnight))\b"
+)
+_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b|\bon\s+(" + "|".join(WEEKDAYS) + r")\b")
+_HAVE = re.compile(
+    r"\b(?:(?:i|we)\s+(?:only\s+)?(?:have|'ve got|have got|got)"
+    r"|(?:i|we)'ve\s+got|there\s+(?:are|is)|(?:our|my|the)\s+kitchen\s+has)\s+(?:only\s+)?"
+)
+_COUNT_ITEM = re.compile(
+    r"\s*(?:,\s*|\band\s+|\bplus\s+)?" + _NUMBER
+    # No adjective slot: "a convection oven" or "2 sous chefs" says more than a count
+    + r"\s+(ovens?|burners?|hobs?|microwaves?|chefs?|cooks?)\b"
+)
+_CHEF_STATE = re.compile(
+    r"\b(chef_\d+)\s+(?:is|'s|feels|seems|looks)\s+(?:very\s+|really\s+|quite\s+|a\s+bit\s+|an?\s+)?"
+    r"(tired|exhausted|fresh|rested|beginner|novice|intermediate|expert)\b"
+)
+_CHEF_VALUES = {
+    "tired": ("energy_level", "tired"),
+    "exhausted": ("energy_level", "exhausted"),
+    "fresh": ("energy_level", "fresh"),
+    "rested": ("energy_level", "fresh"),
+    "beginner": ("skill_level", "beginner"),
+    "novice": ("skill_level", "beginner"),
+    "intermediate": ("skill_level", "intermediate"),
+    "expert": ("skill_level", "expert"),
+}
+
+
+class RuleParse(NamedTuple):
+    """Result of the rule pass over one input."""
+    event_details: Dict[str, Any]
+    user_overrides: Dict[str, Any]
+    leftover: List[str]  # Sentences the rules didn't fully understand, in input order
+    path: str
+
+
+def _number(token: str) -> int:
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+
+def _clock(match: "re.Match") -> Optional[str]:
+    """The matched time as "HH:MM", or None when it is no real time ("25:99", "13 pm")."""
+    hour, minute, meridiem, hour24, minute24, named = match.groups()
+    if named:
+        return "12:00" if named == "noon" else "00:00"
+    if hour24 is not None:
+        if int(hour24) > 23 or int(minute24) > 59:
+            return None
+        return f"{int(hour24):02d}:{minute24}"
+    if not 1 <= int(hour) <= 12 or int(minute or 0) > 59:
+        return None
+    h = int(hour) % 12 + (12 if meridiem == "pm" else 0)
+    return f"{h:02d}:{minute or '00'}"
+
+
+def _parse_sentence(sentence: str, event: Dict[str, Any], overrides: Dict[str, Any]) -> bool:
+    """Extract what the rules know from one sentence; True when nothing else is in it."""
+    text = sentence.lower()
+    spans: List[Tuple[int, int]] = []
+
+    for match in _GUESTS.finditer(text):
+        event["guest_count"] = _number(match.group(1) or match.group(2))
+        spans.append(match.span())
+    for match in _EVENT.finditer(text):
+        event.setdefault("event_type", match.group(1))
+        spans.append(match.span())
+    for match in _TIME.finditer(text):
+        clock = _clock(match)
+        if clock is None:
+            continue  # Left unmatched, so the sentence goes to the LLM
+        event["time"] = clock
+        spans.append(match.span())
+    for match in _DATE.finditer(text):
+        event["date"] = match.group(1) or match.group(2)
+        spans.append(match.span())
+
+    for match in _HAVE.finditer(text):
+        end = match.end()
+        counted = False
+        while True:
+            item = _COUNT_ITEM.match(text, end)
+            if item is None:
+                break
+            key = COUNT_NOUNS[item.group(2).rstrip("s")]
+            count = _number(item.group(1))
+            if count > MAX_UNITS[key]:
+                break  # Left unmatched, so the sentence goes to the LLM
+            overrides[key] = count
+            end = item.end()
+            counted = True
+        if counted:
+            spans.append((match.start(), end))
+
+    for match in _CHEF_STATE.finditer(text):
+        field, value = _CHEF_VALUES[match.group(2)]
+        chefs = overrides.setdefault("chefs", [])
+        update = next((c for c in chefs if c["id"] == match.group(1)), None)
+        if update is None:
+            update = {"id": match.group(1)}
+            chefs.append(update)
+        update[field] = value
+        spans.append(match.span())
+
+    if not spans:
+        return False
+    residual = text
+    for start, end in sorted(spans, reverse=True):
+        residual = residual[:start] + " " + residual[end:]
+    return all(word in FILLER for word in _WORDS.findall(residual))
+
+
+def rule_parse(text: str) -> RuleParse:
+    """
+    Extract event details and kitchen overrides with rules.
+
+    Args:
+        text: Raw user input
+
+    Returns:
+        RuleParse with `event_details` (guest_count, event_type, time as
+        "HH:MM", date), `user_overrides` (count overrides and chef
+        updates in the KnowledgeBase.update shape), the `leftover`
+        sentences for the LLM and the `path` (rules, hybrid or llm)
+    """
+    event: Dict[str, Any] = {}
+    overrides: Dict[str, Any] = {}
+    leftover: List[str] = []
+    understood = 0
+    for sentence in _SENTENCE_SPLIT.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        sentence_event: Dict[str, Any] = {}
+        sentence_overrides: Dict[str, Any] = {}
+        if _parse_sentence(sentence, sentence_event, sentence_overrides):
+            understood += 1
+            for key, value in sentence_event.items():
+                if key != "event_type" or key not in event:
+                    event[key] = value
+            chefs = overrides.setdefault("chefs", []) if "chefs" in sentence_overrides else None
+            for chef in sentence_overrides.pop("chefs", []):
+                existing = next((c for c in chefs if c["id"] == chef["id"]), None)
+                if existing is None:
+                    chefs.append(chef)
+                else:
+                    existing.update(chef)
+            overrides.update(sentence_overrides)
+        else:
+            leftover.append(sentence)
+
+    if not leftover:
+        path = PATH_RULES
+    elif understood:
+        path = PATH_HYBRID
+    else:
+        path = PATH_LLM
+    return RuleParse(event, overrides, leftover, path)
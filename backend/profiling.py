@@ -0,0 +1,181 @@
+"""
+On-demand sampling profiler for individual simulate requests.
+
+A profiled request runs with a `SamplingProfiler` active. Workflow nodes
+register the thread they run on (see `metrics.instrument_node`), so only
+frames belonging to that request are sampled even while other requests
+run concurrently. Profiles are stored as collapsed stacks
+("frame;frame;frame count" per line), the input format of flamegraph.pl
+and speedscope.
+"""
+
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from config import get_settings
+
+_active_profiler: contextvars.ContextVar[Optional["SamplingProfiler"]] = contextvars.ContextVar(
+    "active_profiler", default=None
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of registered threads at a fixed interval.
+
+    Use as a context manager around the work to profile; the thread that
+    enters it is registered automatically.
+    """
+
+    def __init__(self, interval: float = 0.001, max_depth: int = 128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._threads: Dict[int, int] = {}  # thread id → registration depth
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._token = None
+        self._started_at = 0.0
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._token = _active_profiler.set(self)
+        self.add_thread()
+        self._started_at = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._sampler.join()
+        self.duration = time.perf_counter() - self._started_at
+        self.remove_thread()
+        _active_profiler.reset(self._token)
+
+    def add_thread(self, ident: Optional[int] = None) -> None:
+        ident = ident or threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+
+    def remove_thread(self, ident: Optional[int] = None) -> None:
+        ident = ident or threading.get_ident()
+        with self._lock:
+            depth = self._threads.get(ident, 0) - 1
+            if depth > 0:
+                self._threads[ident] = depth
+            else:
+                self._threads.pop(ident, None)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                idents = list(self._threads)
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.reverse()
+                self.stacks[";".join(stack)] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        """Render samples as collapsed stacks, heaviest first."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+@contextmanager
+def track_current_thread():
+    """Register the current thread with the request's active profiler, if any."""
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield
+        return
+    profiler.add_thread()
+    try:
+        yield
+    finally:
+        profiler.remove_thread()
+
+
+class ProfileStore:
+    """
+    Bounded in-memory store of collapsed-stack profiles keyed by request id.
+
+    Oldest profiles are evicted once `max_entries` is exceeded or when they
+    are older than `max_age` seconds.
+    """
+
+    def __init__(self, max_entries: int = 20, max_age: float = 3600.0):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, request_id: str, profiler: SamplingProfiler, **meta: Any) -> Dict[str, Any]:
+        entry = {
+            "request_id": request_id,
+            "created_at": time.time(),
+            "duration_ms": round(profiler.duration * 1000, 3),
+            "samples": profiler.samples,
+            "interval_ms": profiler.interval * 1000,
+            "collapsed": profiler.collapsed(),
+            **meta,
+        }
+        with self._lock:
+            self._profiles[request_id] = entry
+            self._profiles.move_to_end(request_id)
+            self._evict()
+        return entry
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._evict()
+            return self._profiles.get(request_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries (without stacks) of stored profiles, newest first."""
+        with self._lock:
+            self._evict()
+            entries = list(self._profiles.values())
+        return [
+            {k: v for k, v in entry.items() if k != "collapsed"}
+            for entry in reversed(entries)
+        ]
+
+    def _evict(self) -> None:
+        cutoff = time.time() - self.max_age
+        while self._profiles:
+            oldest = next(iter(self._profiles.values()))
+            if len(self._profiles) > self.max_entries or oldest["created_at"] < cutoff:
+                self._profiles.popitem(last=False)
+            else:
+                break
+
+
+@lru_cache
+def get_profile_store() -> ProfileStore:
+    """Get the process-wide profile store, sized from settings."""
+    settings = get_settings()
+    return ProfileStore(
+        max_entries=settings.profile_store_size,
+        max_age=settings.profile_max_age_seconds,
+    )
@@ -0,0 +1,31 @@
+"""Task DAG construction and resource-constrained scheduling."""
+
+from .dag import TaskDAG, topological_sort
+from .algorithm import ResourcePool, list_schedule, schedule_tasks
+from .assignment import assign_chefs, min_cost_assignment
+from .coordinator import coordinate_kitchens
+from .batching import LANE_FIELDS, batch_recipes, expand_batches, lane_entries, recipe_units
+from .live import LiveSchedule
+from .series import utilization_series
+from .index import IntervalIndex, ScheduleIndex, ScheduleStore
+
+__all__ = [
+    "TaskDAG",
+    "topological_sort",
+    "ResourcePool",
+    "list_schedule",
+    "schedule_tasks",
+    "assign_chefs",
+    "min_cost_assignment",
+    "coordinate_kitchens",
+    "batch_recipes",
+    "expand_batches",
+    "lane_entries",
+    "LANE_FIELDS",
+    "recipe_units",
+    "LiveSchedule",
+    "utilization_series",
+    "IntervalIndex",
+    "ScheduleIndex",
+    "ScheduleStore",
+]
@@ -0,0 +1,441 @@
+"""
+Resource-constrained list scheduling of a task DAG onto a kitchen.
+
+Tasks are placed in priority order (longest remaining path to the end of
+the DAG first, the classic critical-path list scheduling heuristic) as soon
+as their dependencies are placed. Each task gets the earliest-free unit of
+the equipment in its `resources_needed`. Chefs are handed out at decision
+points: the chef tasks that are ready when the top task could start are
+matched to chefs together at minimum total finish time (see
+scheduler.assignment), so `Chef.get_task_multiplier` and role eligibility
+weigh across tasks rather than first come, first served. Batched tasks
+(`quantity` > 1, see scheduler.batching) are spread over parallel lanes
+instead.
+"""
+
+import heapq
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from knowledge_base import KitchenSnapshot, KitchenView, kitchen_view
+from .assignment import assign_chefs
+from .batching import fill_lanes, lane_entries
+from .dag import TaskDAG, topological_sort
+
+# `resources_needed` entry → equipment kind
+EQUIPMENT_KINDS = {"oven": "oven", "stove": "stove", "burner": "stove", "microwave": "microwave"}
+
+
+class ResourcePool:
+    """
+    When each equipment unit and chef becomes free.
+
+    Ovens contribute one unit per capacity slot, so an oven with capacity 4
+    can run four tasks at once.
+    """
+
+    def __init__(self, view: KitchenView, start: float = 0.0):
+        self.view = view
+        self.units: Dict[str, List[str]] = {
+            "oven": [
+                oven_id
+                for oven_id, capacity in zip(view.oven_ids, view.oven_capacity)
+                for _ in range(capacity)
+            ],
+            "stove": list(view.burner_ids),
+            "microwave": list(view.microwave_ids),
+        }
+        self.free_at: Dict[str, List[float]] = {
+            kind: [start] * len(units) for kind, units in self.units.items()
+        }
+        self.chef_free_at: List[float] = [start] * len(view.chef_ids)
+        self._chef_index = {chef_id: i for i, chef_id in enumerate(view.chef_ids)}
+        # kind → unit id → its slot indices (several for an oven)
+        self.slots: Dict[str, Dict[str, List[int]]] = {}
+        for kind, units in self.units.items():
+            grouped = self.slots[kind] = {}
+            for i, unit_id in enumerate(units):
+                grouped.setdefault(unit_id, []).append(i)
+
+    def reserve(self, resources: Dict[str, str], end: float) -> None:
+        """Mark the units named in an existing assignment busy until `end`."""
+        for kind, resource_id in resources.items():
+            if kind == "chef":
+                chef = self._chef_index.get(resource_id)
+                if chef is not None and self.chef_free_at[chef] < end:
+                    self.chef_free_at[chef] = end
+                continue
+            units = self.units.get(kind)
+            if not units:
+                continue
+            # Any slot of that unit (ovens have several): take the one free soonest
+            free_at = self.free_at[kind]
+            slots = self.slots[kind].get(resource_id)
+            if slots:
+                slot = min(slots, key=free_at.__getitem__)
+                free_at[slot] = max(free_at[slot], end)
+
+    def earliest_unit(self, kind: str) -> int:
+        """Index of the unit of `kind` that frees up first (-1 if the kitchen has none)."""
+        free_at = self.free_at.get(kind)
+        if not free_at:
+            return -1
+        return min(range(len(free_at)), key=free_at.__getitem__)
+
+
+def _upward_ranks(order: List[Dict[str, Any]], dependents: Dict[str, List[str]]) -> Dict[str, float]:
+    """Longest path (in base minutes) from each task to the end of the DAG."""
+    ranks: Dict[str, float] = {}
+    for task in reversed(order):
+        task_id = task["id"]
+        tail = max((ranks[child] for child in dependents[task_id]), default=0.0)
+        ranks[task_id] = float(task.get("duration_minutes", 0)) + tail
+    return ranks
+
+
+def list_schedule(
+    tasks: Union[TaskDAG, Sequence[Dict[str, Any]]],
+    view: KitchenView,
+    start: float = 0.0,
+    fixed: Optional[Dict[str, Dict[str, Any]]] = None,
+    start_hints: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Schedule tasks onto the kitchen.
+
+    Args:
+        tasks: DAG or task dicts (`id`, `duration_minutes`, `dependencies`,
+            `resources_needed`, `task_type`); dependencies on tasks that are
+            neither here nor in `fixed` count as already done
+        view: Runtime view of the kitchen
+        start: Earliest start time in minutes
+        fixed: Existing assignments (id → schedule entry) that must not
+            move, e.g. tasks already started; they keep their resources
+            busy and gate their dependents
+        start_hints: Start times (relative to `start`) from an earlier
+            schedule of a similar DAG. When given, ready tasks are taken
+            in hinted start order instead of longest path first; tasks
+            without a hint get the earliest start their dependencies'
+            hints allow
+
+    Returns:
+        One schedule entry per task, sorted by start time: `id`, `name`,
+        `recipe_name`, `task_type`, `ready` (dependencies done), `start`,
+        `end`, `resources` (kind → id) and `missing_resources` when the
+        kitchen lacks a needed kind. A batched task (`quantity` > 1) is
+        one entry spanning its lanes, with empty `resources`, a `batch`
+        record (`quantity`, the equipment `kind` of its lanes and, for a
+        task needing more kinds, `paired`: kind → unit id per lane) and
+        `lanes`: one record per lane it runs on (see
+        scheduler.batching.LANE_FIELDS and lane_entries)
+    """
+    by_id = tasks.tasks if isinstance(tasks, TaskDAG) else {task["id"]: task for task in tasks}
+    order = topological_sort(by_id)
+    fixed = fixed or {}
+
+    pool = ResourcePool(view, start)
+    ends: Dict[str, float] = {}
+    for entry in fixed.values():
+        ends[entry["id"]] = entry["end"]
+    for entry in lane_entries(fixed.values()):
+        pool.reserve(entry.get("resources", {}), entry["end"])
+
+    dependents: Dict[str, List[str]] = {task_id: [] for task_id in by_id}
+    waiting_on = dict.fromkeys(by_id, 0)
+    for task_id, task in by_id.items():
+        for dep in task.get("dependencies", []):
+            if dep in dependents:
+                dependents[dep].append(task_id)
+                waiting_on[task_id] += 1
+    ranks = _upward_ranks(order, dependents)
+    position = {task["id"]: i for i, task in enumerate(order)}
+    hinted = _hinted_starts(order, start_hints) if start_hints is not None else None
+
+    def priority(task_id: str) -> Tuple:
+        if hinted is not None:
+            return (hinted[task_id], -ranks[task_id], position[task_id], task_id)
+        return (-ranks[task_id], position[task_id], task_id)
+
+    ready = [priority(task_id) for task_id, n in waiting_on.items() if n == 0]
+    heapq.heapify(ready)
+    entries: List[Dict[str, Any]] = []
+
+    while ready:
+        task_id = heapq.heappop(ready)[-1]
+        task = by_id[task_id]
+        earliest = _dependencies_done(task, ends, start)
+
+        quantity = int(task.get("quantity") or 1)
+        if quantity > 1:
+            entry = _place_batched(task, quantity, earliest, pool, view)
+            entries.append(entry)
+            done = [(task_id, entry["end"])]
+        elif "chef" in task.get("resources_needed", []) and view.eligible_chefs(task.get("task_type") or "other"):
+            # Decision point: when this task could start on its first free eligible
+            # chef. Other chef tasks ready by then (at most one per idle chef) are
+            # matched to chefs together with it.
+            group = [task_id]
+            jobs = [_chef_job(task, earliest, pool)]
+            eligible = view.eligible_chefs(jobs[0][2])
+            decision = min(max(jobs[0][0], pool.chef_free_at[c]) for c in eligible)
+            idle = sum(1 for free in pool.chef_free_at if free <= decision)
+            skipped = []
+            while ready and len(group) < idle:
+                item = heapq.heappop(ready)
+                other = by_id[item[-1]]
+                if "chef" in other.get("resources_needed", []) and int(other.get("quantity") or 1) <= 1:
+                    job = _chef_job(other, _dependencies_done(other, ends, start), pool)
+                    if job[0] <= decision and view.eligible_chefs(job[2]):
+                        group.append(item[-1])
+                        jobs.append(job)
+                        continue
+                skipped.append(item)
+            for item in skipped:
+                heapq.heappush(ready, item)
+
+            done = []
+            for member, chef in zip(group, assign_chefs(view, pool.chef_free_at, jobs)):
+                if chef is None:
+                    # Its eligible chefs all went to other tasks here; retry at a later point
+                    heapq.heappush(ready, priority(member))
+                    continue
+                member_task = by_id[member]
+                entry = _place(member_task, _dependencies_done(member_task, ends, start), pool, view, chef)
+                entries.append(entry)
+                done.append((member, entry["end"]))
+        else:
+            # No chef needed, or none whose role may do it: "chef" is then missing
+            entry = _place(task, earliest, pool, view, -1)
+            entries.append(entry)
+            done = [(task_id, entry["end"])]
+
+        for finished, end in done:
+            ends[finished] = end
+            for child in dependents[finished]:
+                waiting_on[child] -= 1
+                if waiting_on[child] == 0:
+                    heapq.heappush(ready, priority(child))
+
+    entries.sort(key=lambda e: (e["start"], position[e["id"]], e["id"]))
+    return entries
+
+
+def _hinted_starts(order: List[Dict[str, Any]], hints: Dict[str, float]) -> Dict[str, float]:
+    """Hinted start of every task: its own hint, else when its dependencies' hinted runs end."""
+    starts: Dict[str, float] = {}
+    ends: Dict[str, float] = {}
+    for task in order:
+        task_id = task["id"]
+        hint = hints.get(task_id)
+        if hint is None:
+            hint = max((ends[dep] for dep in task.get("dependencies", []) if dep in ends), default=0.0)
+        starts[task_id] = hint
+        ends[task_id] = hint + float(task.get("duration_minutes", 0))
+    return starts
+
+
+def _dependencies_done(task: Dict[str, Any], ends: Dict[str, float], start: float) -> float:
+    """When all of a task's placed dependencies have finished (at least `start`)."""
+    return max([start] + [ends[dep] for dep in task.get("dependencies", []) if dep in ends])
+
+
+def _chef_job(task: Dict[str, Any], ready_at: float, pool: ResourcePool) -> Tuple[float, float, str]:
+    """A chef task as an assignment job: (earliest start given its equipment, base minutes, type)."""
+    for kind in _equipment_kinds(task):
+        unit = pool.earliest_unit(kind)
+        if unit >= 0:
+            ready_at = max(ready_at, pool.free_at[kind][unit])
+    return ready_at, float(task.get("duration_minutes", 0)), task.get("task_type") or "other"
+
+
+def _equipment_kinds(task: Dict[str, Any]) -> List[str]:
+    """Distinct equipment kinds in a task's `resources_needed`, in order."""
+    kinds: List[str] = []
+    for resource in task.get("resources_needed", []):
+        kind = EQUIPMENT_KINDS.get(resource)
+        if kind is not None and kind not in kinds:
+            kinds.append(kind)
+    return kinds
+
+
+def _place(
+    task: Dict[str, Any],
+    ready_at: float,
+    pool: ResourcePool,
+    view: KitchenView,
+    chef: int,
+) -> Dict[str, Any]:
+    """
+    Place one task on the earliest-free unit of each equipment kind it
+    needs and on `chef` (-1: no chef), and reserve them.
+    """
+    task_type = task.get("task_type") or "other"
+    duration = float(task.get("duration_minutes", 0))
+    earliest = ready_at
+    missing: List[str] = []
+    units: Dict[str, int] = {}
+    for kind in _equipment_kinds(task):
+        unit = pool.earliest_unit(kind)
+        if unit < 0:
+            missing.append(kind)
+            continue
+        units[kind] = unit
+        earliest = max(earliest, pool.free_at[kind][unit])
+
+    if chef >= 0:
+        begin = max(earliest, pool.chef_free_at[chef])
+        duration *= view.multiplier(chef, task_type)
+    else:
+        begin = earliest
+        if "chef" in task.get("resources_needed", []):
+            missing.append("chef")
+    end = begin + duration
+
+    resources: Dict[str, str] = {}
+    for kind, unit in units.items():
+        pool.free_at[kind][unit] = end
+        resources[kind] = pool.units[kind][unit]
+    if chef >= 0:
+        pool.chef_free_at[chef] = end
+        resources["chef"] = view.chef_ids[chef]
+
+    entry = {
+        "id": task["id"],
+        "name": task.get("name"),
+        "recipe_name": task.get("recipe_name"),
+        "task_type": task.get("task_type"),
+        "ready": round(ready_at, 3),
+        "start": round(begin, 3),
+        "end": round(end, 3),
+        "resources": resources,
+    }
+    if missing:
+        entry["missing_resources"] = missing
+    return entry
+
+
+def _place_batched(
+    task: Dict[str, Any],
+    quantity: int,
+    ready_at: float,
+    pool: ResourcePool,
+    view: KitchenView,
+) -> Dict[str, Any]:
+    """
+    Spread a batched task over parallel lanes and reserve them.
+
+    A lane is one equipment unit (an oven runs `capacity` units per load),
+    one chef for hands-on work (one unit per load), or an equipment unit
+    paired with a chef when the task needs both. A task needing several
+    equipment kinds pairs one unit of each per lane, at the smallest of
+    their per-load capacities. Each used lane runs its loads back to back
+    and becomes one record in the entry's `lanes`.
+    """
+    task_id = task["id"]
+    task_type = task.get("task_type") or "other"
+    needed = task.get("resources_needed", [])
+    base = float(task.get("duration_minutes", 0))
+
+    missing: List[str] = []
+    kinds: List[str] = []
+    for kind in _equipment_kinds(task):
+        (kinds if pool.units[kind] else missing).append(kind)
+
+    # Equipment units of each kind: (free at, unit id, units per load), earliest free first
+    units: List[List[Tuple[float, str, int]]] = [
+        sorted(
+            (max(pool.free_at[kind][i] for i in slots), unit_id, len(slots))
+            for unit_id, slots in pool.slots[kind].items()
+        )
+        for kind in kinds
+    ]
+    chefs: List[Tuple[float, float, int]] = []
+    if "chef" in needed:
+        chefs = sorted(
+            (pool.chef_free_at[c], view.multiplier(c, task_type), c)
+            for c in view.eligible_chefs(task_type)
+        )
+        if not chefs:
+            missing.append("chef")
+
+    # Lanes: (free at, minutes per load, units per load, unit id per kind, chef or -1).
+    # Lane i takes the i-th earliest-free unit of every kind and the i-th chef.
+    lanes: List[Tuple[float, float, int, List[str], int]] = []
+    if units or chefs:
+        for paired in zip(*units, *([chefs] if chefs else [])):
+            equipment = paired[:len(kinds)]
+            free = max([ready_at] + [unit_free for unit_free, _, _ in equipment])
+            minutes, c = base, -1
+            if chefs:
+                chef_free, multiplier, c = paired[-1]
+                free, minutes = max(free, chef_free), base * multiplier
+            per_load = min((per_load for _, _, per_load in equipment), default=1)
+            lanes.append((free, minutes, per_load, [unit_id for _, unit_id, _ in equipment], c))
+    else:
+        lanes = [(ready_at, base, quantity, [], -1)]
+
+    loads = fill_lanes([lane[:3] for lane in lanes], quantity)
+    records = []
+    paired_units: Dict[str, List[str]] = {kind: [] for kind in kinds[1:]}
+    for (begin, minutes, per_load, unit_ids, c), k in zip(lanes, loads):
+        if not k:
+            continue
+        end = begin + k * minutes
+        for kind, unit_id in zip(kinds, unit_ids):
+            for slot in pool.slots[kind][unit_id]:
+                pool.free_at[kind][slot] = end
+        for kind, unit_id in zip(kinds[1:], unit_ids[1:]):
+            paired_units[kind].append(unit_id)
+        if c >= 0:
+            pool.chef_free_at[c] = end
+        records.append([
+            unit_ids[0] if unit_ids else None, view.chef_ids[c] if c >= 0 else None,
+            round(begin, 3), round(end, 3), k, round(minutes, 3), per_load,
+        ])
+    batch: Dict[str, Any] = {"quantity": quantity, "kind": kinds[0] if kinds else None}
+    if paired_units:
+        batch["paired"] = paired_units
+    entry = {
+        "id": task_id,
+        "name": task.get("name"),
+        "recipe_name": task.get("recipe_name"),
+        "task_type": task.get("task_type"),
+        "ready": round(ready_at, 3),
+        "start": min(record[2] for record in records),
+        "end": max(record[3] for record in records),
+        "resources": {},
+        "batch": batch,
+        "lanes": records,
+    }
+    if missing:
+        entry["missing_resources"] = missing
+    return entry
+
+
+def schedule_tasks(
+    dag: Union[TaskDAG, Dict[str, Any]],
+    kitchen: Union[KitchenSnapshot, KitchenView],
+    start: float = 0.0,
+    start_hints: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Build the `schedule` state value for a DAG.
+
+    Args:
+        dag: TaskDAG or its dict form (the `tasks` state value)
+        kitchen: Kitchen snapshot or runtime view
+        start: Start time in minutes
+        start_hints: Task order from an earlier schedule (see list_schedule)
+
+    Returns:
+        {"tasks": [schedule entries], "timeline": {"start", "makespan"}}
+    """
+    if not isinstance(dag, TaskDAG):
+        dag = TaskDAG.from_dict(dag)
+    view = kitchen if isinstance(kitchen, KitchenView) else kitchen_view(kitchen)
+    entries = list_schedule(dag, view, start=start, start_hints=start_hints)
+    return {
+        "tasks": entries,
+        "timeline": {
+            "start": start,
+            "makespan": max((e["end"] for e in entries), default=start) - start,
+        },
+    }
@@ -0,0 +1,138 @@
+"""
+Min-cost chef-to-task assignment.
+
+At a scheduling decision point several ready tasks compete for chefs. The
+cost of giving task i to chef j is the time the task would finish on that
+chef: max(task ready, chef free) + minutes * multiplier, with the
+multiplier from the view's precomputed `Chef.get_task_multiplier` table.
+Chefs whose role can't work a task get INELIGIBLE. Solving the assignment
+(one chef per task) minimises the summed finish time, so a slow chef only
+gets a task when that frees a faster or better-suited one elsewhere.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+from knowledge_base import KitchenView
+
+# Cost of a chef whose role may not work the task; large enough that the
+# solver only uses it when no eligible assignment is left
+INELIGIBLE = 1e9
+
+# (earliest start, base minutes, task type)
+Job = Tuple[float, float, str]
+
+
+def chef_costs(view: KitchenView, chef_free_at: Sequence[float], jobs: Sequence[Job]) -> List[List[float]]:
+    """
+    Finish-time cost matrix, one row per job and one column per chef.
+
+    The multiplier column and eligibility mask are built once per task
+    type, so each row is a single pass over the chefs.
+    """
+    n_chefs = len(view.chef_ids)
+    columns: Dict[str, Tuple[Sequence[float], Sequence[bool]]] = {}
+    rows = []
+    for earliest, minutes, task_type in jobs:
+        column = columns.get(task_type)
+        if column is None:
+            multipliers = view.multiplier_column(task_type)
+            mask = [False] * n_chefs
+            for c in view.eligible_chefs(task_type):
+                mask[c] = True
+            column = columns[task_type] = (multipliers, mask)
+        multipliers, mask = column
+        rows.append([
+            (free if free > earliest else earliest) + minutes * multiplier if ok else INELIGIBLE
+            for free, multiplier, ok in zip(chef_free_at, multipliers, mask)
+        ])
+    return rows
+
+
+def min_cost_assignment(costs: Sequence[Sequence[float]]) -> List[int]:
+    """
+    Solve the rectangular assignment problem (Hungarian method).
+
+    Args:
+        costs: n x m matrix with n <= m
+
+    Returns:
+        Column assigned to each row; distinct columns, minimum total cost
+
+    Raises:
+        ValueError: If there are more rows than columns
+    """
+    n = len(costs)
+    if n == 0:
+        return []
+    m = len(costs[0])
+    if n > m:
+        raise ValueError(f"Cannot assign {n} rows to {m} columns")
+
+    # Shortest augmenting paths with potentials, O(n^2 m); index 0 is a sentinel
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    owner = [0] * (m + 1)  # Row (1-based) holding each column, 0 if free
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        minv = [math.inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            row = costs[owner[j0] - 1]
+            u_i0 = u[owner[j0]]
+            delta = math.inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    reduced = row[j - 1] - u_i0 - v[j]
+                    if reduced < minv[j]:
+                        minv[j] = reduced
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+
+    assignment = [0] * n
+    for j in range(1, m + 1):
+        if owner[j]:
+            assignment[owner[j] - 1] = j - 1
+    return assignment
+
+
+def assign_chefs(
+    view: KitchenView,
+    chef_free_at: Sequence[float],
+    jobs: Sequence[Job],
+) -> List[Optional[int]]:
+    """
+    Give each job its own chef at minimum total finish time.
+
+    Args:
+        view: Runtime view of the kitchen
+        chef_free_at: When each chef (by index) is next free
+        jobs: At most one per chef
+
+    Returns:
+        Chef index per job, or None where only an ineligible chef was left
+        (the job should wait for the next decision point)
+    """
+    costs = chef_costs(view, chef_free_at, jobs)
+    return [
+        chef if costs[i][chef] < INELIGIBLE else None
+        for i, chef in enumerate(min_cost_assignment(costs))
+    ]
@@ -0,0 +1,196 @@
+"""
+Batched super-tasks for large guest counts.
+
+A recipe's tasks describe one yield of the recipe (`servings`). Cooking it
+for an event takes ceil(guest_count / servings) yields ("units"), but
+rather than copying every task once per unit, `batch_recipes` keeps one
+DAG node per distinct task and records the units in `quantity`.
+
+The scheduler then runs a batched task as back-to-back loads on parallel
+lanes: an oven lane bakes `capacity` units per load, a burner or
+microwave lane one unit, and hands-on chef work one unit per chef. The
+number of loads per lane comes from a water-filling search, so the work
+grows with the number of lanes (kitchen size), not with the number of
+guests.
+
+A batched task stays one schedule entry. Its lanes are kept as compact
+records in the entry's `lanes` (fields in LANE_FIELDS order), so the
+workflow state grows with the number of distinct tasks. `lane_entries`
+turns them into one entry per lane for per-resource views (utilization,
+windows, export), and `expand_batches` into one entry per unit.
+"""
+
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# (free at, minutes per load, units per load)
+Lane = Tuple[float, float, int]
+
+# Fields of a lane record in a batched entry's `lanes`: the equipment unit
+# (of the entry's batch `kind`) and chef id, or None, and the lane's loads.
+# Units of any further kinds the task needs are in the batch's `paired`.
+LANE_FIELDS = ("unit", "chef", "start", "end", "loads", "load_minutes", "load_units")
+
+
+def recipe_units(recipe: Dict[str, Any], guest_count: int) -> int:
+    """Yields of `recipe` needed to serve `guest_count` guests (at least 1)."""
+    servings = recipe.get("servings") or 0
+    if not guest_count or servings <= 0:
+        return 1
+    return max(1, math.ceil(guest_count / servings))
+
+
+def batch_recipes(recipes: Iterable[Dict[str, Any]], guest_count: int) -> List[Dict[str, Any]]:
+    """
+    Scale recipes to the guest count as batched super-tasks.
+
+    Args:
+        recipes: Recipes in the analyze_recipes shape
+        guest_count: Guests at the event (0 or unknown: one yield each)
+
+    Returns:
+        The recipes with `quantity` (units) set on every task of a recipe
+        that needs more than one yield; other recipes are returned as is
+    """
+    scaled = []
+    for recipe in recipes:
+        units = recipe_units(recipe, guest_count)
+        if units > 1:
+            recipe = dict(recipe, tasks=[dict(task, quantity=units) for task in recipe.get("tasks", [])])
+        scaled.append(recipe)
+    return scaled
+
+
+def fill_lanes(lanes: Sequence[Lane], quantity: int) -> List[int]:
+    """
+    Loads per lane that finish `quantity` units earliest.
+
+    Finds the smallest finish time T with
+    sum(units_per_load * floor((T - free_at) / minutes_per_load)) >= quantity
+    by adding loads, soonest-ending first, to those finished by the
+    fractional-load bound, then drops loads from the lanes finishing last
+    while the rest still cover the quantity.
+
+    Returns:
+        Number of loads for each lane (same order as `lanes`)
+    """
+    instant = next((i for i, (_, minutes, _) in enumerate(lanes) if minutes <= 0), None)
+    if instant is not None:
+        loads = [0] * len(lanes)
+        loads[instant] = math.ceil(quantity / lanes[instant][2])
+        return loads
+
+    # Continuous relaxation (fractional loads) bounds T from below
+    lo = 0.0
+    rate = offset = 0.0
+    ordered = sorted(lanes)
+    for i, (free, minutes, per_load) in enumerate(ordered):
+        rate += per_load / minutes
+        offset += per_load * free / minutes
+        lo = (quantity + offset) / rate
+        if i + 1 == len(ordered) or lo <= ordered[i + 1][0]:
+            break
+    # Whole loads done by the bound leave less than one load per lane, so
+    # adding the load that ends soonest reaches T in at most len(lanes)
+    # steps. The epsilon keeps T = free + k * minutes from rounding down.
+    loads = [int((lo - free) / minutes + 1e-9) if lo > free else 0 for free, minutes, _ in lanes]
+    done = sum(k * lane[2] for k, lane in zip(loads, lanes))
+    upcoming = [(free + (k + 1) * minutes, i) for i, (k, (free, minutes, _)) in enumerate(zip(loads, lanes))]
+    heapq.heapify(upcoming)
+    while done < quantity:
+        _, i = heapq.heappop(upcoming)
+        loads[i] += 1
+        done += lanes[i][2]
+        heapq.heappush(upcoming, (lanes[i][0] + (loads[i] + 1) * lanes[i][1], i))
+
+    # Trim the excess from whichever lane currently finishes last
+    excess = sum(k * lane[2] for k, lane in zip(loads, lanes)) - quantity
+    while excess > 0:
+        last = max(
+            (i for i, k in enumerate(loads) if k and lanes[i][2] <= excess),
+            key=lambda i: lanes[i][0] + loads[i] * lanes[i][1],
+            default=None,
+        )
+        if last is None:
+            break
+        loads[last] -= 1
+        excess -= lanes[last][2]
+    return loads
+
+
+def lane_entries(entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    One entry per lane of every batched entry, for per-resource views.
+
+    A lane's entry holds its units and chef in `resources` and a `batch`
+    record: `task`, `loads`, `load_minutes`, `load_units` and the `units`
+    [first, last) the lane cooks. Its id is the task id when the task has
+    one lane, else "<task id>#<lane>". Unbatched entries pass through
+    unchanged.
+    """
+    lanes: List[Dict[str, Any]] = []
+    for entry in entries:
+        records = entry.get("lanes")
+        if not records:
+            lanes.append(entry)
+            continue
+        task_id = entry["id"]
+        batch = entry["batch"]
+        paired = batch.get("paired", {})
+        detail = {key: value for key, value in entry.items() if key not in ("batch", "lanes")}
+        first = 0
+        for n, (unit, chef, start, end, loads, load_minutes, load_units) in enumerate(records):
+            resources: Dict[str, str] = {}
+            if unit is not None:
+                resources[batch["kind"]] = unit
+            for kind, paired_units in paired.items():
+                resources[kind] = paired_units[n]
+            if chef is not None:
+                resources["chef"] = chef
+            last = min(batch["quantity"], first + loads * load_units)
+            lanes.append(dict(
+                detail,
+                id=task_id if len(records) == 1 else f"{task_id}#{n + 1}",
+                start=start,
+                end=end,
+                resources=resources,
+                batch={
+                    "task": task_id,
+                    "loads": loads,
+                    "load_minutes": load_minutes,
+                    "load_units": load_units,
+                    "units": [first, last],
+                },
+            ))
+            first = last
+    return lanes
+
+
+def expand_batches(entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Per-unit detail for output: one entry per unit of every batched entry.
+
+    A unit's entry covers the load it was cooked in; its id is
+    "<task id>[<unit>]" with units numbered from 1. Unbatched entries pass
+    through unchanged.
+    """
+    expanded: List[Dict[str, Any]] = []
+    for entry in lane_entries(entries):
+        batch: Optional[Dict[str, Any]] = entry.get("batch")
+        if batch is None:
+            expanded.append(entry)
+            continue
+        detail = {key: value for key, value in entry.items() if key != "batch"}
+        first, last = batch["units"]
+        for unit in range(first, last):
+            load = (unit - first) // batch["load_units"]
+            start = entry["start"] + load * batch["load_minutes"]
+            expanded.append(dict(
+                detail,
+                id=f"{batch['task']}[{unit + 1}]",
+                start=round(start, 3),
+                end=round(start + batch["load_minutes"], 3),
+            ))
+    expanded.sort(key=lambda e: (e["start"], e["id"]))
+    return expanded
@@ -0,0 +1,187 @@
+"""
+Scheduling several kitchens that share a pool of resources.
+
+A group of locations each has its own kitchen and task DAG, plus access
+to shared resources: a commissary oven bank, floating chefs. Only the
+shared units couple the locations, so `coordinate_kitchens` splits the
+problem in two:
+
+1. Every location is scheduled on its own kitchen, and again on its own
+   kitchen plus the whole shared pool. The schedules are independent,
+   so they run in parallel worker processes.
+2. Locations that finish no sooner with the pool are independent: they
+   keep their local schedule and never touch a shared unit. The others
+   contend for the pool and are arbitrated centrally, slowest location
+   first. Each one is rescheduled with the shared units already granted
+   to earlier locations held busy (via `list_schedule`'s `fixed`), and
+   keeps the pooled schedule only if it still beats its local one.
+
+A shared unit is handed from one location to the next rather than
+interleaved: a location's grant holds the unit until its last task there
+ends. That suits units that travel or are booked per location (a
+floating chef, a commissary oven run) and keeps arbitration to one list
+scheduling pass per contending location.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+from config import get_settings
+from knowledge_base import KitchenSnapshot, KitchenView, kitchen_view
+from knowledge_base.snapshot import RESOURCE_FIELDS
+from .algorithm import list_schedule
+from .batching import lane_entries
+from .dag import TaskDAG
+
+# A location must finish at least this many minutes sooner to claim shared units
+MIN_GAIN = 0.001
+
+
+@lru_cache
+def _location_executor() -> Optional[ProcessPoolExecutor]:
+    """Processes for per-location scheduling (None: schedule in this process)."""
+    workers = get_settings().coordinator_workers or os.cpu_count() or 1
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def _schedule(
+    tasks: List[Dict[str, Any]],
+    view: KitchenView,
+    start: float,
+    fixed: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """`list_schedule` with picklable arguments, for the worker processes."""
+    return list_schedule(tasks, view, start=start, fixed=fixed)
+
+
+def _schedule_all(jobs: Sequence[Tuple[List[Dict[str, Any]], KitchenView, float]]) -> List[List[Dict[str, Any]]]:
+    """Run independent scheduling jobs, in parallel when there are worker processes."""
+    executor = _location_executor() if len(jobs) > 1 else None
+    if executor is None:
+        return [_schedule(*job) for job in jobs]
+    return list(executor.map(_schedule, *zip(*jobs)))
+
+
+def _resource_ids(kitchen: KitchenSnapshot) -> Set[str]:
+    return {item.id for field in RESOURCE_FIELDS for item in getattr(kitchen, field)}
+
+
+def _with_pool(kitchen: KitchenSnapshot, pool: KitchenSnapshot) -> KitchenSnapshot:
+    """A location's kitchen with the shared resources added."""
+    return KitchenSnapshot.build(
+        kitchen.kitchen_type,
+        **{field: getattr(kitchen, field) + getattr(pool, field) for field in RESOURCE_FIELDS},
+    )
+
+
+def _makespan(entries: List[Dict[str, Any]], start: float) -> float:
+    return max((entry["end"] for entry in entries), default=start) - start
+
+
+def coordinate_kitchens(
+    locations: Dict[str, Tuple[Union[TaskDAG, Dict[str, Any]], KitchenSnapshot]],
+    pool: KitchenSnapshot,
+    start: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Schedule every location's DAG, sharing `pool` between them.
+
+    Args:
+        locations: Location name → (DAG or its dict form, local kitchen)
+        pool: Shared resources; their ids must not also name a resource
+            in any location's kitchen
+        start: Start time in minutes for every location
+
+    Returns:
+        {"locations": {name: {"tasks", "timeline", "shared"}}, "shared":
+        {resource id: [grants]}, "timeline": {"start", "makespan"}}.
+        Each location's `tasks` and `timeline` are shaped like
+        `schedule_tasks` output, and its `shared` lists the shared
+        resources it was granted. A grant is {"location", "start", "end"}:
+        when that location first and last uses the unit.
+
+    Raises:
+        ValueError: If a shared resource id is also used by a location
+    """
+    shared_ids = _resource_ids(pool)
+    oven_capacity = {oven.id: oven.capacity for oven in pool.ovens}
+    names = list(locations)
+    tasks: Dict[str, List[Dict[str, Any]]] = {}
+    local_views: Dict[str, KitchenView] = {}
+    pooled_views: Dict[str, KitchenView] = {}
+    for name in names:
+        dag, kitchen = locations[name]
+        clash = shared_ids & _resource_ids(kitchen)
+        if clash:
+            raise ValueError(f"Location {name!r} has resources with shared pool ids: {sorted(clash)}")
+        if not isinstance(dag, TaskDAG):
+            dag = TaskDAG.from_dict(dag)
+        tasks[name] = list(dag.tasks.values())
+        local_views[name] = kitchen_view(kitchen)
+        pooled_views[name] = KitchenView.from_kitchen(_with_pool(kitchen, pool))
+
+    # Phase 1: independent schedules, in parallel
+    results = _schedule_all(
+        [(tasks[name], local_views[name], start) for name in names]
+        + [(tasks[name], pooled_views[name], start) for name in names]
+    )
+    local = dict(zip(names, results[:len(names)]))
+    pooled = dict(zip(names, results[len(names):]))
+
+    final: Dict[str, List[Dict[str, Any]]] = {}
+    contenders = []
+    for name in names:
+        uses_pool = any(
+            resource in shared_ids for entry in lane_entries(pooled[name]) for resource in entry["resources"].values()
+        )
+        if uses_pool and _makespan(pooled[name], start) < _makespan(local[name], start) - MIN_GAIN:
+            contenders.append(name)
+        else:
+            final[name] = local[name]
+
+    # Phase 2: arbitrate the shared units between contenders, slowest location first
+    contenders.sort(key=lambda name: (-_makespan(local[name], start), names.index(name)))
+    granted: Dict[str, Dict[str, Any]] = {}  # Held shared units, as `fixed` entries
+    shared: Dict[str, List[Dict[str, Any]]] = {}
+    for name in contenders:
+        entries = pooled[name] if not granted else _schedule(tasks[name], pooled_views[name], start, granted)
+        if _makespan(entries, start) >= _makespan(local[name], start) - MIN_GAIN:
+            final[name] = local[name]
+            continue
+        final[name] = entries
+        usage: Dict[Tuple[str, str], List[float]] = {}
+        for entry in lane_entries(entries):
+            for kind, resource in entry["resources"].items():
+                if resource in shared_ids:
+                    span = usage.setdefault((kind, resource), [entry["start"], entry["end"]])
+                    span[0] = min(span[0], entry["start"])
+                    span[1] = max(span[1], entry["end"])
+        for (kind, resource), (first, last) in usage.items():
+            # Hold every slot of a shared oven, not just the one a fixed entry reserves
+            for slot in range(oven_capacity.get(resource, 1)):
+                key = f"{name}/{resource}#{slot}"
+                granted[key] = {"id": key, "end": last, "resources": {kind: resource}}
+            shared.setdefault(resource, []).append({"location": name, "start": first, "end": last})
+
+    schedules = {}
+    for name in names:
+        entries = final[name]
+        schedules[name] = {
+            "tasks": entries,
+            "timeline": {"start": start, "makespan": _makespan(entries, start)},
+            "shared": sorted({
+                resource for entry in lane_entries(entries) for resource in entry["resources"].values()
+                if resource in shared_ids
+            }),
+        }
+    return {
+        "locations": schedules,
+        "shared": shared,
+        "timeline": {
+            "start": start,
+            "makespan": max((s["timeline"]["makespan"] for s in schedules.values()), default=0.0),
+        },
+    }
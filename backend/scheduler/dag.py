@@ -0,0 +1,165 @@
+"""
+Unified task dependency graph across all recipes.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class TaskDAG:
+    """
+    Directed acyclic graph of recipe tasks.
+
+    Nodes are task dicts (the analyze_recipes task shape) keyed by id, in
+    insertion order. A task's `dependencies` are the ids of tasks that must
+    finish before it starts.
+    """
+
+    def __init__(self):
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.dependents: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self.tasks
+
+    @classmethod
+    def from_recipes(cls, recipes: Iterable[Dict[str, Any]]) -> "TaskDAG":
+        """
+        Flatten the tasks of every recipe into one DAG.
+
+        Task ids only have to be unique within a recipe: when two recipes
+        use the same id, the later recipe's tasks are namespaced as
+        "<recipe_name>/<task_id>" (dependencies included).
+
+        Raises:
+            ValueError: On unknown dependencies or dependency cycles
+        """
+        dag = cls()
+        for recipe in recipes:
+            tasks = recipe.get("tasks", [])
+            prefix = None
+            if any(task["id"] in dag.tasks for task in tasks):
+                prefix = recipe.get("recipe_name") or f"recipe_{len(dag)}"
+            dag.add_tasks(tasks, recipe_name=recipe.get("recipe_name"), prefix=prefix)
+        return dag
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "TaskDAG":
+        """Rebuild a DAG from its `to_dict()` form (the `tasks` state value)."""
+        dag = cls()
+        dag.add_tasks((data or {}).get("nodes", []))
+        return dag
+
+    def add_tasks(
+        self,
+        tasks: Iterable[Dict[str, Any]],
+        recipe_name: Optional[str] = None,
+        prefix: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Add a batch of tasks.
+
+        Tasks may depend on tasks already in the DAG or elsewhere in the
+        batch; only the batch has to be checked for cycles, since existing
+        tasks never depend on new ones.
+
+        Args:
+            tasks: Task dicts with `id` and `dependencies`
+            recipe_name: Stored on each task as `recipe_name` if given
+            prefix: Namespace for the batch's ids ("<prefix>/<id>")
+
+        Returns:
+            Ids of the added tasks
+
+        Raises:
+            ValueError: On duplicate ids, unknown dependencies or cycles
+        """
+        tasks = list(tasks)
+        batch_ids = {task["id"] for task in tasks}
+        rename = (lambda task_id: f"{prefix}/{task_id}") if prefix else (lambda task_id: task_id)
+
+        batch: Dict[str, Dict[str, Any]] = {}
+        for task in tasks:
+            task_id = rename(task["id"])
+            if task_id in self.tasks or task_id in batch:
+                raise ValueError(f"Duplicate task id '{task_id}'")
+            node = dict(task)
+            node["id"] = task_id
+            node["dependencies"] = [
+                rename(dep) if dep in batch_ids else dep for dep in task.get("dependencies", [])
+            ]
+            if recipe_name is not None:
+                node["recipe_name"] = recipe_name
+            batch[task_id] = node
+
+        for node in batch.values():
+            for dep in node["dependencies"]:
+                if dep not in batch and dep not in self.tasks:
+                    raise ValueError(f"Task '{node['id']}' depends on unknown task '{dep}'")
+        topological_sort(batch)  # Raises on cycles
+
+        for task_id, node in batch.items():
+            self.tasks[task_id] = node
+            self.dependents[task_id] = []
+        for task_id, node in batch.items():
+            for dep in node["dependencies"]:
+                self.dependents[dep].append(task_id)
+        return list(batch)
+
+    def remove_tasks(self, task_ids: Iterable[str]) -> None:
+        """Drop tasks (e.g. finished ones). Dependents keep the id in `dependencies`."""
+        for task_id in task_ids:
+            node = self.tasks.pop(task_id, None)
+            if node is None:
+                continue
+            self.dependents.pop(task_id, None)
+            for dep in node["dependencies"]:
+                if dep in self.dependents:
+                    self.dependents[dep].remove(task_id)
+
+    def topological_order(self) -> List[Dict[str, Any]]:
+        """Tasks in dependency order (ties keep insertion order)."""
+        return topological_sort(self.tasks)
+
+    def edges(self) -> List[Tuple[str, str]]:
+        """(dependency, task) pairs for dependencies present in the DAG."""
+        return [
+            (dep, task_id)
+            for task_id, node in self.tasks.items()
+            for dep in node["dependencies"]
+            if dep in self.tasks
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """State representation: {"nodes": [...], "edges": [(before, after), ...]}."""
+        return {"nodes": list(self.tasks.values()), "edges": self.edges()}
+
+
+def topological_sort(tasks: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Kahn's algorithm over `tasks`; dependencies outside `tasks` count as done."""
+    indegree = {task_id: 0 for task_id in tasks}
+    dependents: Dict[str, List[str]] = {task_id: [] for task_id in tasks}
+    for task_id, node in tasks.items():
+        for dep in node.get("dependencies", []):
+            if dep in tasks:
+                indegree[task_id] += 1
+                dependents[dep].append(task_id)
+
+    ready = [task_id for task_id, degree in indegree.items() if degree == 0]
+    order = []
+    i = 0
+    while i < len(ready):
+        task_id = ready[i]
+        i += 1
+        order.append(tasks[task_id])
+        for child in dependents[task_id]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+
+    if len(order) != len(tasks):
+        stuck = sorted(task_id for task_id, degree in indegree.items() if degree > 0)
+        raise ValueError(f"Dependency cycle among tasks: {', '.join(stuck[:10])}")
+    return order
@@ -0,0 +1,214 @@
+"""
+Interval index over schedule entries for windowed (Gantt) queries.
+
+Each resource's tasks are kept in a static augmented interval tree: the
+entries sorted by (start, id) form an implicit balanced binary tree, and
+every node stores the largest end time in its subtree. A window query
+skips subtrees that end before the window or start after it, so it costs
+O(log n + k) for k matching tasks on a resource (whose tasks barely
+overlap) instead of a scan of the whole schedule.
+"""
+
+import heapq
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from .batching import lane_entries
+
+# Index key for entries that hold no resource (e.g. the kitchen lacks it)
+UNASSIGNED = "unassigned"
+
+Key = Tuple[float, str]
+
+
+class IntervalIndex:
+    """Static augmented interval tree over schedule entries of one resource."""
+    __slots__ = ("keys", "ends", "entries", "_max_end")
+
+    def __init__(self, entries: Sequence[Dict[str, Any]]):
+        entries = sorted(entries, key=lambda e: (e["start"], e["id"]))
+        self.entries = entries
+        self.keys: List[Key] = [(e["start"], e["id"]) for e in entries]
+        self.ends = array("d", (e["end"] for e in entries))
+        self._max_end = array("d", self.ends)
+        self._augment(0, len(entries))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _augment(self, lo: int, hi: int) -> float:
+        """Fill `_max_end` for the subtree over [lo, hi) rooted at its midpoint."""
+        if lo >= hi:
+            return float("-inf")
+        mid = (lo + hi) // 2
+        best = max(self.ends[mid], self._augment(lo, mid), self._augment(mid + 1, hi))
+        self._max_end[mid] = best
+        return best
+
+    def overlapping(
+        self,
+        start: float,
+        end: float,
+        after: Optional[Key] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Entries overlapping [start, end), in (start, id) order.
+
+        Zero-length entries count when they sit inside the window.
+
+        Args:
+            start: Window start (minutes)
+            end: Window end (minutes)
+            after: Only entries whose (start, id) key sorts after this one
+                (a pagination cursor)
+        """
+        keys, ends, max_end = self.keys, self.ends, self._max_end
+        # In-order walk of the implicit tree with an explicit stack
+        stack: List[Tuple[int, int, bool]] = [(0, len(keys), False)]
+        while stack:
+            lo, hi, visited = stack.pop()
+            mid = (lo + hi) // 2
+            if visited:
+                s, e = keys[mid][0], ends[mid]
+                if (e > start or (s == e and s >= start)) and (after is None or keys[mid] > after):
+                    yield self.entries[mid]
+                if mid + 1 < hi:
+                    stack.append((mid + 1, hi, False))
+                continue
+            if lo >= hi or max_end[mid] < start:
+                continue  # Everything in this subtree ends before the window
+            if after is not None and keys[hi - 1] <= after:
+                continue  # Everything in this subtree is on earlier pages
+            if keys[lo][0] >= end:
+                continue  # Everything in this subtree starts after the window
+            if keys[mid][0] < end:
+                stack.append((lo, hi, True))
+            if lo < mid:
+                stack.append((lo, mid, False))
+
+
+class ScheduleIndex:
+    """
+    One schedule's entries indexed per resource id.
+
+    An entry holding a chef and a burner is in both resources' trees.
+    Batched tasks are indexed per lane (see scheduler.batching.lane_entries).
+    """
+
+    def __init__(self, schedule: Dict[str, Any]):
+        self.timeline = dict(schedule.get("timeline") or {})
+        by_resource: Dict[str, List[Dict[str, Any]]] = {}
+        self.kinds: Dict[str, str] = {}
+        for entry in lane_entries(schedule.get("tasks", [])):
+            resources = entry.get("resources") or {}
+            if not resources:
+                by_resource.setdefault(UNASSIGNED, []).append(entry)
+            for kind, resource_id in resources.items():
+                by_resource.setdefault(resource_id, []).append(entry)
+                self.kinds[resource_id] = kind
+        self.indexes = {resource_id: IntervalIndex(entries) for resource_id, entries in by_resource.items()}
+        self.task_count = len(schedule.get("tasks", []))
+
+    def resources(self) -> List[Dict[str, Any]]:
+        """Resource ids with their kind and number of tasks."""
+        return [
+            {"id": resource_id, "kind": self.kinds.get(resource_id, UNASSIGNED), "tasks": len(index)}
+            for resource_id, index in self.indexes.items()
+        ]
+
+    def window(
+        self,
+        start: float,
+        end: float,
+        resources: Optional[Sequence[str]] = None,
+        kinds: Optional[Sequence[str]] = None,
+        limit: int = 200,
+        after: Optional[Key] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Key]]:
+        """
+        One page of entries overlapping [start, end) on the selected resources.
+
+        Args:
+            start: Window start (minutes)
+            end: Window end (minutes)
+            resources: Resource ids to include (default: all)
+            kinds: Resource kinds to include, e.g. ["oven", "chef"]
+            limit: Page size
+            after: Cursor returned by the previous page
+
+        Returns:
+            (entries in (start, id) order, cursor for the next page or None)
+
+        Raises:
+            ValueError: On an unknown resource id
+        """
+        if resources:
+            unknown = [r for r in resources if r not in self.indexes]
+            if unknown:
+                raise ValueError(f"Unknown resource(s): {', '.join(unknown)}")
+            selected = list(dict.fromkeys(resources))
+        else:
+            selected = list(self.indexes)
+        if kinds:
+            selected = [r for r in selected if self.kinds.get(r, UNASSIGNED) in kinds]
+
+        # Merge the per-resource streams; an entry on several resources is
+        # adjacent to itself in the merged order, so dedupe against the last id
+        merged = heapq.merge(
+            *(self.indexes[r].overlapping(start, end, after) for r in selected),
+            key=lambda e: (e["start"], e["id"]),
+        )
+        page: List[Dict[str, Any]] = []
+        last_id = None
+        for entry in merged:
+            if entry["id"] == last_id:
+                continue
+            if len(page) == limit:
+                last = page[-1]
+                return page, (last["start"], last["id"])
+            page.append(entry)
+            last_id = entry["id"]
+        return page, None
+
+
+class ScheduleStore:
+    """
+    Bounded in-memory store of indexed schedules keyed by schedule id.
+
+    Oldest schedules are evicted once `max_entries` is exceeded or when
+    they are older than `max_age` seconds.
+    """
+
+    def __init__(self, max_entries: int = 50, max_age: float = 3600.0):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._schedules: "OrderedDict[str, Tuple[float, ScheduleIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, schedule: Dict[str, Any], schedule_id: Optional[str] = None) -> str:
+        """Index a schedule and return its id."""
+        schedule_id = schedule_id or uuid.uuid4().hex
+        index = ScheduleIndex(schedule)
+        with self._lock:
+            self._schedules[schedule_id] = (time.time(), index)
+            self._schedules.move_to_end(schedule_id)
+            self._evict()
+        return schedule_id
+
+    def get(self, schedule_id: str) -> Optional[ScheduleIndex]:
+        with self._lock:
+            self._evict()
+            stored = self._schedules.get(schedule_id)
+        return stored[1] if stored else None
+
+    def _evict(self) -> None:
+        cutoff = time.time() - self.max_age
+        while self._schedules:
+            created_at, _ = next(iter(self._schedules.values()))
+            if len(self._schedules) > self.max_entries or created_at < cutoff:
+                self._schedules.popitem(last=False)
+            else:
+                break
@@ -0,0 +1,350 @@
+"""
+Incremental schedule for tickets fired during live service.
+
+A `LiveSchedule` holds one session's task DAG, every resource's busy
+intervals and the current assignments. Firing a ticket inserts its
+dishes' tasks into the DAG and slots them into idle gaps of the chef and
+equipment timelines without moving anything already planned, so the cost
+per ticket depends on the ticket, not on the size of the backlog, and
+the only changed assignments are the new ones. `replan()` re-optimizes
+every task that has not started yet when a full pass is wanted.
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from knowledge_base import KitchenSnapshot, KitchenView, kitchen_view
+from .algorithm import EQUIPMENT_KINDS, list_schedule
+from .batching import lane_entries
+from .dag import TaskDAG, topological_sort
+
+# Equipment units (earliest gaps first) tried against every eligible chef per task
+UNIT_CANDIDATES = 4
+
+
+class ResourceTimeline:
+    """Non-overlapping busy intervals of one resource unit, sorted by time."""
+    __slots__ = ("starts", "ends")
+
+    def __init__(self):
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+
+    def earliest_fit(self, t: float, duration: float) -> float:
+        """Earliest start >= t with the unit free for `duration` minutes."""
+        starts, ends = self.starts, self.ends
+        i = bisect_right(ends, t)
+        while i < len(starts) and starts[i] < t + duration:
+            t = max(t, ends[i])
+            i += 1
+        return t
+
+    def add(self, start: float, end: float) -> None:
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+    def prune(self, before: float) -> None:
+        """Forget intervals that ended by `before`."""
+        k = bisect_right(self.ends, before)
+        if k:
+            del self.starts[:k]
+            del self.ends[:k]
+
+
+def _fit_all(timelines: Sequence[ResourceTimeline], t: float, duration: float) -> float:
+    """Earliest start >= t at which every timeline is free for `duration`."""
+    while True:
+        fit = t
+        for timeline in timelines:
+            fit = timeline.earliest_fit(fit, duration)
+        if fit == t:
+            return t
+        t = fit
+
+
+class LiveSchedule:
+    """
+    Per-session live plan: task DAG, resource timelines, assignments, ETAs.
+
+    Times are minutes since the session started. Tickets whose last task
+    has finished are pruned whenever the clock advances.
+    """
+
+    def __init__(
+        self,
+        kitchen: Union[KitchenSnapshot, KitchenView],
+        menu: Sequence[Dict[str, Any]],
+    ):
+        self.view = kitchen if isinstance(kitchen, KitchenView) else kitchen_view(kitchen)
+        self.recipes: Dict[str, Dict[str, Any]] = {}
+        for recipe in menu:
+            name = recipe.get("recipe_name")
+            if not name:
+                raise ValueError("Every recipe needs a recipe_name")
+            # Validate each dish's DAG once up front
+            TaskDAG.from_recipes([recipe])
+            self.recipes[name] = recipe
+        self.dag = TaskDAG()
+        self.assignments: Dict[str, Dict[str, Any]] = {}
+        self.ticket_tasks: Dict[str, List[str]] = {}
+        self.etas: Dict[str, float] = {}
+        self.now = 0.0
+        self._reset_timelines()
+
+    def _reset_timelines(self) -> None:
+        view = self.view
+        # Ovens get one timeline per capacity slot
+        self.units: Dict[str, List[Tuple[str, ResourceTimeline]]] = {
+            "oven": [
+                (oven_id, ResourceTimeline())
+                for oven_id, capacity in zip(view.oven_ids, view.oven_capacity)
+                for _ in range(capacity)
+            ],
+            "stove": [(burner_id, ResourceTimeline()) for burner_id in view.burner_ids],
+            "microwave": [(microwave_id, ResourceTimeline()) for microwave_id in view.microwave_ids],
+        }
+        self.chefs: List[ResourceTimeline] = [ResourceTimeline() for _ in view.chef_ids]
+        self._chef_index = {chef_id: i for i, chef_id in enumerate(view.chef_ids)}
+
+    def add_ticket(
+        self,
+        ticket_id: str,
+        items: Sequence[str],
+        now: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fire a ticket and schedule its tasks around the existing plan.
+
+        Args:
+            ticket_id: Unique id of the ticket in this session
+            items: Recipe names on the ticket
+            now: Session time of the order; defaults to the current clock
+
+        Returns:
+            {"ticket_id", "eta_minutes", "changed": [the ticket's schedule
+            entries], "etas": {ticket_id: eta}, "completed": [tickets
+            finished since the last update]}
+
+        Raises:
+            ValueError: On a duplicate ticket id or an unknown dish
+        """
+        if ticket_id in self.ticket_tasks:
+            raise ValueError(f"Ticket '{ticket_id}' was already fired")
+        unknown = [item for item in items if item not in self.recipes]
+        if unknown:
+            raise ValueError(f"Unknown dish(es) on ticket '{ticket_id}': {', '.join(unknown)}")
+
+        completed = self.advance(now) if now is not None else []
+        task_ids: List[str] = []
+        for i, item in enumerate(items):
+            task_ids.extend(self.dag.add_tasks(
+                [dict(task, ticket_id=ticket_id) for task in self.recipes[item].get("tasks", [])],
+                recipe_name=item,
+                prefix=f"{ticket_id}/{i}",
+            ))
+        self.ticket_tasks[ticket_id] = task_ids
+
+        changed = self._insert(task_ids)
+        eta = max((entry["end"] for entry in changed), default=self.now)
+        self.etas[ticket_id] = eta
+        return {
+            "ticket_id": ticket_id,
+            "eta_minutes": eta,
+            "changed": changed,
+            "etas": {ticket_id: eta},
+            "completed": completed,
+        }
+
+    def advance(self, now: float) -> List[str]:
+        """
+        Move the session clock forward and prune finished tickets.
+
+        Returns:
+            Ids of tickets whose last task finished by `now`
+        """
+        self.now = max(self.now, now)
+        completed = [ticket_id for ticket_id, eta in self.etas.items() if eta <= self.now]
+        for ticket_id in completed:
+            task_ids = self.ticket_tasks.pop(ticket_id)
+            self.dag.remove_tasks(task_ids)
+            for task_id in task_ids:
+                self.assignments.pop(task_id, None)
+            del self.etas[ticket_id]
+        for units in self.units.values():
+            for _, timeline in units:
+                timeline.prune(self.now)
+        for timeline in self.chefs:
+            timeline.prune(self.now)
+        return completed
+
+    def replan(self) -> Dict[str, Any]:
+        """
+        Re-optimize every task that has not started yet.
+
+        Started tasks keep their assignments. Returns {"changed": [moved
+        entries], "etas": {ticket_id: eta} for tickets whose ETA changed}.
+        """
+        started = {
+            task_id: entry for task_id, entry in self.assignments.items()
+            if entry["start"] < self.now
+        }
+        pending = [task for task_id, task in self.dag.tasks.items() if task_id not in started]
+        entries = list_schedule(pending, self.view, start=self.now, fixed=started)
+
+        changed = [entry for entry in entries if self.assignments.get(entry["id"]) != entry]
+        for entry in changed:
+            self.assignments[entry["id"]] = entry
+
+        self._reset_timelines()
+        for entry in lane_entries(self.assignments.values()):
+            self._reserve(entry)
+
+        etas = {}
+        for ticket_id in {self.dag.tasks[entry["id"]]["ticket_id"] for entry in changed}:
+            eta = max(self.assignments[task_id]["end"] for task_id in self.ticket_tasks[ticket_id])
+            if eta != self.etas.get(ticket_id):
+                self.etas[ticket_id] = etas[ticket_id] = eta
+        return {"changed": changed, "etas": etas}
+
+    def plan(self) -> List[Dict[str, Any]]:
+        """Current assignments of every task still in the session, by start time."""
+        return sorted(self.assignments.values(), key=lambda e: (e["start"], e["id"]))
+
+    def _reserve(self, entry: Dict[str, Any]) -> None:
+        for kind, resource_id in entry["resources"].items():
+            if kind == "chef":
+                self.chefs[self._chef_index[resource_id]].add(entry["start"], entry["end"])
+                continue
+            # Ovens have a timeline per slot: use the first one free over the interval
+            duration = entry["end"] - entry["start"]
+            slots = [timeline for unit_id, timeline in self.units[kind] if unit_id == resource_id]
+            timeline = next(
+                (t for t in slots if t.earliest_fit(entry["start"], duration) == entry["start"]),
+                slots[0],
+            )
+            timeline.add(entry["start"], entry["end"])
+
+    def _insert(self, task_ids: List[str]) -> List[Dict[str, Any]]:
+        """Place new tasks into idle gaps, critical path first."""
+        tasks = {task_id: self.dag.tasks[task_id] for task_id in task_ids}
+        dependents: Dict[str, List[str]] = {task_id: [] for task_id in tasks}
+        waiting_on = dict.fromkeys(tasks, 0)
+        for task_id, task in tasks.items():
+            for dep in task["dependencies"]:
+                if dep in tasks:
+                    dependents[dep].append(task_id)
+                    waiting_on[task_id] += 1
+        ranks: Dict[str, float] = {}
+        for task in reversed(topological_sort(tasks)):
+            task_id = task["id"]
+            tail = max((ranks[child] for child in dependents[task_id]), default=0.0)
+            ranks[task_id] = float(tasks[task_id].get("duration_minutes", 0)) + tail
+        position = {task_id: i for i, task_id in enumerate(task_ids)}
+
+        ready = [(-ranks[t], position[t], t) for t, n in waiting_on.items() if n == 0]
+        heapq.heapify(ready)
+        view = self.view
+        entries = []
+
+        while ready:
+            _, _, task_id = heapq.heappop(ready)
+            task = tasks[task_id]
+            task_type = task.get("task_type") or "other"
+            needed = task.get("resources_needed", [])
+            base = float(task.get("duration_minutes", 0))
+            earliest = max(
+                [self.now] + [
+                    self.assignments[dep]["end"]
+                    for dep in task["dependencies"] if dep in self.assignments
+                ]
+            )
+
+            # Equipment: the few units (slots) of the first kind with the earliest gaps for
+            # the base duration; other kinds take their earliest unit, fitted jointly
+            kinds = []
+            missing = []
+            for resource in needed:
+                kind = EQUIPMENT_KINDS.get(resource)
+                if kind is not None and kind not in kinds:
+                    kinds.append(kind)
+            candidates: List[Tuple[float, int, str, ResourceTimeline]] = []
+            unit_kind = None
+            extras: List[Tuple[str, str, ResourceTimeline]] = []
+            for kind in kinds:
+                units = self.units[kind]
+                if not units:
+                    missing.append(kind)
+                    continue
+                if unit_kind is None:
+                    unit_kind = kind
+                    candidates = heapq.nsmallest(UNIT_CANDIDATES, (
+                        (timeline.earliest_fit(earliest, base), i, unit_id, timeline)
+                        for i, (unit_id, timeline) in enumerate(units)
+                    ))
+                else:
+                    _, _, unit_id, timeline = min(
+                        (timeline.earliest_fit(earliest, base), i, unit_id, timeline)
+                        for i, (unit_id, timeline) in enumerate(units)
+                    )
+                    extras.append((kind, unit_id, timeline))
+            others = [timeline for _, _, timeline in extras]
+
+            # Chef: the eligible chef and candidate unit that finish earliest
+            chef = -1
+            unit = candidates[0] if candidates else None
+            if "chef" in needed:
+                best_end = None
+                for c in view.eligible_chefs(task_type):
+                    duration = base * view.multiplier(c, task_type)
+                    for candidate in candidates or (None,):
+                        if candidate is not None:
+                            begin = _fit_all([candidate[3], self.chefs[c], *others], candidate[0], duration)
+                        else:
+                            begin = _fit_all([self.chefs[c], *others], earliest, duration)
+                        if best_end is None or begin + duration < best_end:
+                            chef, unit, best_end, start = c, candidate, begin + duration, begin
+                if chef < 0:
+                    missing.append("chef")
+            if chef < 0:
+                if unit is not None:
+                    start = _fit_all([unit[3], *others], unit[0], base)
+                else:
+                    start = _fit_all(others, earliest, base)
+                end = start + base
+            else:
+                end = best_end
+
+            start, end = round(start, 3), round(end, 3)
+            resources: Dict[str, str] = {}
+            if unit is not None:
+                unit[3].add(start, end)
+                resources[unit_kind] = unit[2]
+            for kind, unit_id, timeline in extras:
+                timeline.add(start, end)
+                resources[kind] = unit_id
+            if chef >= 0:
+                self.chefs[chef].add(start, end)
+                resources["chef"] = view.chef_ids[chef]
+
+            entry = {
+                "id": task_id,
+                "name": task.get("name"),
+                "recipe_name": task.get("recipe_name"),
+                "task_type": task.get("task_type"),
+                "ready": round(earliest, 3),
+                "start": start,
+                "end": end,
+                "resources": resources,
+            }
+            if missing:
+                entry["missing_resources"] = missing
+            self.assignments[task_id] = entry
+            entries.append(entry)
+
+            for child in dependents[task_id]:
+                waiting_on[child] -= 1
+                if waiting_on[child] == 0:
+                    heapq.heappush(ready, (-ranks[child], position[child], child))
+
+        return entries
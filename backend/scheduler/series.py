@@ -0,0 +1,165 @@
+"""
+Time-bucketed utilization and queue-depth series derived from a schedule.
+
+The frontend charts these instead of raw schedule tasks. Busy intervals
+are accumulated into fixed-width buckets with a difference array (whole
+buckets) plus direct adds (partial buckets at each end), so the cost is
+O(tasks + buckets) per resource. When the requested resolution would
+produce more than `max_points` buckets, the bucket width is widened so
+the payload stays a few KB regardless of the event length.
+"""
+
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, Tuple, Union
+from knowledge_base import KitchenSnapshot, KitchenView, kitchen_view
+from .algorithm import EQUIPMENT_KINDS
+from .batching import lane_entries
+
+RESOURCE_KINDS = ("oven", "stove", "microwave", "chef")
+
+# Bucket widths (minutes) that downsampling rounds up to
+NICE_WIDTHS = (1, 2, 5, 10, 15, 20, 30, 60, 120, 240, 480, 720, 1440)
+
+
+def _bucket_width(span: float, resolution: float, max_points: int) -> float:
+    if span <= resolution * max_points:
+        return resolution
+    needed = span / max_points
+    return next((w for w in NICE_WIDTHS if w >= needed), math.ceil(needed / 1440) * 1440)
+
+
+def _accumulate(
+    intervals: Iterable[Tuple[float, float]],
+    origin: float,
+    width: float,
+    n: int,
+) -> array:
+    """Minutes of [start, end) coverage per bucket."""
+    partial = array("d", bytes(8 * n))
+    full = array("d", bytes(8 * (n + 1)))  # Difference array of whole-bucket coverage
+    for start, end in intervals:
+        if end <= start:
+            continue
+        a = (start - origin) / width
+        b = (end - origin) / width
+        first, last = int(a), min(int(b), n)
+        if first >= n:
+            continue
+        if first == last:
+            partial[first] += end - start
+            continue
+        partial[first] += (first + 1 - a) * width
+        if last < n:
+            partial[last] += (b - last) * width
+        if last > first + 1:
+            full[first + 1] += 1
+            full[last] -= 1
+    covered = 0.0
+    for i in range(n):
+        covered += full[i]
+        partial[i] += covered * width
+    return partial
+
+
+def utilization_series(
+    schedule: Dict[str, Any],
+    kitchen: Union[KitchenSnapshot, KitchenView],
+    resolution_minutes: float = 5.0,
+    max_points: int = 100,
+    per_resource: bool = True,
+    precision: int = 3,
+) -> Dict[str, Any]:
+    """
+    Derive utilization and queue-depth time series from a schedule.
+
+    Args:
+        schedule: Schedule state value ({"tasks": [entries], ...}); entries
+            need `start`, `end` and `resources`, and `ready` for queue depth
+        kitchen: Kitchen the schedule was built for (capacities, ids)
+        resolution_minutes: Requested bucket width
+        max_points: Upper bound on buckets per series (the width grows to
+            the next round value above span / max_points when exceeded)
+        per_resource: Include a series per oven, burner, microwave and chef
+            (otherwise only the per-kind aggregates)
+        precision: Decimal places kept in the series values
+
+    Returns:
+        {"start", "end", "bucket_minutes", "points",
+         "kinds": {kind: {"capacity", "utilization": [...]}},
+         "resources": {id: {"kind", "capacity", "utilization": [...]}},
+         "queue_depth": {kind: [...]}}
+        Utilization is busy time / (bucket width x capacity); queue depth is
+        the average number of tasks ready but waiting for that kind.
+    """
+    if resolution_minutes <= 0 or max_points < 1:
+        raise ValueError("resolution_minutes and max_points must be positive")
+    view = kitchen if isinstance(kitchen, KitchenView) else kitchen_view(kitchen)
+    entries = lane_entries(schedule.get("tasks", [])) if schedule else []
+
+    origin = min((e.get("ready", e["start"]) for e in entries), default=0.0)
+    horizon = max((e["end"] for e in entries), default=origin)
+    width = _bucket_width(horizon - origin, resolution_minutes, max_points)
+    n = max(1, math.ceil((horizon - origin) / width))
+
+    capacity: Dict[str, Tuple[str, int]] = {}
+    for oven_id, slots in zip(view.oven_ids, view.oven_capacity):
+        capacity[oven_id] = ("oven", slots)
+    capacity.update((burner_id, ("stove", 1)) for burner_id in view.burner_ids)
+    capacity.update((microwave_id, ("microwave", 1)) for microwave_id in view.microwave_ids)
+    capacity.update((chef_id, ("chef", 1)) for chef_id in view.chef_ids)
+    kind_capacity = dict.fromkeys(RESOURCE_KINDS, 0)
+    for kind, slots in capacity.values():
+        kind_capacity[kind] += slots
+
+    busy: Dict[str, List[Tuple[float, float]]] = {resource_id: [] for resource_id in capacity}
+    waiting: Dict[str, List[Tuple[float, float]]] = {kind: [] for kind in RESOURCE_KINDS}
+    for e in entries:
+        resources = e.get("resources", {})
+        for resource_id in resources.values():
+            if resource_id in busy:
+                busy[resource_id].append((e["start"], e["end"]))
+        ready = e.get("ready")
+        if ready is not None and ready < e["start"]:
+            # Attribute the wait to the equipment it needed, else to the chef
+            kind = next((k for k in resources if k in EQUIPMENT_KINDS.values()), "chef")
+            waiting[kind].append((ready, e["start"]))
+
+    scale = 1.0 / width
+    resource_series: Dict[str, Dict[str, Any]] = {}
+    kind_busy = {kind: array("d", bytes(8 * n)) for kind in RESOURCE_KINDS}
+    for resource_id, (kind, slots) in capacity.items():
+        minutes = _accumulate(busy[resource_id], origin, width, n)
+        totals = kind_busy[kind]
+        for i in range(n):
+            totals[i] += minutes[i]
+        if per_resource:
+            resource_series[resource_id] = {
+                "kind": kind,
+                "capacity": slots,
+                "utilization": [round(m * scale / slots, precision) for m in minutes],
+            }
+
+    result: Dict[str, Any] = {
+        "start": origin,
+        "end": horizon,
+        "bucket_minutes": width,
+        "points": n,
+        "kinds": {
+            kind: {
+                "capacity": kind_capacity[kind],
+                "utilization": [
+                    round(m * scale / kind_capacity[kind], precision) if kind_capacity[kind] else 0.0
+                    for m in kind_busy[kind]
+                ],
+            }
+            for kind in RESOURCE_KINDS
+        },
+        "queue_depth": {
+            kind: [round(m * scale, precision) for m in _accumulate(waiting[kind], origin, width, n)]
+            for kind in RESOURCE_KINDS
+        },
+    }
+    if per_resource:
+        result["resources"] = resource_series
+    return result
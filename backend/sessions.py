@@ -0,0 +1,324 @@
+"""
+Interactive planning sessions that publish schedule deltas.
+
+A session holds the final state of one simulation. Kitchen tweaks re-run
+only the deterministic tail of the workflow (schedule, conflicts, output)
+on the stored task DAG, and every change is published as a versioned
+delta: schedule entries that were added, removed or changed (only the
+changed fields), the timeline, and conflicts that appeared or cleared.
+
+Version n's delta applies to version n - 1. The last `delta_history`
+deltas are kept so a client that fell behind can catch up; one further
+behind resyncs from a full snapshot. Subscribers are fed from the
+updating thread into their own event loop, and a subscriber whose queue
+overflows is told to resync rather than holding the updater up.
+
+Sessions live in process memory, like the schedule store: with several
+workers (KITCHENSIM_WORKERS) a session's requests must reach the worker
+that created it.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from config import get_settings
+from history import history_disabled
+from knowledge_base import KitchenSnapshot
+from nodes import detect_conflicts_node, format_output_node, schedule_node
+from simulation import sensitivity_analysis
+
+# Messages a subscriber receives besides deltas
+RESYNC = "resync"  # Deltas were dropped: fetch a snapshot
+CLOSED = "closed"  # The session ended
+
+# Deltas queued per subscriber before it is told to resync instead
+SUBSCRIBER_QUEUE_SIZE = 64
+
+# Workflow state kept per session (everything but per-node timings)
+_STATE_KEYS = (
+    "user_input", "parsed_data", "kitchen", "recipes", "tasks", "schedule",
+    "history", "conflicts", "validation", "output",
+)
+
+
+def schedule_delta(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Changes from schedule `old` to `new` (both `schedule` state values).
+
+    Returns:
+        {"added": [entries], "removed": [ids], "changed": [{"id", field:
+        new value, ...}]}, plus "timeline" when it changed. A field an
+        entry no longer has (e.g. cleared missing_resources) is None.
+    """
+    before = {entry["id"]: entry for entry in old.get("tasks", [])}
+    after = {entry["id"]: entry for entry in new.get("tasks", [])}
+    changed = []
+    for task_id, entry in after.items():
+        previous = before.get(task_id)
+        if previous is None or previous == entry:
+            continue
+        fields = {key: value for key, value in entry.items() if previous.get(key) != value}
+        fields.update({key: None for key in previous.keys() - entry.keys()})
+        changed.append({"id": task_id, **fields})
+    delta = {
+        "added": [entry for task_id, entry in after.items() if task_id not in before],
+        "removed": [task_id for task_id in before if task_id not in after],
+        "changed": changed,
+    }
+    if old.get("timeline") != new.get("timeline"):
+        delta["timeline"] = new.get("timeline")
+    return delta
+
+
+def kitchen_delta(old: KitchenSnapshot, new: KitchenSnapshot) -> Optional[Dict[str, Any]]:
+    """The kitchen dump's changed fields (version and whole resource lists), or None if unchanged."""
+    if new.version == old.version and new.kitchen_type == old.kitchen_type:
+        return None
+    before = old.to_dict()
+    return {key: value for key, value in new.to_dict().items() if before.get(key) != value}
+
+
+def _conflict_key(conflict: Dict[str, Any]) -> str:
+    return json.dumps(conflict, sort_keys=True, default=str)
+
+
+def conflict_delta(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """{"added": [conflicts], "cleared": [conflicts]} between two conflict lists."""
+    before = {_conflict_key(conflict): conflict for conflict in old}
+    after = {_conflict_key(conflict): conflict for conflict in new}
+    return {
+        "added": [conflict for key, conflict in after.items() if key not in before],
+        "cleared": [conflict for key, conflict in before.items() if key not in after],
+    }
+
+
+class Subscription:
+    """A subscriber's queue of deltas (and RESYNC/CLOSED), bound to its event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def push(self, message: Any) -> None:
+        """Queue a message from any thread."""
+        self._loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message: Any) -> None:
+        if self.queue.full():
+            # Replace the backlog with one resync; CLOSED still gets through
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = CLOSED if message == CLOSED else RESYNC
+        self.queue.put_nowait(message)
+
+
+class Session:
+    """One client's planning state, its version and recent deltas."""
+
+    def __init__(self, session_id: str, state: Dict[str, Any], delta_history: int = 100):
+        self.session_id = session_id
+        self.version = 0
+        self.used = time.time()
+        self._state = {key: state[key] for key in _STATE_KEYS if key in state}
+        self._deltas: "deque[Dict[str, Any]]" = deque(maxlen=delta_history)
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The full current state, for clients (re)starting at this version."""
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> Dict[str, Any]:
+        state = self._state
+        kitchen = state.get("kitchen")
+        return {
+            "session_id": self.session_id,
+            "version": self.version,
+            "kitchen": kitchen.to_dict() if kitchen is not None else {},
+            "tasks": state.get("tasks") or {},
+            "schedule": state.get("schedule") or {},
+            "conflicts": state.get("conflicts") or [],
+            "validation": state.get("validation") or {},
+            "output": state.get("output") or "",
+        }
+
+    def update_kitchen(self, change: Callable[[KitchenSnapshot], KitchenSnapshot]) -> Dict[str, Any]:
+        """
+        Apply a kitchen change, reschedule and publish the delta.
+
+        Validation is an LLM call and is not re-run; it describes the
+        session's first schedule. The run history is not used or updated.
+
+        Args:
+            change: Current kitchen → new kitchen
+
+        Returns:
+            The delta: {"version", "base", "kitchen", "schedule",
+            "conflicts"}, plus "output" when the text changed (see
+            kitchen_delta, schedule_delta and conflict_delta).
+
+        Raises:
+            Whatever `change` raises; the session is then unchanged
+        """
+        with self._lock:
+            state = self._state
+            kitchen = change(state["kitchen"])
+            updated = dict(state, kitchen=kitchen)
+            updated.pop("history", None)
+            # A warm start from the run history may reorder the whole plan for a
+            # slightly shorter one; a tweak should only move what it affects
+            with history_disabled():
+                for node in (schedule_node, detect_conflicts_node, format_output_node):
+                    updated.update(node(updated))
+            self.version += 1
+            delta = {
+                "version": self.version,
+                "base": self.version - 1,
+                "kitchen": kitchen_delta(state["kitchen"], kitchen),
+                "schedule": schedule_delta(state.get("schedule") or {}, updated.get("schedule") or {}),
+                "conflicts": conflict_delta(state.get("conflicts") or [], updated.get("conflicts") or []),
+            }
+            if updated.get("output") != state.get("output"):
+                delta["output"] = updated.get("output")
+            self._state = {key: updated[key] for key in _STATE_KEYS if key in updated}
+            self._deltas.append(delta)
+            self.used = time.time()
+            for subscriber in self._subscribers:
+                subscriber.push(delta)
+        return delta
+
+    def sensitivity(self, samples: int = 500, seed: int = 0, top: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Makespan sensitivity of the current schedule (see simulation.sensitivity).
+
+        Returns:
+            The analysis, plus the "version" it describes
+
+        Raises:
+            ValueError: If `samples` < 2 or a duration distribution is malformed
+        """
+        with self._lock:
+            version = self.version
+            schedule = self._state.get("schedule") or {}
+            tasks = self._state.get("tasks") or {}
+        # States are replaced, never mutated, so the analysis can run unlocked
+        return {"version": version, **sensitivity_analysis(schedule, tasks, samples=samples, seed=seed, top=top)}
+
+    def deltas_since(self, version: int) -> Optional[List[Dict[str, Any]]]:
+        """Deltas after `version`, oldest first; None when they are no longer all kept."""
+        with self._lock:
+            return self._deltas_since(version)
+
+    def _deltas_since(self, version: int) -> Optional[List[Dict[str, Any]]]:
+        if version == self.version:
+            return []
+        if version > self.version or not self._deltas or self._deltas[0]["base"] > version:
+            return None
+        return [delta for delta in self._deltas if delta["version"] > version]
+
+    def subscribe(
+        self, loop: asyncio.AbstractEventLoop, since: Optional[int] = None,
+    ) -> Tuple[Subscription, Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
+        """
+        Register a subscriber, with what it needs to catch up from `since`.
+
+        Returns:
+            (subscription, deltas to replay, None) or, when `since` is None
+            or too far behind, (subscription, None, snapshot). Later deltas
+            arrive on the subscription's queue without a gap.
+        """
+        subscription = Subscription(loop)
+        with self._lock:
+            backlog = self._deltas_since(since) if since is not None else None
+            snapshot = self._snapshot() if backlog is None else None
+            self._subscribers.add(subscription)
+        return subscription, backlog, snapshot
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def close(self) -> None:
+        """Tell every subscriber the session ended."""
+        with self._lock:
+            for subscriber in self._subscribers:
+                subscriber.push(CLOSED)
+            self._subscribers.clear()
+
+
+class SessionStore:
+    """
+    Bounded in-memory store of sessions keyed by session id.
+
+    Least recently used sessions are closed once `max_entries` is exceeded
+    or when unused for `max_age` seconds.
+    """
+
+    def __init__(self, max_entries: int = 100, max_age: float = 3600.0, delta_history: int = 100):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.delta_history = delta_history
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, state: Dict[str, Any]) -> Session:
+        """Start a session from a final workflow state."""
+        session = Session(uuid.uuid4().hex, state, delta_history=self.delta_history)
+        with self._lock:
+            self._sessions[session.session_id] = session
+            evicted = self._evict()
+        for stale in evicted:
+            stale.close()
+        return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            evicted = self._evict()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.used = time.time()
+                self._sessions.move_to_end(session_id)
+        for stale in evicted:
+            stale.close()
+        return session
+
+    def remove(self, session_id: str) -> bool:
+        """Close and drop a session. Returns whether it existed."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.close()
+        return True
+
+    def _evict(self) -> List[Session]:
+        cutoff = time.time() - self.max_age
+        evicted = []
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if len(self._sessions) > self.max_entries or session.used < cutoff:
+                evicted.append(self._sessions.popitem(last=False)[1])
+            else:
+                break
+        return evicted
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+@lru_cache
+def get_session_store() -> SessionStore:
+    """Get the process-wide session store, sized from settings."""
+    settings = get_settings()
+    return SessionStore(
+        max_entries=settings.session_store_size,
+        max_age=settings.session_max_age_seconds,
+        delta_history=settings.session_delta_history,
+    )
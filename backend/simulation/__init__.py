@@ -0,0 +1,17 @@
+"""Discrete-event simulation of live service (ticket streams through the kitchen) and schedule sensitivity."""
+
+from .engine import CompiledMenu, simulate_service, STATIONS, QUEUE_NAMES
+from .sensitivity import duration_distribution, sensitivity_analysis
+from .tickets import Ticket, load_pos_log, poisson_tickets
+
+__all__ = [
+    "CompiledMenu",
+    "simulate_service",
+    "STATIONS",
+    "QUEUE_NAMES",
+    "duration_distribution",
+    "sensitivity_analysis",
+    "Ticket",
+    "load_pos_log",
+    "poisson_tickets",
+]
@@ -0,0 +1,401 @@
+"""
+Discrete-event simulation of a service: tickets arrive, dishes are cooked.
+
+Each ticket fires its dishes at once. Every dish is an instance of a
+recipe's task DAG (the `recipes` shape from analyze_recipes): a task
+becomes ready when its dependencies finish, waits for the station in its
+`resources_needed` (oven slot, burner, microwave) and, if it needs one, a
+chef whose role may work its task type, then runs for `duration_minutes`
+scaled by that chef's `get_task_multiplier`. A ticket is done when its last
+dish is done.
+
+The event calendar is a binary heap of task completions merged with the
+pre-sorted arrival stream. Ready tasks wait in FIFO queues keyed by
+(station, chef eligibility class), so dispatch only looks at the head of
+a handful of queues, and all kitchen data comes from the array-backed
+`KitchenView`. This keeps a night of millions of events in the seconds
+range.
+"""
+
+import heapq
+import itertools
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Union
+from knowledge_base import KitchenSnapshot, KitchenView, TASK_TYPES, kitchen_view
+from .tickets import Ticket
+
+# Equipment a task can wait on, by `resources_needed` entry
+STATIONS = ("oven", "stove", "microwave")
+STATION_INDEX = {"oven": 0, "stove": 1, "burner": 1, "microwave": 2}
+
+# Queue report names: one per station, plus tasks that only wait for a chef
+QUEUE_NAMES = STATIONS + ("chef",)
+CHEF_ONLY = len(STATIONS)
+
+# Task types with their own multipliers/eligibility; anything else uses the defaults
+_STEP_TYPES = TASK_TYPES + ("other",)
+_STEP_TYPE_INDEX = {t: i for i, t in enumerate(_STEP_TYPES)}
+
+
+class CompiledMenu:
+    """
+    Recipes flattened into step arrays for the simulator.
+
+    Steps of a dish occupy the contiguous range
+    `dish_first[d] : dish_first[d] + dish_size[d]`.
+    """
+    __slots__ = (
+        "dish_names", "dish_index", "dish_first", "dish_size", "dish_roots", "dish_indegree",
+        "step_ids", "step_station", "step_type", "step_chef", "step_duration", "step_children",
+    )
+
+    def __init__(self, recipes: Sequence[Dict[str, Any]]):
+        self.dish_names: List[str] = []
+        self.dish_index: Dict[str, int] = {}
+        self.dish_first: List[int] = []
+        self.dish_size: List[int] = []
+        self.dish_roots: List[tuple] = []
+        self.dish_indegree: List[List[int]] = []
+        self.step_ids: List[str] = []
+        self.step_station: List[int] = []  # STATIONS index or -1
+        self.step_type: List[int] = []  # _STEP_TYPES index
+        self.step_chef: List[bool] = []
+        self.step_duration: List[float] = []
+        self.step_children: List[tuple] = []  # global step indices
+
+        for recipe in recipes:
+            self._add_dish(recipe)
+
+    def _add_dish(self, recipe: Dict[str, Any]) -> None:
+        name = recipe.get("recipe_name")
+        if not name:
+            raise ValueError("Every recipe needs a recipe_name")
+        if name in self.dish_index:
+            raise ValueError(f"Duplicate recipe '{name}' in menu")
+        tasks = recipe.get("tasks", [])
+        first = len(self.step_ids)
+        local = {task["id"]: i for i, task in enumerate(tasks)}
+        if len(local) != len(tasks):
+            raise ValueError(f"Recipe '{name}' has duplicate task ids")
+
+        children: List[List[int]] = [[] for _ in tasks]
+        indegree = [0] * len(tasks)
+        for i, task in enumerate(tasks):
+            for dep in task.get("dependencies", []):
+                if dep not in local:
+                    raise ValueError(f"Task '{task['id']}' in '{name}' depends on unknown task '{dep}'")
+                children[local[dep]].append(first + i)
+                indegree[i] += 1
+        _check_acyclic(name, children, indegree, first)
+
+        for i, task in enumerate(tasks):
+            needed = task.get("resources_needed", [])
+            station = next((STATION_INDEX[r] for r in needed if r in STATION_INDEX), -1)
+            self.step_ids.append(task["id"])
+            self.step_station.append(station)
+            self.step_type.append(_STEP_TYPE_INDEX.get(task.get("task_type"), len(TASK_TYPES)))
+            self.step_chef.append("chef" in needed)
+            self.step_duration.append(float(task.get("duration_minutes", 0)))
+            self.step_children.append(tuple(children[i]))
+
+        self.dish_index[name] = len(self.dish_names)
+        self.dish_names.append(name)
+        self.dish_first.append(first)
+        self.dish_size.append(len(tasks))
+        self.dish_roots.append(tuple(first + i for i, deg in enumerate(indegree) if deg == 0))
+        self.dish_indegree.append(indegree)
+
+
+def _check_acyclic(name: str, children: List[List[int]], indegree: List[int], first: int) -> None:
+    remaining = list(indegree)
+    ready = [i for i, deg in enumerate(remaining) if deg == 0]
+    seen = 0
+    while ready:
+        i = ready.pop()
+        seen += 1
+        for child in children[i]:
+            remaining[child - first] -= 1
+            if remaining[child - first] == 0:
+                ready.append(child - first)
+    if seen != len(indegree):
+        raise ValueError(f"Recipe '{name}' has a dependency cycle")
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(q * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def simulate_service(
+    kitchen: Union[KitchenSnapshot, KitchenView],
+    menu: Union[CompiledMenu, Sequence[Dict[str, Any]]],
+    tickets: Sequence[Ticket],
+    include_ticket_times: bool = False,
+) -> Dict[str, Any]:
+    """
+    Simulate a service on a kitchen and report how it held up.
+
+    Args:
+        kitchen: Kitchen snapshot (or its runtime view) to cook in
+        menu: Recipes in the analyze_recipes shape, or a CompiledMenu
+        tickets: Ticket stream; items are recipe names
+        include_ticket_times: Also return every ticket's time, in arrival order
+
+    Returns:
+        Dict with `tickets` (ticket time stats in minutes), `stations`
+        (capacity and utilization), `queues` (average/max length and
+        average wait per station, plus tasks waiting only for a chef),
+        `chefs` (utilization and task counts), `events` and
+        `service_minutes` (time of the last event)
+
+    Raises:
+        ValueError: If a ticket orders an unknown dish, or the menu needs a
+            station or chef the kitchen does not have
+    """
+    view = kitchen if isinstance(kitchen, KitchenView) else kitchen_view(kitchen)
+    if not isinstance(menu, CompiledMenu):
+        menu = CompiledMenu(menu)
+    tickets = sorted(tickets, key=lambda t: t.arrival_minutes)
+
+    capacity = [sum(view.oven_capacity), len(view.burner_ids), len(view.microwave_ids)]
+    n_chefs = len(view.chef_ids)
+
+    # Chefs for each task type, fastest first
+    multipliers = [
+        [view.multiplier(chef, task_type) for chef in range(n_chefs)]
+        for task_type in _STEP_TYPES
+    ]
+    chef_order = [
+        tuple(sorted(view.eligible_chefs(task_type), key=lambda c, t=t: (multipliers[t][c], c)))
+        for t, task_type in enumerate(_STEP_TYPES)
+    ]
+
+    # Queue per (station, chef class): q = (station + 1) * (types + 1) + (type + 1 if chef else 0)
+    width = len(_STEP_TYPES) + 1
+    n_queues = (len(STATIONS) + 1) * width
+    q_station = [q // width - 1 for q in range(n_queues)]
+    q_chefs = [chef_order[q % width - 1] if q % width else None for q in range(n_queues)]
+    q_report = [station if station >= 0 else CHEF_ONLY for station in q_station]
+    step_queue = [
+        (station + 1) * width + (step_type + 1 if needs_chef else 0)
+        for station, step_type, needs_chef in zip(menu.step_station, menu.step_type, menu.step_chef)
+    ]
+
+    # Fail fast instead of leaving tasks queued forever
+    dish_indices = []
+    for ticket in tickets:
+        try:
+            dish_indices.append([menu.dish_index[item] for item in ticket.items])
+        except KeyError as e:
+            raise ValueError(f"Ticket '{ticket.ticket_id}' orders unknown dish {e}") from None
+    ordered = {d for dishes in dish_indices for d in dishes}
+    for d in ordered:
+        first = menu.dish_first[d]
+        for step in range(first, first + menu.dish_size[d]):
+            station = menu.step_station[step]
+            if station >= 0 and not capacity[station]:
+                raise ValueError(
+                    f"Dish '{menu.dish_names[d]}' needs a {STATIONS[station]} but the kitchen has none"
+                )
+            if menu.step_chef[step] and not chef_order[menu.step_type[step]]:
+                raise ValueError(
+                    f"Dish '{menu.dish_names[d]}' has {_STEP_TYPES[menu.step_type[step]]} tasks "
+                    f"but no chef can work them"
+                )
+
+    step_station = menu.step_station
+    step_type = menu.step_type
+    step_duration = menu.step_duration
+    step_children = menu.step_children
+    dish_first = menu.dish_first
+
+    heap: List[tuple] = []
+    push = heapq.heappush
+    pop = heapq.heappop
+    next_seq = itertools.count().__next__
+
+    queues = [deque() for _ in range(n_queues)]
+    active: List[int] = []  # Non-empty queues
+    free_units = list(capacity)
+    chef_free = [True] * n_chefs
+
+    # Per-dish-instance state
+    item_ticket: List[int] = []
+    item_dish: List[int] = []
+    item_pending: List[Optional[List[int]]] = []
+    item_remaining: List[int] = []
+    ticket_remaining = [len(dishes) for dishes in dish_indices]
+    ticket_time = [0.0] * len(tickets)
+
+    # Stats
+    station_busy = [0.0] * len(STATIONS)
+    chef_busy = [0.0] * n_chefs
+    chef_tasks = [0] * n_chefs
+    waiting = [0] * len(QUEUE_NAMES)
+    max_waiting = [0] * len(QUEUE_NAMES)
+    wait_total = [0.0] * len(QUEUE_NAMES)
+    wait_count = [0] * len(QUEUE_NAMES)
+    events = 0
+    now = 0.0
+
+    def ready(step: int, item: int, now: float) -> None:
+        q = step_queue[step]
+        if q == 0:
+            # Needs neither a station nor a chef (e.g. resting): starts at once
+            push(heap, (now + step_duration[step], next_seq(), item, step, -1))
+            return
+        queue = queues[q]
+        if not queue:
+            active.append(q)
+        queue.append((next_seq(), now, item, step))
+        report = q_report[q]
+        waiting[report] += 1
+        if waiting[report] > max_waiting[report]:
+            max_waiting[report] = waiting[report]
+
+    def dispatch(now: float) -> None:
+        # Start the oldest waiting task that can run, until none can
+        while active:
+            best_q = -1
+            best_seq = None
+            best_chef = -1
+            for q in active:
+                head_seq = queues[q][0][0]
+                if best_seq is not None and head_seq > best_seq:
+                    continue
+                station = q_station[q]
+                if station >= 0 and not free_units[station]:
+                    continue
+                chef = -1
+                order = q_chefs[q]
+                if order is not None:
+                    for c in order:
+                        if chef_free[c]:
+                            chef = c
+                            break
+                    if chef < 0:
+                        continue
+                best_q, best_seq, best_chef = q, head_seq, chef
+            if best_q < 0:
+                return
+
+            queue = queues[best_q]
+            _, enqueued, item, step = queue.popleft()
+            if not queue:
+                active.remove(best_q)
+            report = q_report[best_q]
+            waiting[report] -= 1
+            wait_total[report] += now - enqueued
+            wait_count[report] += 1
+
+            duration = step_duration[step]
+            if best_chef >= 0:
+                duration *= multipliers[step_type[step]][best_chef]
+                chef_free[best_chef] = False
+                chef_busy[best_chef] += duration
+                chef_tasks[best_chef] += 1
+            station = step_station[step]
+            if station >= 0:
+                free_units[station] -= 1
+                station_busy[station] += duration
+            push(heap, (now + duration, next_seq(), item, step, best_chef))
+
+    def finish_item(item: int, now: float) -> None:
+        item_pending[item] = None
+        ticket = item_ticket[item]
+        ticket_remaining[ticket] -= 1
+        if not ticket_remaining[ticket]:
+            ticket_time[ticket] = now - tickets[ticket].arrival_minutes
+
+    arrival_index = 0
+    n_tickets = len(tickets)
+    while True:
+        if arrival_index < n_tickets and (
+            not heap or tickets[arrival_index].arrival_minutes <= heap[0][0]
+        ):
+            ticket = arrival_index
+            arrival_index += 1
+            now = tickets[ticket].arrival_minutes
+            events += 1
+            if not ticket_remaining[ticket]:
+                continue
+            for d in dish_indices[ticket]:
+                item = len(item_dish)
+                item_ticket.append(ticket)
+                item_dish.append(d)
+                item_pending.append(list(menu.dish_indegree[d]))
+                item_remaining.append(menu.dish_size[d])
+                if not menu.dish_size[d]:
+                    finish_item(item, now)
+                for step in menu.dish_roots[d]:
+                    ready(step, item, now)
+        elif heap:
+            now, _, item, step, chef = pop(heap)
+            events += 1
+            if chef >= 0:
+                chef_free[chef] = True
+            station = step_station[step]
+            if station >= 0:
+                free_units[station] += 1
+            children = step_children[step]
+            if children:
+                pending = item_pending[item]
+                first = dish_first[item_dish[item]]
+                for child in children:
+                    pending[child - first] -= 1
+                    if not pending[child - first]:
+                        ready(child, item, now)
+            item_remaining[item] -= 1
+            if not item_remaining[item]:
+                finish_item(item, now)
+        else:
+            break
+        dispatch(now)
+
+    horizon = now
+    times = sorted(ticket_time)
+    report: Dict[str, Any] = {
+        "tickets": {
+            "count": n_tickets,
+            "mean_minutes": round(sum(times) / n_tickets, 3) if n_tickets else 0.0,
+            "p50_minutes": round(_percentile(times, 0.50), 3),
+            "p90_minutes": round(_percentile(times, 0.90), 3),
+            "p95_minutes": round(_percentile(times, 0.95), 3),
+            "max_minutes": round(times[-1], 3) if times else 0.0,
+        },
+        "stations": {
+            name: {
+                "capacity": capacity[s],
+                "utilization": round(station_busy[s] / (capacity[s] * horizon), 4)
+                if capacity[s] and horizon else 0.0,
+            }
+            for s, name in enumerate(STATIONS)
+        },
+        "queues": {
+            name: {
+                "avg_length": round(wait_total[s] / horizon, 3) if horizon else 0.0,
+                "max_length": max_waiting[s],
+                "avg_wait_minutes": round(wait_total[s] / wait_count[s], 3) if wait_count[s] else 0.0,
+            }
+            for s, name in enumerate(QUEUE_NAMES)
+        },
+        "chefs": {
+            chef_id: {
+                "utilization": round(chef_busy[c] / horizon, 4) if horizon else 0.0,
+                "busy_minutes": round(chef_busy[c], 3),
+                "tasks": chef_tasks[c],
+            }
+            for c, chef_id in enumerate(view.chef_ids)
+        },
+        "events": events,
+        "service_minutes": round(horizon, 3),
+    }
+    if include_ticket_times:
+        report["ticket_times"] = [
+            {"ticket_id": t.ticket_id, "arrival_minutes": t.arrival_minutes, "minutes": round(m, 3)}
+            for t, m in zip(tickets, ticket_time)
+        ]
+    return report
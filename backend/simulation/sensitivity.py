@@ -0,0 +1,370 @@
+"""
+Duration uncertainty and makespan sensitivity of a schedule.
+
+Task durations are estimates. A task may carry a `duration_distribution`
+in its own minutes, before any chef multiplier:
+
+- {"type": "triangular", "min", "mode", "max"}
+- {"type": "lognormal", "median", "sigma"}: median * exp(sigma * N(0, 1))
+
+Tasks without one get a triangular spread around `duration_minutes` by
+task type, twice as wide when the duration was inferred rather than
+stated by the recipe.
+
+`sensitivity_analysis` replays a finished schedule under sampled
+durations. The plan stays fixed: every task keeps its chef and
+equipment, and every resource works its tasks in the same order. A task
+starts when its dependencies and the task before it on each of its
+resources are done. A sample is the task's scheduled length (which
+already includes the assigned chef's `get_task_multiplier`) times
+sampled / planned duration, so a slow or tired chef shifts and stretches
+the whole distribution, not just the mode. Lanes of a batched task share
+one sample.
+
+Samples are run in batches: each pass over the schedule moves a whole
+batch of samples through every task, so the per-task work is a few list
+operations rather than one schedule walk per sample. Per task, the pass
+reports:
+
+- criticality: share of samples in which the task had no slack
+- correlation: Pearson correlation of its duration with the makespan
+- sensitivity: criticality * duration std / makespan std (the schedule
+  sensitivity index), the ranking key
+
+Per resource, it reports the share of samples in which the resource
+carried critical work, and how many critical minutes it carried.
+"""
+
+import bisect
+import math
+import random
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from scheduler import TaskDAG, lane_entries
+
+# Relative (low, high) spread around the estimate for tasks without a distribution
+DEFAULT_SPREADS = {
+    "prep": (0.85, 1.3),
+    "cook": (0.9, 1.25),
+    "passive": (0.95, 1.1),
+    "plate": (0.85, 1.3),
+}
+DEFAULT_SPREAD = (0.9, 1.25)
+INFERRED_WIDENING = 2.0  # Inferred durations spread this much further from the estimate
+
+# Slack below which a task counts as critical in a sample, in minutes
+CRITICAL_SLACK = 1e-6
+
+
+def duration_distribution(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The duration distribution of a task in its own minutes.
+
+    Raises:
+        ValueError: If the task's `duration_distribution` is malformed
+    """
+    spec = task.get("duration_distribution")
+    if spec is None:
+        estimate = float(task.get("duration_minutes", 0))
+        low, high = DEFAULT_SPREADS.get(task.get("task_type"), DEFAULT_SPREAD)
+        if task.get("duration_source") == "inferred":
+            low = max(0.0, 1 - (1 - low) * INFERRED_WIDENING)
+            high = 1 + (high - 1) * INFERRED_WIDENING
+        return {"type": "triangular", "min": estimate * low, "mode": estimate, "max": estimate * high}
+
+    kind = spec.get("type", "triangular")
+    try:
+        if kind == "triangular":
+            low, mode, high = (float(spec[key]) for key in ("min", "mode", "max"))
+        elif kind == "lognormal":
+            median, sigma = float(spec["median"]), float(spec["sigma"])
+        else:
+            raise ValueError(f"Task {task.get('id')!r}: unknown duration distribution {kind!r}")
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Task {task.get('id')!r}: {kind} duration is missing or has a bad {e}") from e
+    if kind == "triangular":
+        if not 0 <= low <= mode <= high:
+            raise ValueError(f"Task {task.get('id')!r}: triangular duration needs 0 <= min <= mode <= max")
+        return {"type": "triangular", "min": low, "mode": mode, "max": high}
+    if median < 0 or sigma < 0:
+        raise ValueError(f"Task {task.get('id')!r}: lognormal duration needs median >= 0 and sigma >= 0")
+    return {"type": "lognormal", "median": median, "sigma": sigma}
+
+
+def _sampler(distribution: Dict[str, Any], rng: random.Random):
+    """A function drawing `n` samples of a distribution."""
+    if distribution["type"] == "lognormal":
+        median, sigma = distribution["median"], distribution["sigma"]
+        gauss = rng.gauss
+        return lambda n: [median * math.exp(sigma * gauss(0.0, 1.0)) for _ in range(n)]
+    low, mode, high = distribution["min"], distribution["mode"], distribution["max"]
+    if high <= low:
+        return lambda n: [low] * n
+    split = (mode - low) / (high - low)
+    draw = rng.random
+
+    def sample(n: int) -> List[float]:
+        # Inverse CDF of the triangular distribution
+        values = []
+        for u in (draw() for _ in range(n)):
+            if u < split:
+                values.append(low + math.sqrt(u * (high - low) * (mode - low)))
+            else:
+                values.append(high - math.sqrt((1 - u) * (high - low) * (high - mode)))
+        return values
+    return sample
+
+
+def _entry_graph(
+    entries: List[Dict[str, Any]], dag: TaskDAG,
+) -> Tuple[List[int], List[List[int]], List[List[int]]]:
+    """
+    Precedence between schedule entries.
+
+    An entry waits for every entry of its task's dependencies, and on each
+    of its resources for the entry that freed it: the latest-ending entry
+    there that ended by this one's start. A task with several lanes gets
+    an extra zero-length join node after them, numbered from
+    len(entries), so lanes wait on one node per dependency rather than on
+    every lane of it.
+
+    Returns:
+        (topological order, predecessors, successors) over all nodes
+    """
+    by_task: Dict[str, List[int]] = defaultdict(list)
+    for index, entry in enumerate(entries):
+        by_task[entry["batch"]["task"] if "batch" in entry else entry["id"]].append(index)
+
+    predecessors: List[set] = [set() for _ in entries]
+    done_node: Dict[str, int] = {}
+    for task_id, indexes in by_task.items():
+        if len(indexes) == 1:
+            done_node[task_id] = indexes[0]
+        else:
+            done_node[task_id] = len(predecessors)
+            predecessors.append(set(indexes))
+    for task_id, indexes in by_task.items():
+        task = dag.tasks.get(task_id) or {}
+        before = {done_node[dependency] for dependency in task.get("dependencies", []) if dependency in done_node}
+        for index in indexes:
+            predecessors[index].update(before)
+
+    on_resource: Dict[str, List[int]] = defaultdict(list)
+    for index, entry in enumerate(entries):
+        for resource in (entry.get("resources") or {}).values():
+            on_resource[resource].append(index)
+    for indexes in on_resource.values():
+        indexes.sort(key=lambda i: (entries[i]["start"], entries[i]["end"]))
+        freed: List[Tuple[float, int]] = []  # (end, entry) of earlier entries, by end
+        for index in indexes:
+            position = bisect.bisect_right(freed, (entries[index]["start"] + CRITICAL_SLACK, len(entries)))
+            if position:
+                predecessors[index].add(freed[position - 1][1])
+            bisect.insort(freed, (entries[index]["end"], index))
+
+    successors: List[List[int]] = [[] for _ in predecessors]
+    for index, before in enumerate(predecessors):
+        for predecessor in before:
+            successors[predecessor].append(index)
+    waiting = [len(before) for before in predecessors]
+    order = [index for index, count in enumerate(waiting) if count == 0]
+    for index in order:  # Grows while iterating
+        for successor in successors[index]:
+            waiting[successor] -= 1
+            if waiting[successor] == 0:
+                order.append(successor)
+    if len(order) != len(predecessors):
+        raise ValueError("Schedule entries have cyclic dependencies")
+    return order, [sorted(before) for before in predecessors], successors
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def sensitivity_analysis(
+    schedule: Dict[str, Any],
+    dag: Union[TaskDAG, Dict[str, Any]],
+    samples: int = 500,
+    seed: int = 0,
+    batch_size: int = 64,
+    top: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Rank tasks and resources by how much they drive makespan variance.
+
+    Args:
+        schedule: The `schedule` state value to replay
+        dag: The DAG it schedules (or its dict form), for dependencies and
+            duration distributions
+        samples: Monte Carlo samples
+        seed: Random seed
+        batch_size: Samples moved through the schedule per pass
+        top: Keep only this many tasks and resources (default: all)
+
+    Returns:
+        {"samples", "seed", "makespan": {"planned", "mean", "std", "p50",
+        "p90", "p95", "buffer_p90"}, "tasks": [...], "resources": [...]},
+        tasks and resources most sensitive first. `buffer_p90` is how much
+        longer than planned the 90th percentile runs.
+
+    Raises:
+        ValueError: If `samples` < 2 or a duration distribution is malformed
+    """
+    if samples < 2:
+        raise ValueError("Sensitivity analysis needs at least 2 samples")
+    if not isinstance(dag, TaskDAG):
+        dag = TaskDAG.from_dict(dag)
+    entries = lane_entries(schedule.get("tasks", []))
+    origin = float((schedule.get("timeline") or {}).get("start", 0.0))
+    planned = float((schedule.get("timeline") or {}).get("makespan", 0.0))
+    order, predecessors, successors = _entry_graph(entries, dag)
+    reverse_order = order[::-1]
+    task_of = [entry["batch"]["task"] if "batch" in entry else entry["id"] for entry in entries]
+    task_ids = list(dict.fromkeys(task_of))
+    task_index = {task_id: i for i, task_id in enumerate(task_ids)}
+    # Join nodes have no length; their task index is never used
+    joins = len(predecessors) - len(entries)
+    lengths = [entry["end"] - entry["start"] for entry in entries] + [0.0] * joins
+    entry_task = [task_index[task_id] for task_id in task_of] + [0] * joins
+
+    rng = random.Random(seed)
+    planned_minutes = [0.0] * len(task_ids)
+    for index, entry in enumerate(entries):
+        planned_minutes[entry_task[index]] += lengths[index]
+    samplers = []
+    estimates = []
+    for task_id in task_ids:
+        task = dag.tasks.get(task_id) or {"id": task_id, "duration_minutes": 0}
+        samplers.append(_sampler(duration_distribution(task), rng))
+        estimates.append(float(task.get("duration_minutes", 0)))
+
+    sinks = [index for index, after in enumerate(successors) if not after]
+
+    # Running sums over samples
+    factor_sum = [0.0] * len(task_ids)
+    factor_squares = [0.0] * len(task_ids)
+    factor_makespan = [0.0] * len(task_ids)
+    critical_tasks = [0] * len(task_ids)
+    critical_resources: Dict[str, int] = defaultdict(int)
+    critical_minutes: Dict[str, float] = defaultdict(float)
+    makespans: List[float] = []
+
+    done = 0
+    while done < samples:
+        size = min(batch_size, samples - done)
+        done += size
+        # Sampled / planned duration per task, shared by its lanes
+        factors = [
+            [value / estimate for value in sample(size)] if estimate > 0 else [1.0] * size
+            for sample, estimate in zip(samplers, estimates)
+        ]
+
+        # Forward pass: earliest starts and ends under the fixed plan
+        starts: List[Optional[List[float]]] = [None] * len(lengths)
+        ends: List[Optional[List[float]]] = [None] * len(lengths)
+        for index in order:
+            start = [origin] * size
+            for predecessor in predecessors[index]:
+                start = list(map(max, start, ends[predecessor]))
+            length = lengths[index]
+            starts[index] = start
+            ends[index] = [s + length * f for s, f in zip(start, factors[entry_task[index]])]
+        makespan = [origin] * size
+        for index in sinks:
+            makespan = list(map(max, makespan, ends[index]))
+
+        # Backward pass: latest ends that keep the makespan; no slack is critical
+        latest: List[Optional[List[float]]] = [None] * len(lengths)
+        critical: List[Tuple[int, List[int]]] = []
+        for index in reverse_order:
+            finish = makespan
+            for successor in successors[index]:
+                finish = list(map(min, finish, latest[successor]))
+            task = entry_task[index]
+            length = lengths[index]
+            latest[index] = [f - length * factor for f, factor in zip(finish, factors[task])]
+            if index < len(entries):
+                hits = [b for b, late, early in zip(range(size), latest[index], starts[index])
+                        if late - early <= CRITICAL_SLACK]
+                if hits:
+                    critical.append((index, hits))
+
+        makespans.extend(m - origin for m in makespan)
+        # A task or resource counts once per sample however many lanes were critical
+        task_hits: Dict[int, Set[int]] = defaultdict(set)
+        resource_hits: Dict[str, Set[int]] = defaultdict(set)
+        for index, hits in critical:
+            task = entry_task[index]
+            task_hits[task].update(hits)
+            minutes = lengths[index] * sum(factors[task][b] for b in hits)
+            for resource in (entries[index].get("resources") or {}).values():
+                resource_hits[resource].update(hits)
+                critical_minutes[resource] += minutes
+        for task, hits in task_hits.items():
+            critical_tasks[task] += len(hits)
+        for resource, hits in resource_hits.items():
+            critical_resources[resource] += len(hits)
+        for task, sampled in enumerate(factors):
+            factor_sum[task] += sum(sampled)
+            factor_squares[task] += sum(f * f for f in sampled)
+            factor_makespan[task] += sum(f * (m - origin) for f, m in zip(sampled, makespan))
+
+    mean = sum(makespans) / samples
+    std = math.sqrt(max(0.0, sum((m - mean) ** 2 for m in makespans) / (samples - 1)))
+    ordered = sorted(makespans)
+
+    tasks = []
+    for task, task_id in enumerate(task_ids):
+        factor_mean = factor_sum[task] / samples
+        factor_var = max(0.0, factor_squares[task] / samples - factor_mean ** 2) * samples / (samples - 1)
+        covariance = (factor_makespan[task] / samples - factor_mean * mean) * samples / (samples - 1)
+        factor_std = math.sqrt(factor_var)
+        correlation = covariance / (factor_std * std) if factor_std > 0 and std > 0 else 0.0
+        criticality = critical_tasks[task] / samples
+        std_minutes = factor_std * planned_minutes[task]
+        node = dag.tasks.get(task_id) or {}
+        tasks.append({
+            "id": task_id,
+            "name": node.get("name"),
+            "recipe_name": node.get("recipe_name"),
+            "planned_minutes": round(planned_minutes[task], 3),
+            "mean_minutes": round(factor_mean * planned_minutes[task], 3),
+            "std_minutes": round(std_minutes, 3),
+            "criticality": round(criticality, 4),
+            "correlation": round(max(-1.0, min(1.0, correlation)), 4),
+            "sensitivity": round(criticality * std_minutes / std, 4) if std > 0 else 0.0,
+        })
+    tasks.sort(key=lambda t: (-t["sensitivity"], -t["criticality"], t["id"]))
+
+    kinds = {
+        resource: kind for entry in entries for kind, resource in (entry.get("resources") or {}).items()
+    }
+    resources = sorted(
+        (
+            {
+                "id": resource,
+                "kind": kinds[resource],
+                "criticality": round(critical_resources[resource] / samples, 4),
+                "critical_minutes": round(critical_minutes[resource] / samples, 3),
+            }
+            for resource in kinds
+        ),
+        key=lambda r: (-r["critical_minutes"], -r["criticality"], r["id"]),
+    )
+
+    return {
+        "samples": samples,
+        "seed": seed,
+        "makespan": {
+            "planned": planned,
+            "mean": round(mean, 3),
+            "std": round(std, 3),
+            "p50": round(_percentile(ordered, 0.5), 3),
+            "p90": round(_percentile(ordered, 0.9), 3),
+            "p95": round(_percentile(ordered, 0.95), 3),
+            "buffer_p90": round(max(0.0, _percentile(ordered, 0.9) - planned), 3),
+        },
+        "tasks": tasks[:top] if top is not None else tasks,
+        "resources": resources[:top] if top is not None else resources,
+    }
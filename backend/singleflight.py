@@ -0,0 +1,43 @@
+"""
+Single-flight coalescing of concurrent identical work.
+
+While a call for a key is in flight, later callers with the same key wait
+for it and get its result (or its exception) instead of starting their
+own. Nothing is cached: once the call finishes the key is forgotten, so
+the next request runs fresh.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Per-key in-flight call registry for one event loop.
+
+    The shared call runs as its own task, so a caller going away (e.g. a
+    client disconnect cancelling its handler) doesn't cancel it for the
+    others waiting on it.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run `fn()` for `key`, or join the call already in flight for it.
+
+        Returns:
+            (result, shared) where `shared` is True when this caller joined
+            another caller's execution
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _, key=key: self._calls.pop(key, None))
+        return await asyncio.shield(task), shared
@@ -2,8 +2,9 @@
 State model for Kitchen Simulator LangGraph workflow.
 """
 
-from typing import TypedDict, List, Optional, Dict, Any
-from knowledge_base import KnowledgeBase, Kitchen
+import operator
+from typing import Annotated, TypedDict, List, Optional, Dict, Any
+from knowledge_base import KitchenSnapshot
 
 
 class ParsedData(TypedDict, total=False):
@@ -12,6 +13,7 @@ class ParsedData(TypedDict, total=False):
     recipes_text: List[str]  # Raw recipe text/menu items
     constraints: Dict[str, Any]  # staff, equipment
     user_overrides: Dict[str, Any]  # User-specified kitchen config changes
+    parse_path: str  # "rules", "hybrid" (rules + LLM) or "llm"
 
 
 class Recipe(TypedDict, total=False):
@@ -57,11 +59,13 @@ class KitchenSimulatorState(TypedDict, total=False):
     """
     user_input: str  # Raw natural language input
     parsed_data: Optional[ParsedData]  # Structured data from parser
-    knowledge_base: Optional[KnowledgeBase]  # Static kitchen info (equipment, staff)
+    kitchen: Optional[KitchenSnapshot]  # Immutable kitchen snapshot (equipment, staff + version)
     recipes: Optional[List[Recipe]]  # Parsed recipes with tasks
     tasks: Optional[TaskDAG]  # Unified dependency graph
     schedule: Optional[Schedule]  # Final timeline with resource assignments
+    history: Optional[Dict[str, Any]]  # Past run the schedule reused or warm-started from (see history.py)
     conflicts: Optional[List[Conflict]]  # Detected bottlenecks/risks
     validation: Optional[ValidationResult]  # LLM validation + answers
     output: Optional[str]  # Formatted text timeline
+    node_timings: Annotated[List[Dict[str, Any]], operator.add]  # Per-node timing records (appended by instrumentation)
 
@@ -42,14 +42,14 @@ def test_workflow_e2e(user_input: str):
     print(f"\n1️⃣  Parsed Data:")
     print(json.dumps(result.get("parsed_data", {}), indent=2))
     
-    print(f"\n2️⃣  Knowledge Base:")
-    if result.get("knowledge_base"):
-        kb = result["knowledge_base"]
-        print(f"   Kitchen Type: {kb.kitchen_type}")
-        print(f"   Ovens: {len(kb.kitchen.ovens)}")
-        print(f"   Burners: {len(kb.kitchen.burners)}")
-        print(f"   Microwaves: {len(kb.kitchen.microwaves)}")
-        print(f"   Chefs: {len(kb.kitchen.chefs)}")
+    print(f"\n2️⃣  Kitchen:")
+    if result.get("kitchen"):
+        kitchen = result["kitchen"]
+        print(f"   Kitchen Type: {kitchen.kitchen_type} (version {kitchen.version})")
+        print(f"   Ovens: {len(kitchen.ovens)}")
+        print(f"   Burners: {len(kitchen.burners)}")
+        print(f"   Microwaves: {len(kitchen.microwaves)}")
+        print(f"   Chefs: {len(kitchen.chefs)}")
     
     print(f"\n3️⃣  Recipes:")
     print(json.dumps(result.get("recipes", []), indent=2))
@@ -0,0 +1,33 @@
+"""
+Shared test fixtures.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from checkpoints import get_checkpoint_store
+from config import get_settings
+from history import get_run_history
+from knowledge_base import get_kitchen_store
+
+
+@pytest.fixture(autouse=True)
+def scratch_stores(monkeypatch, tmp_path):
+    """Keep the process-wide SQLite stores in a temp directory, not backend/."""
+    monkeypatch.setenv("KITCHENSIM_KITCHEN_DB_PATH", str(tmp_path / "kitchen.db"))
+    monkeypatch.setenv("KITCHENSIM_CHECKPOINT_DB_PATH", str(tmp_path / "checkpoints.db"))
+    monkeypatch.setenv("KITCHENSIM_HISTORY_DB_PATH", str(tmp_path / "history.db"))
+    _clear_caches()
+    yield
+    _clear_caches()
+
+
+def _clear_caches() -> None:
+    for getter in (get_settings, get_kitchen_store, get_checkpoint_store, get_run_history):
+        getter.cache_clear()
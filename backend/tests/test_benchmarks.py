@@ -0,0 +1,89 @@
+"""
+Tests for the benchmark workload generators and regression checks.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from benchmarks import generate_menu, generate_task_dag, generate_workload
+from benchmarks.load import run_load
+from benchmarks.run import compare_to_baselines, run_scenario
+from knowledge_base import Kitchen
+
+
+def test_generators_are_seeded():
+    """Same seed → identical workload; different seed → different menu."""
+    assert generate_menu(3, 6, seed=7) == generate_menu(3, 6, seed=7)
+    assert generate_menu(3, 6, seed=7) != generate_menu(3, 6, seed=8)
+
+
+def test_task_dag_shape():
+    """Layered DAG has width * depth nodes and only points forward."""
+    dag = generate_task_dag(width=5, depth=4, edge_density=0.3, seed=1)
+    assert len(dag["nodes"]) == 20
+
+    layer_of = {n["id"]: int(n["id"].split("_")[1]) for n in dag["nodes"]}
+    for before, after in dag["edges"]:
+        assert layer_of[before] < layer_of[after]
+
+
+def test_workload_kitchen_is_valid():
+    """Generated kitchens validate against the Kitchen model."""
+    workload = generate_workload("commercial", seed=3)
+    kitchen = Kitchen(**workload["kitchen"])
+    assert len(kitchen.chefs) == 5
+    assert workload["parsed_data"]["event_details"]["guest_count"] == 150
+
+
+def test_run_scenario_times_every_stage():
+    """Every deterministic node, the service simulation and the stubbed workflow get timed."""
+    results = run_scenario("home", repeat=2)
+    assert set(results) == {
+        "update_kb", "build_dag", "schedule", "detect_conflicts", "format_output", "service", "workflow",
+    }
+    assert all(stats["median_ms"] >= 0 for stats in results.values())
+
+
+def test_compare_to_baselines_flags_regressions():
+    """Only stages slower than both the ratio and the absolute floor regress."""
+    suite = {"results": {"home": {
+        "schedule": {"median_ms": 30.0},
+        "build_dag": {"median_ms": 0.3},
+        "workflow": {"median_ms": 11.0},
+    }}}
+    baselines = {"threshold": 2.0, "min_delta_ms": 0.5, "results": {"home": {
+        "schedule": 10.0,
+        "build_dag": 0.1,
+        "workflow": 10.0,
+    }}}
+    regressions = compare_to_baselines(suite, baselines)
+    assert [r["stage"] for r in regressions] == ["schedule"]
+
+    # A machine calibrated twice as slow doubles every baseline
+    suite["meta"] = {"calibration_ms": 40.0}
+    baselines["meta"] = {"calibration_ms": 20.0}
+    assert compare_to_baselines(suite, baselines) == []
+    suite["results"]["home"]["schedule"]["median_ms"] = 41.0
+    assert compare_to_baselines(suite, baselines)[0]["baseline_ms"] == 20.0
+
+
+def test_load_test_reports_latency_per_operation():
+    """An in-process load run reports every operation and puts the real workflow back."""
+    import api.simulate
+
+    workflow = api.simulate.workflow
+    report = asyncio.run(run_load(concurrency=4, duration=None, requests=24, llm_latency_ms=1, distinct_inputs=2))
+    assert api.simulate.workflow is workflow
+
+    assert report["total"]["requests"] == 24
+    assert report["total"]["errors"] == 0
+    assert set(report["operations"]) <= {"simulate", "get_kitchen", "update_kitchen"}
+    assert "simulate" in report["operations"]
+    latency = report["total"]["latency_ms"]
+    assert latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+    assert report["meta"]["target"] == "in-process"
@@ -0,0 +1,123 @@
+"""
+Tests for per-node workflow checkpoints: resume after a failure, replay, eviction.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import api.runs
+import api.simulate
+from checkpoints import CheckpointStore, decode_update, encode_update
+from graph import create_workflow
+from knowledge_base import apply_overrides, default_snapshot
+from main import app
+from nodes import parse_input_node, validate_node
+
+TOAST = {
+    "recipe_name": "Toast",
+    "servings": 2,
+    "tasks": [
+        {"id": "slice", "duration_minutes": 5, "dependencies": [],
+         "resources_needed": ["chef"], "task_type": "prep"},
+        {"id": "bake", "duration_minutes": 10, "dependencies": ["slice"],
+         "resources_needed": ["oven"], "task_type": "passive"},
+    ],
+}
+
+
+def test_updates_round_trip_compactly():
+    """Default kitchens are stored by reference, others by their resources."""
+    default = default_snapshot()
+    assert decode_update(encode_update({"kitchen": default}))["kitchen"] is default
+    assert len(encode_update({"kitchen": default})) < 100
+
+    custom = apply_overrides(default, {"chef_count": 5})
+    restored = decode_update(encode_update({"kitchen": custom, "tasks": {"nodes": [], "edges": [("a", "b")]}}))
+    assert restored["kitchen"].version == custom.version
+    assert [c.id for c in restored["kitchen"].chefs] == [c.id for c in custom.chefs]
+    assert restored["tasks"]["edges"] == [["a", "b"]]
+
+
+def test_store_evicts_by_size_then_age(tmp_path):
+    """Oldest runs go first once the size budget is exceeded; idle runs expire."""
+    store = CheckpointStore(str(tmp_path / "runs.db"), max_age=3600, max_bytes=5000, evict_every=3)
+    ids = []
+    for i in range(4):
+        with store.start(f"input {i}") as run:
+            # Incompressible, about 2 KB stored
+            store.save(run.run_id, "format_output", {"output": random.Random(i).randbytes(2000).hex()})
+        ids.append(run.run_id)
+    assert store.get_run(ids[-1])["status"] == "done"
+    assert store.get_run(ids[-1])["bytes"] > 2000
+
+    # Only the first and fourth starts evict, before their run stores
+    # anything, so the budget is overshot until the next eviction
+    assert [store.get_run(run_id) is not None for run_id in ids] == [False, True, True, True]
+    store.evict()
+    assert [store.get_run(run_id) is not None for run_id in ids] == [False, False, True, True]
+
+    store.max_age = -1
+    store.evict()
+    assert len(store) == 0
+
+
+def test_failed_run_resumes_and_replays_without_llm(monkeypatch, tmp_path):
+    """A retry skips finished nodes; a replay reuses recorded LLM outputs only."""
+    calls = []
+    fail = {"validate": True}
+
+    def counted(name, node):
+        def run(state):
+            calls.append(name)
+            if fail.get(name):
+                raise RuntimeError(f"{name} unavailable")
+            return node(state)
+        return run
+
+    monkeypatch.setattr(api.simulate, "workflow", create_workflow(node_overrides={
+        "parse_input": counted("parse_input", parse_input_node),
+        "analyze_recipes": counted("analyze_recipes", lambda state: {"recipes": [TOAST]}),
+        "validate": counted("validate", validate_node),
+    }))
+    store = CheckpointStore(str(tmp_path / "runs.db"))
+    monkeypatch.setattr(api.simulate, "get_checkpoint_store", lambda: store)
+    monkeypatch.setattr(api.runs, "get_checkpoint_store", lambda: store)
+    client = TestClient(app)
+    body = {"input": "Dinner for 8 people"}
+
+    failed = client.post("/api/simulate", json=body)
+    assert failed.status_code == 500
+    run_id = failed.headers["X-Run-Id"]
+    run = client.get(f"/api/runs/{run_id}").json()
+    assert run["status"] == "failed"
+    assert "validate" not in run["nodes"] and {"parse_input", "schedule_tasks"} <= set(run["nodes"])
+
+    # Retry: only the failed node runs again
+    fail["validate"] = False
+    calls.clear()
+    resumed = client.post("/api/simulate", json=dict(body, run_id=run_id))
+    assert resumed.status_code == 200
+    assert calls == ["validate"]
+    assert resumed.json()["run_id"] == run_id
+    assert resumed.json()["schedule"]["tasks"]
+    assert client.get(f"/api/runs/{run_id}").json()["status"] == "done"
+
+    # The run id is bound to its input
+    assert client.post("/api/simulate", json={"input": "Lunch for 2", "run_id": run_id}).status_code == 400
+
+    # Replay: no LLM node runs, the deterministic nodes do
+    calls.clear()
+    replayed = client.post(f"/api/runs/{run_id}/replay")
+    assert replayed.status_code == 200
+    assert calls == []
+    assert {t["node"] for t in replayed.json()["timings"]} >= {"schedule_tasks", "build_dag"}
+    assert replayed.json()["schedule"] == resumed.json()["schedule"]
+
+    assert client.post("/api/runs/unknown/replay").status_code == 404
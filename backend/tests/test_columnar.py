@@ -0,0 +1,87 @@
+"""
+Tests for the columnar export formats and their content negotiation.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from fastapi.testclient import TestClient
+import api.simulate
+from benchmarks import generate_workload
+from benchmarks.run import stub_llm_nodes
+from columnar import (
+    BINARY, NDJSON, decode_binary, encode_binary, encode_ndjson, negotiate, schedule_table, simulation_tables,
+)
+from graph import create_workflow
+from knowledge_base import apply_overrides, default_snapshot
+from main import app
+from scheduler import lane_entries, schedule_tasks
+
+
+def _result():
+    workload = generate_workload("commercial", seed=4)
+    kitchen = apply_overrides(default_snapshot(), workload["kitchen"])
+    return {"schedule": schedule_tasks(workload["tasks"], kitchen), "tasks": workload["tasks"]}
+
+
+def test_binary_and_ndjson_round_trip():
+    """Both formats carry the same typed columns, much smaller than the JSON."""
+    result = _result()
+    entries = result["schedule"]["tasks"]
+    entries[0] = dict(entries[0], missing_resources=["oven", "chef"])
+    tables = simulation_tables(result)
+
+    data = encode_binary(tables)
+    assert len(data) * 3 < len(json.dumps(result))
+    decoded = decode_binary(data)
+    assert decoded["schedule"] == schedule_table(result["schedule"]).to_dict()
+    assert decoded["schedule"]["chef"] == [e["resources"].get("chef") for e in entries]
+    assert decoded["schedule"]["missing_resources"][0] == "oven,chef"
+    assert [tuple(edge) for edge in zip(decoded["edges"]["before"], decoded["edges"]["after"])] == [
+        tuple(edge) for edge in result["tasks"]["edges"]
+    ]
+
+    lines = b"".join(encode_ndjson(tables)).decode().splitlines()
+    header = json.loads(lines[0])
+    assert header["table"] == "schedule" and header["rows"] == len(entries)
+    names = [name for name, _ in header["columns"]]
+    rows = [dict(zip(names, json.loads(line))) for line in lines[1:1 + header["rows"]]]
+    assert [(row["id"], row["start"], row["end"]) for row in rows] == [(e["id"], e["start"], e["end"]) for e in entries]
+    assert json.loads(lines[1 + header["rows"]])["table"] == "tasks"
+
+
+def test_accept_header_negotiation():
+    """The highest-quality supported type wins; JSON stays the default."""
+    assert negotiate(None) is None
+    assert negotiate("application/json") is None
+    assert negotiate(NDJSON) == NDJSON
+    assert negotiate(f"application/json;q=0.5, {BINARY}") == BINARY
+    assert negotiate(f"{NDJSON};q=0.2, */*;q=0.8") is None
+    assert negotiate("text/html") is None
+
+
+def test_simulate_exports_columns(monkeypatch):
+    """/api/simulate answers in the negotiated format, with the ids in headers."""
+    workload = generate_workload("small_restaurant", seed=4)
+    monkeypatch.setattr(api.simulate, "workflow", create_workflow(node_overrides=stub_llm_nodes(workload)))
+    client = TestClient(app)
+    body = {"input": "Dinner for 6 people"}
+    as_json = client.post("/api/simulate", json=body).json()
+
+    response = client.post("/api/simulate", json=body, headers={"Accept": BINARY})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == BINARY
+    assert response.headers["X-Schedule-Id"]
+    assert len(response.content) * 3 < len(json.dumps(as_json))
+    tables = decode_binary(response.content)
+    assert tables["schedule"]["id"] == [e["id"] for e in lane_entries(as_json["schedule"]["tasks"])] != []
+    assert tables["tasks"]["id"] == [node["id"] for node in as_json["tasks"]["nodes"]]
+
+    response = client.post("/api/simulate", json=body, headers={"Accept": NDJSON})
+    assert response.headers["content-type"] == NDJSON
+    assert json.loads(response.text.splitlines()[0])["table"] == "schedule"
@@ -0,0 +1,100 @@
+"""
+Tests for the run history: exact reuse and similar-menu warm starts.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import history as history_module
+import nodes.schedule
+from benchmarks import generate_workload
+from history import RunHistory, history_disabled, start_hints
+from knowledge_base import apply_overrides, default_snapshot
+from nodes import schedule_node
+from scheduler import schedule_tasks
+
+
+def _dag(*dishes):
+    return {
+        "nodes": [
+            {"id": f"{dish}_prep", "recipe_name": dish, "duration_minutes": 5, "resources_needed": ["chef"]}
+            for dish in dishes
+        ],
+        "edges": [],
+    }
+
+
+def test_records_and_finds_runs(tmp_path):
+    """Exact lookups need the same DAG and kitchen; similar ones rank by dish Jaccard."""
+    history = RunHistory(str(tmp_path / "history.db"), max_runs=3)
+    kitchen = default_snapshot()
+    soup_salad = _dag("Soup", "Salad")
+    run_id = history.record(soup_salad, kitchen.version, schedule_tasks(soup_salad, kitchen))
+    history.record(_dag("Soup", "Salad", "Steak", "Cake"), kitchen.version, {"tasks": []})
+
+    assert history.exact(soup_salad, kitchen.version)["run_id"] == run_id
+    assert history.exact(soup_salad, "other-kitchen") is None
+    assert history.exact(_dag("Soup"), kitchen.version) is None
+
+    closest = history.closest(["  soup", "SALAD", "Bread"], kitchen.version)
+    assert closest["run_id"] == run_id and closest["similarity"] == round(2 / 3, 4)
+    assert history.closest(["Pie"]) is None
+
+    # Re-recording replaces the run; beyond max_runs the least recently used go first
+    assert history.record(soup_salad, kitchen.version, {"tasks": []}) == run_id
+    history.record(_dag("Pie"), kitchen.version, {"tasks": []})
+    history.record(_dag("Tart"), kitchen.version, {"tasks": []})
+    assert len(history) == 3
+    assert history.closest(["Steak"]) is None
+    assert history.exact(soup_salad, kitchen.version)["schedule"] == {"tasks": []}
+
+
+def test_schedule_node_reuses_and_warm_starts(monkeypatch, tmp_path):
+    """A repeat menu returns its stored schedule; a similar one is never worse than cold."""
+    history = RunHistory(str(tmp_path / "history.db"))
+    monkeypatch.setattr(nodes.schedule, "active_history", lambda: history)
+    workload = generate_workload("commercial", seed=2)
+    kitchen = apply_overrides(default_snapshot(), workload["kitchen"])
+    state = {"tasks": workload["tasks"], "kitchen": kitchen, "parsed_data": workload["parsed_data"]}
+
+    first = schedule_node(state)
+    assert first["history"]["match"] == "none"
+    again = schedule_node(state)
+    assert again == {"schedule": first["schedule"], "history": {"match": "exact", "run_id": first["history"]["run_id"]}}
+
+    # The same event without its last dish
+    dropped = workload["tasks"]["nodes"][-1]["recipe_name"]
+    kept = {node["id"] for node in workload["tasks"]["nodes"] if node["recipe_name"] != dropped}
+    smaller = {
+        "nodes": [node for node in workload["tasks"]["nodes"] if node["id"] in kept],
+        "edges": [edge for edge in workload["tasks"]["edges"] if edge[0] in kept and edge[1] in kept],
+    }
+    similar = schedule_node(dict(state, tasks=smaller))
+    assert similar["history"]["match"] == "similar"
+    assert similar["history"]["source_run_id"] == first["history"]["run_id"]
+    assert 0.5 <= similar["history"]["similarity"] < 1
+    cold = schedule_tasks(smaller, kitchen)
+    assert similar["schedule"]["timeline"]["makespan"] <= cold["timeline"]["makespan"]
+    assert {entry["id"] for entry in similar["schedule"]["tasks"]} == {entry["id"] for entry in cold["tasks"]}
+
+    # The warm start's order still yields a valid schedule on its own
+    warm = schedule_tasks(smaller, kitchen, start_hints=start_hints(first["schedule"]))
+    ends = {entry["id"]: entry["end"] for entry in warm["tasks"]}
+    starts = {entry["id"]: entry["start"] for entry in warm["tasks"]}
+    assert all(ends[before] <= starts[after] for before, after in smaller["edges"])
+
+
+
+def test_history_can_be_disabled(monkeypatch, tmp_path):
+    """Planning inside `history_disabled()` neither reads nor records runs."""
+    history = RunHistory(str(tmp_path / "history.db"))
+    monkeypatch.setattr(history_module, "get_run_history", lambda: history)
+    assert history_module.active_history() is history
+    with history_disabled():
+        assert history_module.active_history() is None
+        update = schedule_node({"tasks": _dag("Soup"), "kitchen": default_snapshot()})
+    assert "history" not in update and len(history) == 0
@@ -7,6 +7,8 @@ Test that:
 3. Can query values
 """
 
+import json
+import multiprocessing
 import pytest
 import sys
 from pathlib import Path
@@ -15,7 +17,17 @@ from pathlib import Path
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
-from knowledge_base import KnowledgeBase, Kitchen, Oven, Burner, Microwave, Chef
+from fastapi.testclient import TestClient
+import api.knowledge
+import api.simulate
+import nodes.update_kb
+from knowledge_base import (
+    KnowledgeBase, Kitchen, Oven, Burner, Microwave, Chef, ChefRole, EnergyLevel,
+    KitchenStore, apply_overrides, default_snapshot, kitchen_view,
+)
+from knowledge_base.check_defaults import validate_defaults
+from knowledge_base.kb import DEFAULTS_PATH
+from main import app
 
 
 def test_load_defaults():
@@ -73,6 +85,26 @@ def test_update_kitchen():
     assert oven_2.max_temp == 550
 
 
+def test_count_overrides():
+    """Counts resize resource lists: copies of the last unit, or drop from the end."""
+    kb = KnowledgeBase(kitchen_type="home")
+
+    kitchen = kb.update({"oven_count": 3, "burner_count": 2, "chef_count": 0})
+    assert [oven.id for oven in kitchen.ovens] == ["oven_1", "oven_2", "oven_3"]
+    assert kitchen.ovens[2].capacity == kitchen.ovens[0].capacity
+    assert [burner.id for burner in kitchen.burners] == ["burner_1", "burner_2"]
+    assert kitchen.chefs == []
+
+    kitchen = kb.update({"chef_count": 1, "chefs": [{"id": "chef_1", "energy_level": "tired"}]})
+    assert kitchen.chefs[0].role == ChefRole.GENERAL
+    assert kitchen.chefs[0].energy_level == EnergyLevel.TIRED
+
+    with pytest.raises(ValueError):
+        kb.update({"oven_count": -1})
+    with pytest.raises(ValueError, match="at most"):
+        kb.update({"chef_count": 300000})
+
+
 def test_query_values():
     """Test that we can query kitchen values."""
     kb = KnowledgeBase(kitchen_type="small_restaurant")
@@ -130,3 +162,138 @@ def test_reset_to_defaults():
     kitchen = kb.reset_to_defaults("home")
     assert kitchen.get_oven("oven_1").capacity != 10  # Back to default
 
+
+def test_default_snapshot_is_shared():
+    """Default snapshots are built once and shared; versions are content hashes."""
+    snapshot = default_snapshot("commercial")
+    assert default_snapshot("commercial") is snapshot
+    assert len(snapshot.ovens) == 4
+    assert snapshot.version == KnowledgeBase(kitchen_type="commercial").snapshot().version
+    assert default_snapshot("home").version != snapshot.version
+
+
+def test_apply_overrides_shares_untouched_resources():
+    """Overrides produce a new version and copy only the resource lists they touch."""
+    base = default_snapshot("small_restaurant")
+    updated = apply_overrides(base, {"chefs": [{"id": "chef_2", "energy_level": "tired"}]})
+
+    assert updated is not base
+    assert updated.version != base.version
+    assert updated.get_chef("chef_2").energy_level == "tired"
+    assert base.get_chef("chef_2").energy_level == "fresh"  # base unchanged
+    assert updated.ovens is base.ovens  # structural sharing
+    assert updated.to_dict()["ovens"] is base.to_dict()["ovens"]
+
+    assert apply_overrides(base, {"unrelated": 1}) is base
+
+
+def test_kb_snapshot_tracks_updates():
+    """KnowledgeBase.snapshot() is cached until the kitchen is updated."""
+    kb = KnowledgeBase(kitchen_type="home")
+    first = kb.snapshot()
+    assert kb.snapshot() is first
+
+    kb.update({"add_oven": {"id": "oven_2", "capacity": 3}})
+    second = kb.snapshot()
+    assert second.version != first.version
+    assert len(second.ovens) == 2 and len(first.ovens) == 1
+
+
+def test_trusted_construction_matches_validation():
+    """from_trusted builds the same model as validation for validated data."""
+    data = {"id": "chef_9", "role": "cook", "skill_level": "expert"}
+    assert Chef.from_trusted(data) == Chef(**data)
+    assert Chef.from_trusted(data).model_dump() == Chef(**data).model_dump()
+    assert Oven.from_trusted({"id": "oven_9", "capacity": 2}).max_temp == 500
+
+
+def test_kitchen_view_roundtrip():
+    """Runtime views precompute multipliers/eligibility and convert back losslessly."""
+    snapshot = apply_overrides(
+        default_snapshot("commercial"),
+        {"chefs": [{"id": "chef_3", "energy_level": "exhausted"}]},
+    )
+    view = kitchen_view(snapshot)
+    assert kitchen_view(snapshot) is view
+
+    chef_3 = view.chef_ids.index("chef_3")
+    assert view.multiplier(chef_3, "cook") == snapshot.get_chef("chef_3").get_task_multiplier("cook")
+    assert set(view.eligible_chefs("cook")) == {
+        i for i, c in enumerate(snapshot.chefs) if c.role in ("cook", "general")
+    }
+    assert len(view.oven_slots()) == sum(o.capacity for o in snapshot.ovens)
+
+    kitchen = view.to_kitchen()
+    assert [c.model_dump() for c in kitchen.chefs] == [c.model_dump() for c in snapshot.chefs]
+    assert [o.model_dump() for o in kitchen.ovens] == [o.model_dump() for o in snapshot.ovens]
+
+
+def _add_chefs(path, n):
+    """Worker process: add one chef at a time through its own store handle."""
+    store = KitchenStore(path)
+    for _ in range(n):
+        store.update(lambda kitchen: apply_overrides(kitchen, {"chef_count": len(kitchen.chefs) + 1}))
+
+
+def test_kitchen_store_is_shared_across_processes(tmp_path):
+    """Workers see each other's updates; unchanged reads reuse the cached snapshot."""
+    path = str(tmp_path / "kitchen.db")
+    store = KitchenStore(path)
+    assert store.current() is default_snapshot()
+
+    other = KitchenStore(path)  # Another worker's connection
+    updated = other.update(lambda kitchen: apply_overrides(kitchen, {"oven_count": 5}))
+    seen = store.current()
+    assert seen.version == updated.version and len(seen.ovens) == 5
+    assert store.current() is seen
+
+    # Read-modify-write updates from several processes don't lose each other
+    start = len(seen.chefs)
+    workers = [multiprocessing.Process(target=_add_chefs, args=(path, 5)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+    assert [worker.exitcode for worker in workers] == [0, 0, 0]
+    assert len(store.current().chefs) == start + 15
+
+    # A failed update leaves the kitchen as it was; resetting maps back to the shared default
+    before = store.current()
+    with pytest.raises(ValueError):
+        store.update(lambda kitchen: apply_overrides(kitchen, {"oven_count": -1}))
+    assert other.current().version == before.version
+    assert other.update(lambda kitchen: default_snapshot("home")) is default_snapshot("home")
+    assert store.current() is default_snapshot("home")
+
+
+def test_knowledge_api_configures_simulations(monkeypatch, tmp_path):
+    """Kitchen edits through /api/knowledge are what the next simulation starts from."""
+    store = KitchenStore(str(tmp_path / "kitchen.db"))
+    for module in (api.knowledge, api.simulate, nodes.update_kb):
+        monkeypatch.setattr(module, "get_kitchen_store", lambda: store)
+    client = TestClient(app)
+
+    kitchen = client.post("/api/knowledge/kitchen/update", json={"kitchen_type": "home", "overrides": {"chef_count": 3}}).json()
+    assert kitchen["kitchen_type"] == "home" and len(kitchen["chefs"]) == 3
+    assert client.get("/api/knowledge/kitchen").json()["version"] == kitchen["version"]
+    assert client.post("/api/knowledge/kitchen/update", json={"overrides": {"oven_count": -1}}).status_code == 400
+
+    simulated = client.post("/api/simulate", json={"input": "Dinner for 4"}).json()
+    assert simulated["knowledge_base"]["version"] == kitchen["version"]
+
+    reset = client.post("/api/knowledge/kitchen/reset").json()
+    assert reset["version"] == default_snapshot("home").version
+
+
+def test_defaults_match_the_models():
+    """check_defaults passes on defaults.json and lists every drift from the models."""
+    defaults = json.loads(DEFAULTS_PATH.read_text())
+    validate_defaults(defaults)
+
+    defaults["kitchen_types"]["home"]["ovens"][0]["capacity"] = "lots"
+    defaults["kitchen_types"]["home"]["fridges"] = []
+    defaults["default_kitchen_type"] = "food_truck"
+    with pytest.raises(ValueError) as error:
+        validate_defaults(defaults)
+    message = str(error.value)
+    assert "home.ovens.0.capacity" in message and "fridges" in message and "food_truck" in message
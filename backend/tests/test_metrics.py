@@ -0,0 +1,79 @@
+"""
+Tests for node instrumentation and the Prometheus metrics endpoint.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from fastapi.testclient import TestClient
+from graph import workflow
+from main import app
+from metrics import Histogram, NODE_ERRORS, NODE_RUNS, instrument_node
+
+
+def test_instrumented_node_records_timing():
+    """Wrapped nodes keep their update and append a timing record."""
+    node = instrument_node("test_ok", lambda state: {"output": "done"})
+    runs_before = NODE_RUNS.get(node="test_ok")
+
+    update = node({})
+
+    assert update["output"] == "done"
+    assert update["node_timings"][0]["node"] == "test_ok"
+    record = update["node_timings"][0]
+    assert record["duration_ms"] >= 0 and record["start_ms"] <= record["end_ms"]
+    assert NODE_RUNS.get(node="test_ok") == runs_before + 1
+
+
+def test_instrumented_node_counts_errors():
+    """Exceptions propagate and are counted as node errors."""
+    def failing(state):
+        raise RuntimeError("boom")
+
+    node = instrument_node("test_fail", failing)
+    with pytest.raises(RuntimeError):
+        node({})
+    assert NODE_ERRORS.get(node="test_fail") == 1
+
+
+def test_histogram_buckets_are_cumulative():
+    """Rendered buckets are cumulative and end with +Inf == count."""
+    hist = Histogram("test_latency", "test", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        hist.observe(value)
+    lines = hist.render()
+    assert 'test_latency_bucket{le="0.1"} 1' in lines
+    assert 'test_latency_bucket{le="1"} 2' in lines
+    assert 'test_latency_bucket{le="+Inf"} 3' in lines
+    assert "test_latency_count 3" in lines
+
+
+def test_workflow_reports_every_node():
+    """A workflow run yields one timing record per node."""
+    result = workflow.invoke({"user_input": "Dinner for 4"})
+    nodes = [record["node"] for record in result["node_timings"]]
+    assert len(nodes) == 8
+    assert nodes[0] == "parse_input" and nodes[-1] == "format_output"
+
+
+def test_metrics_endpoint_and_debug_timings():
+    """/api/metrics serves Prometheus text; timings only appear with debug."""
+    client = TestClient(app)
+
+    plain = client.post("/api/simulate", json={"input": "Dinner for 4"}).json()
+    assert plain["timings"] is None
+    debug = client.post("/api/simulate", json={"input": "Dinner for 4", "debug": True}).json()
+    assert len(debug["timings"]) == 8
+
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert '# TYPE kitchensim_node_duration_seconds histogram' in response.text
+    assert 'kitchensim_node_runs_total{node="schedule_tasks"}' in response.text
+    assert "kitchensim_workflow_duration_seconds_count" in response.text
@@ -0,0 +1,81 @@
+"""
+Tests for the rule-based input pre-parser.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from fastapi.testclient import TestClient
+import api.simulate
+from graph import create_workflow, workflow
+from main import app
+from parsing import PATH_HYBRID, PATH_LLM, PATH_RULES, rule_parse
+
+
+def test_rules_extract_formulaic_inputs():
+    """Event details, counts and chef states come out in the KB override shape."""
+    parsed = rule_parse(
+        "We're hosting a wedding for 120 guests on Saturday at 6:30 pm. "
+        "We have 2 ovens, 8 burners and three chefs. chef_1 is exhausted and chef_3 is an expert."
+    )
+
+    assert parsed.path == PATH_RULES and parsed.leftover == []
+    assert parsed.event_details == {"guest_count": 120, "event_type": "wedding", "time": "18:30", "date": "saturday"}
+    assert parsed.user_overrides == {
+        "oven_count": 2,
+        "burner_count": 8,
+        "chef_count": 3,
+        "chefs": [{"id": "chef_1", "energy_level": "exhausted"}, {"id": "chef_3", "skill_level": "expert"}],
+    }
+    assert rule_parse("Brunch for twelve people on 2026-05-02 at noon").event_details["time"] == "12:00"
+
+
+def test_rules_leave_free_text_to_the_llm():
+    """Sentences with anything unrecognized go to the LLM and contribute no facts."""
+    hybrid = rule_parse("Dinner for 4 people. Make pasta with sauce.")
+    assert hybrid.path == PATH_HYBRID
+    assert hybrid.event_details == {"guest_count": 4, "event_type": "dinner"}
+    assert hybrid.leftover == ["Make pasta with sauce."]
+
+    llm = rule_parse("Last year we had 3 ovens for a party?")
+    assert llm.path == PATH_LLM and llm.event_details == {} and llm.user_overrides == {}
+
+    # Implausible counts are not applied
+    huge = rule_parse("Dinner for 4 people. We have 2 ovens and 300000 chefs.")
+    assert huge.user_overrides == {}
+    assert huge.leftover == ["We have 2 ovens and 300000 chefs."]
+
+    # So are times that don't exist, and counts that describe the equipment
+    for sentence in ("Dinner at 25:99.", "Dinner at 18:75.", "Dinner at 13 pm.", "Dinner at 0:30 am."):
+        parsed = rule_parse(sentence)
+        assert "time" not in parsed.event_details and parsed.leftover == [sentence]
+    assert rule_parse("Dinner at 23:59.").event_details["time"] == "23:59"
+    assert rule_parse("Dinner at 12:15 am.").event_details["time"] == "00:15"
+    convection = rule_parse("We have a convection oven.")
+    assert convection.user_overrides == {} and convection.path == PATH_LLM
+
+
+def test_workflow_applies_rule_parsed_overrides():
+    """Counts parsed by rules reach the kitchen snapshot."""
+    result = workflow.invoke({"user_input": "We have 3 ovens and 2 chefs. chef_2 is tired. Dinner for 40 at 7pm."})
+
+    assert result["parsed_data"]["parse_path"] == PATH_RULES
+    assert result["parsed_data"]["event_details"]["guest_count"] == 40
+    assert [oven.id for oven in result["kitchen"].ovens][-1] == "oven_3"
+    assert len(result["kitchen"].ovens) == 3
+    assert result["kitchen"].chefs[1].energy_level == "tired"
+
+
+def test_simulate_rejects_implausible_counts(monkeypatch):
+    """A count beyond the kitchen's limits answers 400 instead of building the kitchen."""
+    parsed = {"event_details": {"guest_count": 4}, "user_overrides": {"chef_count": 300000}}
+    monkeypatch.setattr(api.simulate, "workflow", create_workflow(node_overrides={
+        "parse_input": lambda state: {"parsed_data": parsed},
+    }))
+    response = TestClient(app).post("/api/simulate", json={"input": "We have 300000 chefs."})
+    assert response.status_code == 400
+    assert "chef_count" in response.json()["detail"]
@@ -0,0 +1,94 @@
+"""
+Tests for the on-demand request profiler and profile storage.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from fastapi.testclient import TestClient
+from config import get_settings
+from main import app
+from profiling import ProfileStore, SamplingProfiler, get_profile_store
+
+
+def _busy_wait(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profiler_collects_collapsed_stacks():
+    """Samples of the profiled thread show up as collapsed stacks."""
+    with SamplingProfiler(interval=0.001) as profiler:
+        _busy_wait(0.05)
+
+    assert profiler.samples > 0
+    collapsed = profiler.collapsed()
+    assert "_busy_wait" in collapsed
+    stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+
+
+def test_profile_store_evicts_oldest():
+    """The store keeps at most max_entries profiles and drops expired ones."""
+    store = ProfileStore(max_entries=2, max_age=3600)
+    for request_id in ("a", "b", "c"):
+        with SamplingProfiler() as profiler:
+            pass
+        store.add(request_id, profiler)
+
+    assert store.get("a") is None
+    assert [p["request_id"] for p in store.list()] == ["c", "b"]
+
+    store.max_age = 0
+    time.sleep(0.01)
+    assert store.list() == []
+
+
+@pytest.fixture
+def profiling_settings(monkeypatch):
+    monkeypatch.setenv("KITCHENSIM_PROFILING_ENABLED", "true")
+    monkeypatch.setenv("KITCHENSIM_ADMIN_TOKEN", "secret")
+    get_settings.cache_clear()
+    get_profile_store.cache_clear()
+    yield
+    get_settings.cache_clear()
+    get_profile_store.cache_clear()
+
+
+def test_profiling_disabled_by_default():
+    """Without configuration, profile requests and admin endpoints are refused."""
+    get_settings.cache_clear()
+    client = TestClient(app)
+    assert client.post("/api/simulate?profile=true", json={"input": "x"}).status_code == 404
+    assert client.get("/api/admin/profiles").status_code == 404
+
+
+def test_profiled_simulate_request(profiling_settings):
+    """A profiled request stores a profile retrievable by its id."""
+    client = TestClient(app)
+
+    denied = client.post("/api/simulate?profile=true", json={"input": "x"})
+    assert denied.status_code == 403
+
+    response = client.post(
+        "/api/simulate?profile=true",
+        json={"input": "Dinner for 4"},
+        headers={"X-Admin-Token": "secret"},
+    )
+    assert response.status_code == 200
+    profile_id = response.json()["profile_id"]
+    assert response.headers["X-Profile-Id"] == profile_id
+
+    listing = client.get("/api/admin/profiles", headers={"X-Admin-Token": "secret"}).json()
+    assert listing["profiles"][0]["request_id"] == profile_id
+
+    profile = client.get(f"/api/admin/profiles/{profile_id}", headers={"X-Admin-Token": "secret"})
+    assert profile.status_code == 200
@@ -0,0 +1,431 @@
+"""
+Tests for the task DAG, the list scheduler and the live (incremental) schedule.
+"""
+
+import itertools
+import json
+import random
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from fastapi.testclient import TestClient
+from benchmarks import generate_workload
+from knowledge_base import Chef, KitchenSnapshot, KitchenView, Oven, apply_overrides, default_snapshot
+from main import app
+from api.schedule import get_schedule_store
+from nodes import build_dag_node, schedule_node
+from scheduler import (
+    IntervalIndex, LiveSchedule, TaskDAG, coordinate_kitchens, expand_batches, lane_entries,
+    min_cost_assignment, schedule_tasks, utilization_series,
+)
+from scheduler import coordinator
+from scheduler.batching import fill_lanes
+
+TOAST = {
+    "recipe_name": "Toast",
+    "tasks": [
+        {"id": "slice", "duration_minutes": 5, "dependencies": [],
+         "resources_needed": ["prep_station", "chef"], "task_type": "prep"},
+        {"id": "bake", "duration_minutes": 10, "dependencies": ["slice"],
+         "resources_needed": ["oven"], "task_type": "passive"},
+        {"id": "plate", "duration_minutes": 2, "dependencies": ["bake"],
+         "resources_needed": ["chef"], "task_type": "plate"},
+    ],
+}
+
+
+def _assert_feasible(entries, dag_nodes):
+    """Dependencies finish before dependents start; no unit is double-booked."""
+    by_id = {e["id"]: e for e in entries}
+    for node in dag_nodes:
+        for dep in node["dependencies"]:
+            if dep in by_id:
+                assert by_id[dep]["end"] <= by_id[node["id"]]["start"] + 1e-9
+    busy = defaultdict(list)
+    for e in entries:
+        for kind, resource_id in e["resources"].items():
+            if kind != "oven":  # Ovens hold several dishes at once
+                busy[resource_id].append((e["start"], e["end"]))
+    for intervals in busy.values():
+        intervals.sort()
+        for (_, end), (start, _) in zip(intervals, intervals[1:]):
+            assert end <= start + 1e-9
+
+
+def test_dag_from_recipes_namespaces_collisions_and_rejects_cycles():
+    """Colliding ids are prefixed by recipe; cycles and unknown deps raise."""
+    dag = TaskDAG.from_recipes([TOAST, dict(TOAST, recipe_name="Garlic Toast")])
+    assert len(dag) == 6
+    assert ("Garlic Toast/slice", "Garlic Toast/bake") in dag.to_dict()["edges"]
+
+    cyclic = {"recipe_name": "Loop", "tasks": [
+        {"id": "a", "dependencies": ["b"]}, {"id": "b", "dependencies": ["a"]},
+    ]}
+    with pytest.raises(ValueError, match="cycle"):
+        TaskDAG.from_recipes([cyclic])
+    with pytest.raises(ValueError, match="unknown task"):
+        TaskDAG.from_recipes([{"recipe_name": "X", "tasks": [{"id": "a", "dependencies": ["z"]}]}])
+
+
+def test_schedule_is_feasible_for_generated_workload():
+    """Every task is placed, respecting dependencies and resource exclusivity."""
+    workload = generate_workload("commercial", seed=2)
+    kitchen = apply_overrides(default_snapshot(), workload["kitchen"])
+    dag = TaskDAG.from_recipes(workload["recipes"])
+
+    schedule = schedule_tasks(dag.to_dict(), kitchen)
+
+    assert len(schedule["tasks"]) == len(dag)
+    _assert_feasible(schedule["tasks"], dag.to_dict()["nodes"])
+    assert schedule["timeline"]["makespan"] == max(e["end"] for e in schedule["tasks"])
+
+
+def test_live_schedule_only_adds_new_assignments():
+    """A new ticket is slotted around the plan without moving earlier tickets."""
+    live = LiveSchedule(default_snapshot("home"), [TOAST])
+    first = live.add_ticket("t1", ["Toast"], now=0.0)
+    assert first["eta_minutes"] == 17.0
+    plan_before = {e["id"]: dict(e) for e in live.plan()}
+
+    second = live.add_ticket("t2", ["Toast", "Toast"], now=1.0)
+    assert {e["id"] for e in second["changed"]} == {
+        f"t2/{i}/{task}" for i in (0, 1) for task in ("slice", "bake", "plate")
+    }
+    assert all(live.assignments[task_id] == entry for task_id, entry in plan_before.items())
+    _assert_feasible(live.plan(), list(live.dag.tasks.values()))
+
+    assert live.advance(100.0) == ["t1", "t2"]
+    assert not live.dag.tasks and not live.plan()
+
+
+def test_live_schedule_reserves_every_equipment_kind():
+    """A task needing an oven and a burner holds both, as a replan would assign."""
+    gratin = {"recipe_name": "Gratin", "tasks": [
+        {"id": "brown", "duration_minutes": 10, "dependencies": [],
+         "resources_needed": ["oven", "stove", "chef"], "task_type": "cook"},
+    ]}
+    kitchen = apply_overrides(default_snapshot("home"), {"oven_count": 2, "burner_count": 1, "chef_count": 2})
+    live = LiveSchedule(kitchen, [gratin])
+    first = live.add_ticket("t1", ["Gratin"], now=0.0)["changed"][0]
+    second = live.add_ticket("t2", ["Gratin"], now=0.0)["changed"][0]
+
+    assert set(first["resources"]) == {"oven", "stove", "chef"}
+    # One burner: the second gratin waits although an oven and a chef are free
+    assert first["resources"]["stove"] == second["resources"]["stove"]
+    assert (first["start"], second["start"]) == (0.0, first["end"])
+    _assert_feasible(live.plan(), list(live.dag.tasks.values()))
+
+    plan = {entry["id"]: entry for entry in live.plan()}
+    live.replan()
+    assert {task_id: set(entry["resources"]) for task_id, entry in live.assignments.items()} == {
+        task_id: set(entry["resources"]) for task_id, entry in plan.items()
+    }
+    assert max(entry["end"] for entry in live.plan()) == second["end"]
+
+
+def test_min_cost_assignment_matches_brute_force():
+    """Every row gets a distinct column at the minimum total cost."""
+    rng = random.Random(7)
+    for _ in range(200):
+        rows, cols = rng.randint(1, 5), rng.randint(1, 6)
+        rows = min(rows, cols)
+        costs = [[rng.choice([rng.uniform(0, 50), rng.randint(0, 5)]) for _ in range(cols)] for _ in range(rows)]
+        assignment = min_cost_assignment(costs)
+        assert len(set(assignment)) == rows
+        best = min(sum(costs[i][c] for i, c in enumerate(p)) for p in itertools.permutations(range(cols), rows))
+        assert sum(costs[i][c] for i, c in enumerate(assignment)) == pytest.approx(best)
+
+    with pytest.raises(ValueError):
+        min_cost_assignment([[1.0], [2.0]])
+
+
+def test_chef_matching_respects_roles_across_tasks():
+    """The server plates so the cook is free to prep, instead of both queueing on the cook."""
+    chefs = (Chef(id="chef_1", role="cook"), Chef(id="chef_2", role="server"))
+    kitchen = KitchenView((), (), (), chefs)
+    tasks = [
+        {"id": "garnish", "duration_minutes": 10, "dependencies": [], "resources_needed": ["chef"], "task_type": "plate"},
+        {"id": "chop", "duration_minutes": 8, "dependencies": [], "resources_needed": ["chef"], "task_type": "prep"},
+    ]
+    schedule = schedule_tasks({"nodes": tasks, "edges": []}, kitchen)
+    assert {e["id"]: (e["resources"]["chef"], e["end"]) for e in schedule["tasks"]} == {
+        "garnish": ("chef_2", 10.0), "chop": ("chef_1", 8.0),
+    }
+
+
+def test_tasks_without_an_eligible_chef_are_left_unassigned():
+    """With only servers on shift, cook work gets no chef and reports one missing."""
+    chefs = (Chef(id="chef_1", role="server"), Chef(id="chef_2", role="server"))
+    kitchen = KitchenView((), (), (), chefs)
+    tasks = [
+        {"id": "sear", "duration_minutes": 10, "dependencies": [], "resources_needed": ["chef"], "task_type": "cook"},
+        {"id": "fry", "duration_minutes": 5, "dependencies": [], "resources_needed": ["chef"],
+         "task_type": "cook", "quantity": 4},
+        {"id": "plate", "duration_minutes": 2, "dependencies": ["sear"], "resources_needed": ["chef"],
+         "task_type": "plate"},
+    ]
+    schedule = {e["id"]: e for e in schedule_tasks({"nodes": tasks, "edges": []}, kitchen)["tasks"]}
+    for task_id in ("sear", "fry"):
+        assert schedule[task_id]["missing_resources"] == ["chef"]
+        assert "chef" not in schedule[task_id]["resources"]
+        assert all(lane[1] is None for lane in schedule[task_id].get("lanes", []))
+    assert schedule["plate"]["resources"]["chef"] in ("chef_1", "chef_2")
+
+    live = LiveSchedule(kitchen, [{"recipe_name": "Steak", "tasks": tasks[:1]}])
+    entry = live.add_ticket("t1", ["Steak"], now=0.0)["changed"][0]
+    assert entry["missing_resources"] == ["chef"] and entry["resources"] == {}
+
+    # An expert takes the cooking, where skill counts; the tired beginner preps
+    chefs = (
+        Chef(id="chef_1", role="general", skill_level="beginner", energy_level="fresh"),
+        Chef(id="chef_2", role="general", skill_level="expert", energy_level="tired"),
+    )
+    tasks = [
+        {"id": "sear", "duration_minutes": 20, "dependencies": [], "resources_needed": ["chef"], "task_type": "cook"},
+        {"id": "dice", "duration_minutes": 20, "dependencies": [], "resources_needed": ["chef"], "task_type": "prep"},
+    ]
+    schedule = schedule_tasks({"nodes": tasks, "edges": []}, KitchenView((), (), (), chefs))
+    assert {e["id"]: e["resources"]["chef"] for e in schedule["tasks"]} == {"sear": "chef_2", "dice": "chef_1"}
+
+
+def test_fill_lanes_finds_earliest_finish():
+    """Loads go to the lanes that finish the quantity soonest, with no spare loads."""
+    # Oven-like lane (3 per load), chef lanes free now and later
+    lanes = [(0.0, 10.0, 3), (0.0, 5.0, 1), (12.0, 5.0, 1)]
+    loads = fill_lanes(lanes, 10)
+    assert sum(k * lane[2] for k, lane in zip(loads, lanes)) == 10
+    assert max(free + k * minutes for (free, minutes, _), k in zip(lanes, loads) if k) == 20.0
+
+    assert fill_lanes([(0.0, 0.0, 4)], 9) == [3]  # Zero-duration loads
+
+
+def test_batched_tasks_scale_with_lanes_not_guests():
+    """Guests only change task quantities; loads follow oven capacity and chefs."""
+    toast = dict(TOAST, servings=2)
+    state = {"parsed_data": {"event_details": {"guest_count": 20}}, "recipes": [toast], "kitchen": default_snapshot("home")}
+    state["tasks"] = build_dag_node(state)["tasks"]
+    schedule = schedule_node(state)["schedule"]
+
+    # 10 yields: one chef slices 10 x 5 min, the capacity-2 oven bakes 5 loads, then plating
+    assert [(e["id"], e["start"], e["end"]) for e in schedule["tasks"]] == [
+        ("slice", 0.0, 50.0), ("bake", 50.0, 100.0), ("plate", 100.0, 120.0),
+    ]
+    assert schedule["tasks"][1]["lanes"] == [["oven_1", None, 50.0, 100.0, 5, 10.0, 2]]
+    assert lane_entries(schedule["tasks"])[1]["batch"] == {
+        "task": "bake", "loads": 5, "load_minutes": 10.0, "load_units": 2, "units": [0, 10],
+    }
+
+    items = expand_batches(schedule["tasks"])
+    assert len(items) == 30
+    assert [(e["start"], e["end"]) for e in items if e["id"] in ("bake[1]", "bake[2]", "bake[3]")] == [
+        (50.0, 60.0), (50.0, 60.0), (60.0, 70.0),
+    ]
+
+    workload = generate_workload("commercial", seed=1)
+    kitchen = apply_overrides(default_snapshot(), workload["kitchen"])
+    sizes = []
+    for guests in (150, 15000):
+        state = {"parsed_data": {"event_details": {"guest_count": guests}}, "recipes": workload["recipes"], "kitchen": kitchen}
+        state["tasks"] = build_dag_node(state)["tasks"]
+        entries = schedule_node(state)["schedule"]["tasks"]
+        sizes.append((len(state["tasks"]["nodes"]), len(entries)))
+        busy = defaultdict(list)  # Batched lanes hold a whole oven
+        for e in lane_entries(entries):
+            for resource_id in e["resources"].values():
+                busy[resource_id].append((e["start"], e["end"]))
+        for intervals in busy.values():
+            intervals.sort()
+            assert all(end <= start + 1e-9 for (_, end), (start, _) in zip(intervals, intervals[1:]))
+    # One entry per task in state, however many lanes it runs on
+    assert sizes[0] == sizes[1] == (len(workload["tasks"]["nodes"]),) * 2
+
+
+def test_batched_tasks_reserve_every_equipment_kind():
+    """Each lane of a batched oven-and-burner task holds a burner too."""
+    kitchen = apply_overrides(default_snapshot("home"), {"oven_count": 2, "burner_count": 1, "chef_count": 2})
+    tasks = [
+        {"id": "brown", "duration_minutes": 10, "dependencies": [],
+         "resources_needed": ["oven", "stove", "chef"], "task_type": "cook", "quantity": 4},
+        {"id": "sauce", "duration_minutes": 5, "dependencies": [],
+         "resources_needed": ["stove"], "task_type": "passive"},
+    ]
+    entries = schedule_tasks({"nodes": tasks, "edges": []}, kitchen)["tasks"]
+    brown = next(e for e in entries if e["id"] == "brown")
+
+    # One burner: a single lane, one unit per load although the oven holds more
+    assert "missing_resources" not in brown
+    assert [lane[4:] for lane in brown["lanes"]] == [[4, 10.0, 1]]
+    assert set(lane_entries([brown])[0]["resources"]) == {"oven", "stove", "chef"}
+    busy = defaultdict(list)
+    for e in lane_entries(entries):
+        for resource_id in e["resources"].values():
+            busy[resource_id].append((e["start"], e["end"]))
+    for intervals in busy.values():
+        intervals.sort()
+        assert all(end <= start + 1e-9 for (_, end), (start, _) in zip(intervals, intervals[1:]))
+
+
+def test_kitchens_share_a_resource_pool(monkeypatch):
+    """Only locations that gain use the pool, and no shared unit is booked by two at once."""
+    executor = ProcessPoolExecutor(max_workers=2)
+    monkeypatch.setattr(coordinator, "_location_executor", lambda: executor)
+    pool = KitchenSnapshot.build(
+        "commissary",
+        ovens=(Oven(id="commissary_oven", capacity=2),),
+        chefs=(Chef(id="floater_1", role="general"), Chef(id="floater_2", role="general")),
+    )
+    workload = generate_workload("commercial", seed=2)
+    stocked = apply_overrides(default_snapshot(), workload["kitchen"])
+    # Every fourth location has no oven and a single chef
+    bare = apply_overrides(default_snapshot("home"), {"oven_count": 0, "chef_count": 1})
+    locations = {
+        f"site_{i}": (workload["tasks"], bare if i % 4 == 0 else stocked) for i in range(20)
+    }
+
+    try:
+        result = coordinate_kitchens(locations, pool)
+    finally:
+        executor.shutdown()
+    local_bare = schedule_tasks(workload["tasks"], bare)
+    local_stocked = schedule_tasks(workload["tasks"], stocked)
+    assert any("missing_resources" in e for e in local_bare["tasks"])
+
+    busy = defaultdict(list)
+    for name, schedule in result["locations"].items():
+        local = local_bare if name in ("site_0", "site_4", "site_8", "site_12", "site_16") else local_stocked
+        assert schedule["timeline"]["makespan"] <= local["timeline"]["makespan"]
+        if not schedule["shared"]:
+            assert schedule["tasks"] == local["tasks"]
+        _assert_feasible(schedule["tasks"], workload["tasks"]["nodes"])
+        for e in schedule["tasks"]:
+            for resource_id in e["resources"].values():
+                if resource_id in ("commissary_oven", "floater_1", "floater_2"):
+                    busy[resource_id].append((e["start"], e["end"], name))
+    assert result["locations"]["site_0"]["shared"]  # The first bare site gets the commissary oven
+    for resource_id, uses in busy.items():
+        uses.sort()
+        for (_, end, first), (start, _, second) in zip(uses, uses[1:]):
+            assert first == second or end <= start + 1e-9
+        assert {grant["location"] for grant in result["shared"][resource_id]} == {name for _, _, name in uses}
+
+    with pytest.raises(ValueError):
+        coordinate_kitchens({"site": (workload["tasks"], stocked)}, KitchenSnapshot.build("commissary", chefs=(Chef(id="chef_1"),)))
+
+
+def test_utilization_series_buckets():
+    """Busy time is split across buckets; waits show up as queue depth."""
+    kitchen = KitchenView((Oven(id="oven_1", capacity=2),), (), (), (Chef(id="chef_1", role="general"),))
+    schedule = {"tasks": [
+        {"id": "a", "ready": 0, "start": 0, "end": 15, "resources": {"chef": "chef_1"}},
+        {"id": "b", "ready": 0, "start": 15, "end": 20, "resources": {"oven": "oven_1", "chef": "chef_1"}},
+    ]}
+
+    series = utilization_series(schedule, kitchen, resolution_minutes=10)
+
+    assert series["bucket_minutes"] == 10 and series["points"] == 2
+    assert series["resources"]["chef_1"]["utilization"] == [1.0, 1.0]
+    assert series["resources"]["oven_1"]["utilization"] == [0.0, 0.25]
+    assert series["queue_depth"]["oven"] == [1.0, 0.5]
+
+
+def test_utilization_series_downsamples_large_schedules():
+    """Long events are downsampled to max_points and stay a few KB."""
+    workload = generate_workload("stress", seed=0)
+    kitchen = apply_overrides(default_snapshot(), workload["kitchen"])
+    schedule = schedule_tasks(TaskDAG.from_recipes(workload["recipes"]).to_dict(), kitchen)
+
+    series = utilization_series(schedule, kitchen, resolution_minutes=1, max_points=50, per_resource=False)
+
+    assert series["points"] <= 50
+    assert series["bucket_minutes"] * series["points"] >= series["end"] - series["start"]
+    assert len(json.dumps(series)) < 8000
+    assert all(0 <= u <= 1.0 + 1e-9 for kind in series["kinds"].values() for u in kind["utilization"])
+
+
+def test_interval_index_matches_scan():
+    """Window queries (with cursors) return exactly what a full scan would."""
+    rng = random.Random(7)
+    entries = []
+    for i in range(300):
+        start = float(rng.randint(0, 600))
+        entries.append({"id": f"t{i}", "start": start, "end": start + rng.choice([0, 5, 12.5, 90])})
+    index = IntervalIndex(entries)
+    ordered = sorted(entries, key=lambda e: (e["start"], e["id"]))
+
+    for _ in range(50):
+        lo = rng.uniform(-10, 620)
+        hi = lo + rng.uniform(0, 120)
+        after = (ordered[rng.randrange(len(ordered))]["start"], ordered[0]["id"]) if rng.random() < 0.5 else None
+        expected = [
+            e["id"] for e in ordered
+            if e["start"] < hi and (e["end"] > lo or e["start"] == e["end"] >= lo)
+            and (after is None or (e["start"], e["id"]) > after)
+        ]
+        assert [e["id"] for e in index.overlapping(lo, hi, after)] == expected
+
+
+def test_schedule_window_endpoint_pages_through_a_window():
+    """Paging a window over selected resources returns each task once, in order."""
+    workload = generate_workload("stress", seed=0)
+    kitchen = apply_overrides(default_snapshot(), workload["kitchen"])
+    schedule = schedule_tasks(TaskDAG.from_recipes(workload["recipes"]).to_dict(), kitchen)
+    schedule_id = get_schedule_store().add(schedule)
+    client = TestClient(app)
+
+    summary = client.get(f"/api/schedules/{schedule_id}").json()
+    chefs = [r["id"] for r in summary["resources"] if r["kind"] == "chef"][:3]
+    expected = sorted(
+        (e for e in schedule["tasks"]
+         if e["resources"].get("chef") in chefs and e["start"] < 120 and e["end"] > 60),
+        key=lambda e: (e["start"], e["id"]),
+    )
+
+    pages, cursor = [], None
+    while True:
+        params = {"start": 60, "end": 120, "resources": ",".join(chefs), "limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"/api/schedules/{schedule_id}/tasks", params=params).json()
+        assert len(page["tasks"]) <= 7
+        pages.extend(page["tasks"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert [e["id"] for e in pages] == [e["id"] for e in expected]
+
+    assert client.get(f"/api/schedules/{schedule_id}/tasks", params={"resources": "nope"}).status_code == 400
+    assert client.get("/api/schedules/missing/tasks").status_code == 404
+
+
+def test_live_service_websocket():
+    """The WebSocket session plans tickets and reports errors without closing."""
+    client = TestClient(app)
+    with client.websocket_connect("/api/service/ws") as ws:
+        ws.send_json({"type": "ticket", "ticket_id": "t0", "items": ["Toast"]})
+        assert ws.receive_json()["type"] == "error"
+
+        ws.send_json({"type": "start", "menu": [TOAST], "kitchen_type": "home"})
+        assert ws.receive_json()["type"] == "ready"
+
+        ws.send_json({"type": "ticket", "ticket_id": "t1", "items": ["Toast"], "at": 0})
+        plan = ws.receive_json()
+        assert plan["type"] == "plan" and plan["eta_minutes"] == 17.0
+        assert len(plan["changed"]) == 3
+
+        ws.send_json({"type": "ticket", "ticket_id": "t2", "items": ["Soup"], "at": 1})
+        assert "Soup" in ws.receive_json()["detail"]
+        ws.send_text("{not json")
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json(["ticket"])
+        assert ws.receive_json()["type"] == "error"
+
+        ws.send_json({"type": "advance", "at": 30})
+        assert ws.receive_json() == {"type": "completed", "tickets": ["t1"]}
@@ -0,0 +1,139 @@
+"""
+Tests for interactive sessions and their versioned schedule deltas.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+import api.simulate
+import nodes.update_kb
+from benchmarks import generate_workload
+from benchmarks.run import stub_llm_nodes
+from graph import create_workflow
+from knowledge_base import KitchenStore, apply_overrides, default_snapshot
+from main import app
+from sessions import SessionStore, conflict_delta, schedule_delta
+
+
+def _apply(schedule, delta):
+    """Apply a schedule delta the way a client would."""
+    entries = {entry["id"]: entry for entry in schedule["tasks"] if entry["id"] not in delta["removed"]}
+    for change in delta["changed"]:
+        entry = dict(entries[change["id"]], **change)
+        entries[change["id"]] = {key: value for key, value in entry.items() if value is not None}
+    entries.update({entry["id"]: entry for entry in delta["added"]})
+    return {
+        "tasks": sorted(entries.values(), key=lambda entry: (entry["start"], entry["id"])),
+        "timeline": delta.get("timeline", schedule["timeline"]),
+    }
+
+
+def test_deltas_carry_only_changes():
+    """Moved and reassigned entries keep just the fields that changed."""
+    old = {"tasks": [
+        {"id": "a", "start": 0, "end": 5, "resources": {"chef": "chef_1"}},
+        {"id": "b", "start": 5, "end": 9, "resources": {}, "missing_resources": ["oven"]},
+        {"id": "c", "start": 0, "end": 2, "resources": {"chef": "chef_2"}},
+    ], "timeline": {"start": 0, "makespan": 9}}
+    new = {"tasks": [
+        {"id": "a", "start": 0, "end": 5, "resources": {"chef": "chef_1"}},
+        {"id": "b", "start": 5, "end": 8, "resources": {"oven": "oven_1"}},
+        {"id": "d", "start": 0, "end": 1, "resources": {"chef": "chef_2"}},
+    ], "timeline": {"start": 0, "makespan": 8}}
+    delta = schedule_delta(old, new)
+    assert delta == {
+        "added": [new["tasks"][2]],
+        "removed": ["c"],
+        "changed": [{"id": "b", "end": 8, "resources": {"oven": "oven_1"}, "missing_resources": None}],
+        "timeline": new["timeline"],
+    }
+    assert _apply(old, delta) == {"tasks": sorted(new["tasks"], key=lambda e: (e["start"], e["id"])),
+                                  "timeline": new["timeline"]}
+    assert schedule_delta(new, new) == {"added": [], "removed": [], "changed": []}
+
+    overload = {"type": "resource_overload", "message": "Ovens full", "task_ids": ["b"]}
+    assert conflict_delta([overload], []) == {"added": [], "cleared": [overload]}
+    assert conflict_delta([], [overload]) == {"added": [overload], "cleared": []}
+
+
+def test_session_pushes_versioned_deltas(monkeypatch, tmp_path):
+    """Tweaks answer with deltas, pushed to subscribers; lagging clients resync."""
+    store = KitchenStore(str(tmp_path / "kitchen.db"))
+    monkeypatch.setattr(nodes.update_kb, "get_kitchen_store", lambda: store)
+    workload = generate_workload("commercial", seed=3)
+    monkeypatch.setattr(api.simulate, "workflow", create_workflow(node_overrides=stub_llm_nodes(workload)))
+    client = TestClient(app)
+    session = client.post("/api/sessions", json={"input": workload["user_input"]}).json()
+    session_id = session["session_id"]
+    assert session["version"] == 0 and session["schedule"]["tasks"]
+
+    with client.websocket_connect(f"/api/sessions/{session_id}/ws?since=0") as socket:
+        microwaves = len(session["kitchen"]["microwaves"])
+        response = client.post(
+            f"/api/sessions/{session_id}/kitchen", json={"overrides": {"microwave_count": microwaves + 1}},
+        )
+        assert response.status_code == 200
+        delta = response.json()
+        assert (delta["version"], delta["base"]) == (1, 0)
+        assert set(delta["kitchen"]) == {"version", "microwaves"}
+        assert socket.receive_json() == {"type": "delta", **delta}
+        # Only what changed is sent
+        assert len(response.content) * 20 < len(json.dumps(session))
+        assert all(len(change) < len(session["schedule"]["tasks"][0]) for change in delta["schedule"]["changed"])
+
+        # A tweak that reschedules most tasks; applying its delta reproduces the new state
+        previous = client.get(f"/api/sessions/{session_id}").json()
+        chefs = len(session["kitchen"]["chefs"])
+        delta = client.post(f"/api/sessions/{session_id}/kitchen", json={"overrides": {"chef_count": chefs + 1}}).json()
+        assert delta["version"] == 2 and delta["schedule"]["changed"]
+        assert socket.receive_json() == {"type": "delta", **delta}
+        current = client.get(f"/api/sessions/{session_id}").json()
+        assert current["version"] == 2
+        schedule = _apply(previous["schedule"], delta["schedule"])
+        assert {e["id"]: e for e in schedule["tasks"]} == {e["id"]: e for e in current["schedule"]["tasks"]}
+        assert schedule["timeline"] == current["schedule"]["timeline"]
+
+        # No change: an empty delta, still versioned
+        delta = client.post(f"/api/sessions/{session_id}/kitchen", json={"overrides": {}}).json()
+        assert delta["version"] == 3 and delta["kitchen"] is None
+        assert delta["schedule"] == {"added": [], "removed": [], "changed": []}
+        assert socket.receive_json()["version"] == 3
+
+    sensitivity = client.get(f"/api/sessions/{session_id}/sensitivity", params={"samples": 50, "top": 3}).json()
+    assert sensitivity["version"] == 3 and sensitivity["samples"] == 50
+    assert len(sensitivity["tasks"]) == 3 and sensitivity["tasks"][0]["criticality"] > 0
+    assert sensitivity["makespan"]["planned"] == current["schedule"]["timeline"]["makespan"]
+    assert client.get(f"/api/sessions/{session_id}/sensitivity", params={"samples": 1}).status_code == 422
+
+    deltas = client.get(f"/api/sessions/{session_id}/deltas", params={"since": 0}).json()
+    assert [d["version"] for d in deltas["deltas"]] == [1, 2, 3] and deltas["version"] == 3
+    with client.websocket_connect(f"/api/sessions/{session_id}/ws?since=2") as socket:
+        assert socket.receive_json()["version"] == 3
+    with client.websocket_connect(f"/api/sessions/{session_id}/ws") as socket:
+        snapshot = socket.receive_json()
+        assert snapshot["type"] == "snapshot" and snapshot["version"] == 3
+        assert client.delete(f"/api/sessions/{session_id}").status_code == 200
+        with pytest.raises(WebSocketDisconnect):
+            socket.receive_json()
+    assert client.get(f"/api/sessions/{session_id}").status_code == 404
+    assert client.post(f"/api/sessions/{session_id}/kitchen", json={"overrides": {}}).status_code == 404
+
+
+def test_lagging_clients_resync():
+    """Deltas older than the kept history answer 410 over HTTP."""
+    workload = generate_workload("small_restaurant", seed=1)
+    store = SessionStore(delta_history=2)
+    session = store.create({"kitchen": default_snapshot(), "tasks": workload["tasks"]})
+    for count in (2, 3, 4):
+        session.update_kitchen(lambda kitchen, count=count: apply_overrides(kitchen, {"chef_count": count}))
+    assert [d["version"] for d in session.deltas_since(1)] == [2, 3]
+    assert session.deltas_since(0) is None
+    assert session.deltas_since(3) == [] and session.deltas_since(9) is None
@@ -0,0 +1,171 @@
+"""
+Tests for the discrete-event service simulation, schedule sensitivity and their API.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from fastapi.testclient import TestClient
+from knowledge_base import Chef, KitchenView, Oven
+from main import app
+from simulation import (
+    Ticket, duration_distribution, load_pos_log, poisson_tickets, sensitivity_analysis, simulate_service,
+)
+
+TOAST = {
+    "recipe_name": "Toast",
+    "tasks": [
+        {"id": "slice", "duration_minutes": 5, "dependencies": [],
+         "resources_needed": ["prep_station", "chef"], "task_type": "prep"},
+        {"id": "bake", "duration_minutes": 10, "dependencies": ["slice"],
+         "resources_needed": ["oven"], "task_type": "passive"},
+        {"id": "plate", "duration_minutes": 2, "dependencies": ["bake"],
+         "resources_needed": ["chef"], "task_type": "plate"},
+    ],
+}
+
+
+def test_simulation_matches_hand_schedule():
+    """One chef and one oven slot: the second ticket queues behind the first."""
+    kitchen = KitchenView(
+        (Oven(id="oven_1", capacity=1),), (), (), (Chef(id="chef_1", role="general"),),
+    )
+    tickets = [Ticket("t1", 0.0, ("Toast",)), Ticket("t2", 0.0, ("Toast",))]
+
+    report = simulate_service(kitchen, [TOAST], tickets, include_ticket_times=True)
+
+    # slice 0-5, 5-10; bake 5-15, 15-25; plate 15-17, 25-27
+    assert [t["minutes"] for t in report["ticket_times"]] == [17.0, 27.0]
+    assert report["events"] == 8
+    assert report["service_minutes"] == 27.0
+    assert report["stations"]["oven"]["utilization"] == round(20 / 27, 4)
+    assert report["queues"]["oven"] == {"avg_length": round(5 / 27, 3), "max_length": 1, "avg_wait_minutes": 2.5}
+    assert report["chefs"]["chef_1"]["busy_minutes"] == 14.0
+    assert report["chefs"]["chef_1"]["tasks"] == 4
+
+
+def test_simulation_rejects_unservable_tickets():
+    """Unknown dishes and missing stations fail fast instead of hanging."""
+    kitchen = KitchenView((), (), (), (Chef(id="chef_1", role="general"),))
+    with pytest.raises(ValueError, match="unknown dish"):
+        simulate_service(kitchen, [TOAST], [Ticket("t1", 0.0, ("Soup",))])
+    with pytest.raises(ValueError, match="needs a oven"):
+        simulate_service(kitchen, [TOAST], [Ticket("t1", 0.0, ("Toast",))])
+
+
+def test_load_pos_log_formats():
+    """CSV line items and JSON-lines tickets merge by ticket and rebase to minute 0."""
+    csv_log = (
+        "ticket_id,timestamp,item,quantity\n"
+        "A,2024-05-01T18:00:00,Toast,2\n"
+        "B,2024-05-01T18:30:00,Soup,1\n"
+        "A,2024-05-01T18:01:00,Soup,1\n"
+    )
+    assert load_pos_log(csv_log) == [
+        Ticket("A", 0.0, ("Toast", "Toast", "Soup")),
+        Ticket("B", 30.0, ("Soup",)),
+    ]
+
+    jsonl_log = '{"ticket_id": 7, "timestamp": 12, "items": ["Toast"]}\n{"ticket_id": 8, "timestamp": 10, "items": "Soup|Toast"}'
+    assert load_pos_log(jsonl_log) == [
+        Ticket("8", 0.0, ("Soup", "Toast")),
+        Ticket("7", 2.0, ("Toast",)),
+    ]
+
+
+def test_service_endpoint():
+    """The API simulates generated arrivals on a default kitchen."""
+    client = TestClient(app)
+    response = client.post("/api/service/simulate", json={
+        "menu": [TOAST],
+        "kitchen_type": "commercial",
+        "arrivals": {"rate_per_hour": 30, "hours": 2, "seed": 1},
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["tickets"]["count"] == len(poisson_tickets(["Toast"], 30, 2, seed=1))
+    assert body["tickets"]["p95_minutes"] >= body["tickets"]["p50_minutes"] >= 17.0
+    assert set(body["queues"]) == {"oven", "stove", "microwave", "chef"}
+
+    bad = client.post("/api/service/simulate", json={"menu": [TOAST]})
+    assert bad.status_code == 400
+    for arrivals in (
+        {"rate_per_hour": 1e9, "hours": 24},
+        {"rate_per_hour": 30, "max_items": 10000},
+        {"rate_per_hour": 30, "min_items": 5, "max_items": 2},
+    ):
+        response = client.post("/api/service/simulate", json={"menu": [TOAST], "arrivals": arrivals})
+        assert response.status_code == 422
+
+
+def test_pos_log_is_never_read_from_a_path(tmp_path):
+    """A request's pos_log is text; only library callers passing a Path read files."""
+    log = tmp_path / "pos.csv"
+    log.write_text("ticket_id,timestamp,item\nSECRET,0,Toast\n")
+    assert load_pos_log(log) == [Ticket("SECRET", 0.0, ("Toast",))]
+
+    client = TestClient(app)
+    for pos_log in (str(log), "x" * 300):
+        response = client.post("/api/service/simulate", json={"menu": [TOAST], "pos_log": pos_log})
+        assert response.status_code == 400
+        assert "SECRET" not in response.text
+
+
+def test_duration_distributions():
+    """Explicit distributions are checked; others spread by task type, wider when inferred."""
+    stated = {"id": "sear", "duration_minutes": 10, "task_type": "cook"}
+    assert duration_distribution(stated) == {"type": "triangular", "min": 9.0, "mode": 10.0, "max": 12.5}
+    inferred = duration_distribution(dict(stated, duration_source="inferred"))
+    assert (inferred["min"], inferred["max"]) == (8.0, 15.0)
+    lognormal = {"type": "lognormal", "median": 20, "sigma": 0.2}
+    assert duration_distribution(dict(stated, duration_distribution=lognormal)) == {
+        "type": "lognormal", "median": 20.0, "sigma": 0.2,
+    }
+    for bad in ({"type": "triangular", "min": 5, "mode": 4, "max": 8}, {"type": "lognormal", "median": 5},
+                {"type": "uniform"}):
+        with pytest.raises(ValueError):
+            duration_distribution(dict(stated, duration_distribution=bad))
+
+
+def test_sensitivity_ranks_the_uncertain_critical_task():
+    """A wide task on the critical path ranks first; a task with slack is never critical."""
+    dag = {"nodes": [
+        {"id": "braise", "name": "Braise", "duration_minutes": 60, "dependencies": [],
+         "duration_distribution": {"type": "triangular", "min": 45, "mode": 60, "max": 120}},
+        {"id": "plate", "name": "Plate", "duration_minutes": 10, "dependencies": ["braise"], "task_type": "plate"},
+        {"id": "salad", "name": "Salad", "duration_minutes": 10, "dependencies": [], "task_type": "prep"},
+    ]}
+
+    def entry(task_id, start, end, chef):
+        return {"id": task_id, "name": task_id, "start": start, "end": end, "resources": {"chef": chef}}
+
+    schedule = {
+        # chef_1's multiplier stretched plating to 12 minutes
+        "tasks": [entry("braise", 0, 60, "chef_1"), entry("plate", 60, 72, "chef_1"), entry("salad", 0, 10, "chef_2")],
+        "timeline": {"start": 0, "end": 72, "makespan": 72},
+    }
+
+    report = sensitivity_analysis(schedule, dag, samples=400, seed=1)
+
+    assert report == sensitivity_analysis(schedule, dag, samples=400, seed=1)
+    tasks = {task["id"]: task for task in report["tasks"]}
+    assert report["tasks"][0]["id"] == "braise"
+    assert tasks["braise"]["criticality"] == tasks["plate"]["criticality"] == 1.0
+    assert tasks["braise"]["correlation"] > 0.9
+    assert tasks["salad"]["criticality"] == 0.0 and tasks["salad"]["sensitivity"] == 0.0
+    # Plating samples scale with the chef: 12 * (0.85..1.3)
+    assert 12 * 0.85 <= tasks["plate"]["mean_minutes"] <= 12 * 1.3
+    makespan = report["makespan"]
+    assert makespan["p90"] >= makespan["p50"] > makespan["planned"]
+    assert makespan["buffer_p90"] == round(makespan["p90"] - 72, 3)
+    assert [r["id"] for r in report["resources"]] == ["chef_1", "chef_2"]
+    assert report["resources"][1]["criticality"] == 0.0
+
+    with pytest.raises(ValueError, match="at least 2"):
+        sensitivity_analysis(schedule, dag, samples=1)
@@ -0,0 +1,94 @@
+"""
+Tests for single-flight coalescing of concurrent identical simulate requests.
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import httpx
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import api.simulate
+from main import app
+from metrics import SIMULATE_COALESCED
+from singleflight import SingleFlight
+
+
+def test_single_flight_shares_results_and_errors():
+    """Callers with the same key share one call, including its exception."""
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        if value == "boom":
+            raise ValueError("boom")
+        return value.upper()
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            flight.run("a", lambda: work("a")),
+            flight.run("a", lambda: work("a")),
+            flight.run("b", lambda: work("b")),
+        )
+        assert results == [("A", False), ("A", True), ("B", False)]
+        assert len(flight) == 0
+
+        errors = await asyncio.gather(
+            flight.run("x", lambda: work("boom")),
+            flight.run("x", lambda: work("boom")),
+            return_exceptions=True,
+        )
+        assert all(isinstance(e, ValueError) for e in errors)
+
+        # Finished calls are forgotten, not cached
+        assert await flight.run("a", lambda: work("a")) == ("A", False)
+
+    asyncio.run(scenario())
+    assert calls == ["a", "b", "boom", "a"]
+
+
+def test_concurrent_duplicate_simulations_run_once(monkeypatch):
+    """Identical concurrent requests await one workflow run and are counted."""
+    runs = []
+    release = threading.Event()
+
+    class SlowWorkflow:
+        def invoke(self, state):
+            runs.append(state["user_input"])
+            release.wait(5)
+            return {"user_input": state["user_input"], "output": f"run {len(runs)}"}
+
+    monkeypatch.setattr(api.simulate, "workflow", SlowWorkflow())
+    coalesced_before = SIMULATE_COALESCED.get()
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            requests = [
+                client.post("/api/simulate", json={"input": text})
+                for text in ("Dinner for 4", "dinner  for 4 ", "DINNER for 4", "Lunch for 2")
+            ]
+            pending = asyncio.gather(*requests)
+            # Let every request reach the workflow before releasing it
+            while len(runs) < 2:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            release.set()
+            return await pending
+
+    responses = asyncio.run(scenario())
+    assert [r.status_code for r in responses] == [200] * 4
+    bodies = [r.json() for r in responses]
+
+    # Whichever duplicate resolves its key first leads the shared run
+    assert sorted(" ".join(text.split()).casefold() for text in runs) == ["dinner for 4", "lunch for 2"]
+    assert len({b["output"] for b in bodies[:3]}) == 1
+    assert bodies[1]["user_input"] == "dinner  for 4 "  # Each caller gets its own input echoed
+    assert SIMULATE_COALESCED.get() - coalesced_before == 2